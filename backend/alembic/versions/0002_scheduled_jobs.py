@@ -0,0 +1,37 @@
+"""Add scheduled_jobs table for cluster-wide periodic job coordination.
+
+Revision ID: 0002_scheduled_jobs
+Revises: 0001_initial_baseline
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002_scheduled_jobs'
+down_revision = '0001_initial_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per job: the worker holding the job's advisory lock checks last_started_at
+    # to decide whether the job is due, then records the outcome (see config.tasks.JobScheduler).
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS scheduled_jobs (
+        name VARCHAR(100) PRIMARY KEY,
+        last_started_at TIMESTAMPTZ,
+        last_finished_at TIMESTAMPTZ,
+        last_duration_ms DOUBLE PRECISION,
+        last_status VARCHAR(20),
+        last_error TEXT,
+        last_runner VARCHAR(255),
+        run_count BIGINT NOT NULL DEFAULT 0,
+        failure_count BIGINT NOT NULL DEFAULT 0
+    );
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS scheduled_jobs;")
@@ -0,0 +1,62 @@
+"""Add monitored_urls and check_results (TimescaleDB hypertable when available).
+
+Revision ID: 0003_monitoring_tables
+Revises: 0002_scheduled_jobs
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003_monitoring_tables'
+down_revision = '0002_scheduled_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS monitored_urls (
+        id BIGSERIAL PRIMARY KEY,
+        url TEXT UNIQUE NOT NULL,
+        name VARCHAR(255),
+        interval_seconds INTEGER NOT NULL DEFAULT 60,
+        enabled BOOLEAN NOT NULL DEFAULT TRUE,
+        owner_id UUID REFERENCES users(id) ON DELETE SET NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """)
+
+    # One row per check; narrow fixed-width columns keep the series cheap to scan and serialize
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS check_results (
+        time TIMESTAMPTZ NOT NULL,
+        url_id BIGINT NOT NULL REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        status_code SMALLINT,
+        response_time_ms REAL,
+        content_length INTEGER,
+        result VARCHAR(32) NOT NULL,
+        error TEXT
+    );
+    """)
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_check_results_url_time ON check_results (url_id, time DESC);
+    """)
+
+    # The production image ships TimescaleDB; plain Postgres (e.g. local development) keeps a regular table
+    op.execute("""
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb') THEN
+            CREATE EXTENSION IF NOT EXISTS timescaledb;
+            PERFORM create_hypertable('check_results', 'time', if_not_exists => TRUE, migrate_data => TRUE);
+        END IF;
+    END
+    $$;
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS check_results;")
+    op.execute("DROP TABLE IF EXISTS monitored_urls;")
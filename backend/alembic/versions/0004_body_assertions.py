@@ -0,0 +1,34 @@
+"""Add body assertions and content-change tracking.
+
+Revision ID: 0004_body_assertions
+Revises: 0003_monitoring_tables
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004_body_assertions'
+down_revision = '0003_monitoring_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # assertions: list of {"type": "regex" | "json_path" | "content_hash", ...} (see apps.monitoring.assertions)
+    # content_hash: digest of the body at the last check, to detect changes across probe restarts
+    op.execute("""
+    ALTER TABLE monitored_urls
+        ADD COLUMN IF NOT EXISTS assertions JSONB NOT NULL DEFAULT '[]'::jsonb,
+        ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+    """)
+    op.execute("""
+    ALTER TABLE check_results
+        ADD COLUMN IF NOT EXISTS content_changed BOOLEAN;
+    """)
+
+
+def downgrade():
+    op.execute("ALTER TABLE check_results DROP COLUMN IF EXISTS content_changed;")
+    op.execute("ALTER TABLE monitored_urls DROP COLUMN IF EXISTS assertions, DROP COLUMN IF EXISTS content_hash;")
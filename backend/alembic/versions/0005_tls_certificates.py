@@ -0,0 +1,55 @@
+"""Add TLS certificate tracking and per-check connect timing.
+
+Revision ID: 0005_tls_certificates
+Revises: 0004_body_assertions
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0005_tls_certificates'
+down_revision = '0004_body_assertions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per distinct leaf certificate ever seen, shared by every URL that serves it
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS tls_certificates (
+        fingerprint CHAR(64) PRIMARY KEY,
+        subject TEXT NOT NULL,
+        issuer TEXT NOT NULL,
+        sans TEXT[] NOT NULL DEFAULT '{}',
+        serial_number VARCHAR(64) NOT NULL,
+        not_before TIMESTAMPTZ NOT NULL,
+        not_after TIMESTAMPTZ NOT NULL,
+        chain_not_after TIMESTAMPTZ NOT NULL,
+        chain_length SMALLINT NOT NULL,
+        first_seen_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """)
+    # Certificate currently served by each https URL; only rewritten when the certificate changes
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS url_tls_state (
+        url_id BIGINT PRIMARY KEY REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        fingerprint CHAR(64) NOT NULL REFERENCES tls_certificates(fingerprint),
+        tls_version VARCHAR(16),
+        cipher VARCHAR(128),
+        since TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tls_certificates_chain_not_after ON tls_certificates (chain_not_after);")
+    # TCP connect + TLS handshake of a new connection (NULL when a pooled connection was reused)
+    op.execute("""
+    ALTER TABLE check_results
+        ADD COLUMN IF NOT EXISTS connect_ms REAL;
+    """)
+
+
+def downgrade():
+    op.execute("ALTER TABLE check_results DROP COLUMN IF EXISTS connect_ms;")
+    op.execute("DROP TABLE IF EXISTS url_tls_state;")
+    op.execute("DROP TABLE IF EXISTS tls_certificates;")
@@ -0,0 +1,29 @@
+"""Add check types and per-check options to monitored_urls.
+
+Revision ID: 0006_check_types
+Revises: 0005_tls_certificates
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0006_check_types'
+down_revision = '0005_tls_certificates'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # check_type: name of a registered apps.monitoring.checks.CheckType ("http", "tcp", "dns", "tls", ...)
+    # check_options: type-specific settings, e.g. {"expect": "^220 "} for tcp or {"nameserver": "1.1.1.1"} for dns
+    op.execute("""
+    ALTER TABLE monitored_urls
+        ADD COLUMN IF NOT EXISTS check_type VARCHAR(32) NOT NULL DEFAULT 'http',
+        ADD COLUMN IF NOT EXISTS check_options JSONB NOT NULL DEFAULT '{}'::jsonb;
+    """)
+
+
+def downgrade():
+    op.execute("ALTER TABLE monitored_urls DROP COLUMN IF EXISTS check_type, DROP COLUMN IF EXISTS check_options;")
@@ -0,0 +1,50 @@
+"""Add per-tenant quotas and usage counters.
+
+Revision ID: 0007_tenant_quotas
+Revises: 0006_check_types
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0007_tenant_quotas'
+down_revision = '0006_check_types'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Quota overrides for one user or for every user of a role; NULL fields fall back
+    # (user -> role -> TENANT_DEFAULT_* settings), see apps.monitoring.tenants.TenantQuotas
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS tenant_quotas (
+        id BIGSERIAL PRIMARY KEY,
+        user_id UUID UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+        role_id UUID UNIQUE REFERENCES roles(id) ON DELETE CASCADE,
+        max_urls INTEGER CHECK (max_urls >= 0),
+        min_interval_seconds INTEGER CHECK (min_interval_seconds > 0),
+        weight REAL CHECK (weight > 0),
+        CHECK ((user_id IS NULL) <> (role_id IS NULL))
+    );
+    """)
+    # Daily usage per tenant (owner user id; the nil UUID for URLs without an owner),
+    # incremented in batches by apps.monitoring.tenants.UsageCounters
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS tenant_usage (
+        tenant_id UUID NOT NULL,
+        day DATE NOT NULL,
+        checks BIGINT NOT NULL DEFAULT 0,
+        check_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+        ingested_rows BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (tenant_id, day)
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_monitored_urls_owner_id ON monitored_urls (owner_id);")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_monitored_urls_owner_id;")
+    op.execute("DROP TABLE IF EXISTS tenant_usage;")
+    op.execute("DROP TABLE IF EXISTS tenant_quotas;")
@@ -0,0 +1,35 @@
+"""Add shared counters for login/refresh rate limiting.
+
+Revision ID: 0008_auth_rate_limits
+Revises: 0007_tenant_quotas
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0008_auth_rate_limits'
+down_revision = '0007_tenant_quotas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Hits per limiter key and epoch-aligned window, merged across workers by
+    # apps.auth.rate_limit.RateLimitSync. UNLOGGED: short-lived counters need no WAL or replication.
+    op.execute("""
+    CREATE UNLOGGED TABLE IF NOT EXISTS auth_rate_limits (
+        limiter VARCHAR(32) NOT NULL,
+        key TEXT NOT NULL,
+        window_index BIGINT NOT NULL,
+        hits INTEGER NOT NULL,
+        expires_at TIMESTAMPTZ NOT NULL,
+        PRIMARY KEY (limiter, key, window_index)
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_auth_rate_limits_expires_at ON auth_rate_limits (expires_at);")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS auth_rate_limits;")
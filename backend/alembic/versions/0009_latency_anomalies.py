@@ -0,0 +1,52 @@
+"""Add hourly latency rollups and anomaly scores.
+
+Revision ID: 0009_latency_anomalies
+Revises: 0008_auth_rate_limits
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0009_latency_anomalies'
+down_revision = '0008_auth_rate_limits'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per URL and hour, appended incrementally by apps.monitoring.anomalies
+    # (the baselines are computed from these, never from raw check_results)
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS latency_rollups (
+        url_id BIGINT NOT NULL REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        hour TIMESTAMPTZ NOT NULL,
+        checks INTEGER NOT NULL,
+        failures INTEGER NOT NULL,
+        p50_ms REAL,
+        PRIMARY KEY (url_id, hour)
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_latency_rollups_hour ON latency_rollups (hour);")
+    # Score of each URL's median latency in an hour against its baselines (written with COPY)
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS latency_anomalies (
+        time TIMESTAMPTZ NOT NULL,
+        url_id BIGINT NOT NULL REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        value_ms REAL NOT NULL,
+        expected_ms REAL NOT NULL,
+        scale_ms REAL NOT NULL,
+        ewma_ms REAL,
+        seasonal BOOLEAN NOT NULL,
+        score REAL NOT NULL,
+        is_anomaly BOOLEAN NOT NULL,
+        PRIMARY KEY (url_id, time)
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_latency_anomalies_time ON latency_anomalies (time);")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS latency_anomalies;")
+    op.execute("DROP TABLE IF EXISTS latency_rollups;")
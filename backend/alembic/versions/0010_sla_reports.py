@@ -0,0 +1,55 @@
+"""Add maintenance windows and cached monthly SLA reports.
+
+Revision ID: 0010_sla_reports
+Revises: 0009_latency_anomalies
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0010_sla_reports'
+down_revision = '0009_latency_anomalies'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Planned downtime excluded from SLA figures; url_id NULL applies to every URL
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS maintenance_windows (
+        id BIGSERIAL PRIMARY KEY,
+        url_id BIGINT REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        starts_at TIMESTAMPTZ NOT NULL,
+        ends_at TIMESTAMPTZ NOT NULL,
+        reason TEXT,
+        created_by UUID REFERENCES users(id) ON DELETE SET NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        CHECK (ends_at > starts_at)
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_maintenance_windows_period ON maintenance_windows (starts_at, ends_at);")
+    # Reports of finished months, computed once by apps.monitoring.sla (deleted when a maintenance
+    # window touching the month is added); `downtime` holds the downtime intervals outside maintenance
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS sla_reports (
+        url_id BIGINT NOT NULL REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        month DATE NOT NULL,
+        up_seconds DOUBLE PRECISION NOT NULL,
+        down_seconds DOUBLE PRECISION NOT NULL,
+        maintenance_seconds DOUBLE PRECISION NOT NULL,
+        no_data_seconds DOUBLE PRECISION NOT NULL,
+        incidents INTEGER NOT NULL,
+        mttr_seconds DOUBLE PRECISION,
+        uptime_pct DOUBLE PRECISION,
+        downtime TSTZMULTIRANGE NOT NULL,
+        computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (month, url_id)
+    );
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS sla_reports;")
+    op.execute("DROP TABLE IF EXISTS maintenance_windows;")
@@ -0,0 +1,51 @@
+"""Add correlated outage incidents and the last resolved address of each URL.
+
+Revision ID: 0011_outage_incidents
+Revises: 0010_sla_reports
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0011_outage_incidents'
+down_revision = '0010_sla_reports'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Address the probe last connected to; written only when it changes (see apps.monitoring.engine)
+    op.execute("ALTER TABLE monitored_urls ADD COLUMN IF NOT EXISTS resolved_ip INET;")
+    # One row per correlated outage, however many URLs it affects (see apps.monitoring.incidents)
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS incidents (
+        id UUID PRIMARY KEY,
+        root_kind TEXT NOT NULL CHECK (root_kind IN ('host', 'ip', 'network', 'url')),
+        root_key TEXT NOT NULL,
+        started_at TIMESTAMPTZ NOT NULL,
+        last_failure_at TIMESTAMPTZ NOT NULL,
+        resolved_at TIMESTAMPTZ,
+        url_count INTEGER NOT NULL,
+        failing_count INTEGER NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_incidents_started_at ON incidents (started_at);")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_incidents_open ON incidents (started_at) WHERE resolved_at IS NULL;")
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS incident_urls (
+        incident_id UUID NOT NULL REFERENCES incidents(id) ON DELETE CASCADE,
+        url_id BIGINT NOT NULL REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        first_failure_at TIMESTAMPTZ NOT NULL,
+        PRIMARY KEY (incident_id, url_id)
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_incident_urls_url_id ON incident_urls (url_id);")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS incident_urls;")
+    op.execute("DROP TABLE IF EXISTS incidents;")
+    op.execute("ALTER TABLE monitored_urls DROP COLUMN IF EXISTS resolved_ip;")
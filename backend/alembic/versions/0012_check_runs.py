@@ -0,0 +1,41 @@
+"""Add check_runs for change-only (run-length) storage of stable check results.
+
+Revision ID: 0012_check_runs
+Revises: 0011_outage_incidents
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0012_check_runs'
+down_revision = '0011_outage_incidents'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Checks that repeated the previous stored row (same status, latency within tolerance), folded into
+    # one row per run by apps.monitoring.runs; readers expand them back into samples
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS check_runs (
+        url_id BIGINT NOT NULL REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        start_time TIMESTAMPTZ NOT NULL,
+        end_time TIMESTAMPTZ NOT NULL,
+        count INTEGER NOT NULL CHECK (count > 0),
+        status_code SMALLINT,
+        result VARCHAR(32) NOT NULL,
+        error TEXT,
+        content_length INTEGER,
+        response_time_min_ms REAL NOT NULL,
+        response_time_max_ms REAL NOT NULL,
+        response_time_sum_ms DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (url_id, start_time)
+    );
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_check_runs_start_time ON check_runs (start_time);")
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS check_runs;")
@@ -0,0 +1,31 @@
+"""Add probe_schedule so a restarted probe engine resumes each URL's schedule.
+
+Revision ID: 0013_probe_schedule
+Revises: 0012_check_runs
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0013_probe_schedule'
+down_revision = '0012_check_runs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Next check of every URL as of the probe engine's last shutdown (saved_at); on start the engine
+    # waits the same remaining time (next_run_at - saved_at) instead of checking everything at once
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS probe_schedule (
+        url_id BIGINT PRIMARY KEY REFERENCES monitored_urls(id) ON DELETE CASCADE,
+        next_run_at TIMESTAMPTZ NOT NULL,
+        saved_at TIMESTAMPTZ NOT NULL
+    );
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS probe_schedule;")
@@ -0,0 +1,32 @@
+"""Make monitored URLs unique per owner instead of globally.
+
+Revision ID: 0014_per_owner_url_uniqueness
+Revises: 0013_probe_schedule
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0014_per_owner_url_uniqueness'
+down_revision = '0013_probe_schedule'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A global UNIQUE (url) told a tenant (through a 409) that another tenant monitors the same URL.
+    # Each owner now has its own namespace; NULL owners (admin-managed URLs) are not constrained
+    # against each other, so deleting a user (owner_id SET NULL) never conflicts with an admin URL.
+    op.execute("ALTER TABLE monitored_urls DROP CONSTRAINT IF EXISTS monitored_urls_url_key;")
+    op.execute("""
+    ALTER TABLE monitored_urls
+        ADD CONSTRAINT monitored_urls_owner_id_url_key UNIQUE (owner_id, url);
+    """)
+
+
+def downgrade():
+    # Fails while several owners monitor the same URL; remove the duplicates first
+    op.execute("ALTER TABLE monitored_urls DROP CONSTRAINT IF EXISTS monitored_urls_owner_id_url_key;")
+    op.execute("ALTER TABLE monitored_urls ADD CONSTRAINT monitored_urls_url_key UNIQUE (url);")
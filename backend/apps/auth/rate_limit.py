@@ -0,0 +1,223 @@
+# backend/apps/auth/rate_limit.py
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.database import Database
+from config.settings import settings
+
+# Initialize logger
+logger = get_logger(__name__)
+
+
+class _Window:
+    """Hit counts of one key in the current and the previous fixed window."""
+    __slots__ = ("index", "previous", "current")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.previous = 0
+        self.current = 0
+
+    def roll(self, index: int):
+        if index != self.index:
+            self.previous = self.current if index == self.index + 1 else 0
+            self.current = 0
+            self.index = index
+
+
+class SlidingWindowLimiter:
+    """
+    Allows `limit` hits per key within any `window_s` seconds (sliding window counter).
+
+    Windows are aligned to the epoch, so every worker counts in the same windows, and the count
+    over the last `window_s` is estimated as current + previous * (share of the previous window
+    still inside the sliding window). Each key costs one small slotted object; keys idle for two
+    windows are pruned once there are more than `max_keys`. Rejected hits are not counted.
+
+    Hits not yet sent to Postgres are kept in `pending`; see RateLimitSync.
+    """
+
+    def __init__(self, name: str, limit: int, window_s: float, max_keys: int = 100000):
+        self.name = name
+        self.limit = limit
+        self.window_s = window_s
+        self.max_keys = max_keys
+        self._windows: Dict[str, _Window] = {}
+        self.pending: Dict[Tuple[str, int], int] = {}
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def _window(self, key: str, now: float) -> Tuple[_Window, float]:
+        index, offset = divmod(now, self.window_s)
+        window = self._windows.get(key)
+        if window is None:
+            if len(self._windows) >= self.max_keys:
+                self._prune(int(index))
+            window = self._windows[key] = _Window(int(index))
+        window.roll(int(index))
+        return window, offset / self.window_s
+
+    def _prune(self, index: int):
+        self._windows = {k: w for k, w in self._windows.items() if w.index >= index - 1}
+        if len(self._windows) >= self.max_keys:
+            # Still full of active keys (e.g. a distributed attack): forget the oldest half
+            keys = list(self._windows)
+            self._windows = {k: self._windows[k] for k in keys[len(keys) // 2:]}
+
+    def retry_after(self, key: str, now: Optional[float] = None) -> float:
+        """Seconds until `key` may hit again; 0 if it may hit now."""
+        if not self.enabled:
+            return 0.0
+        now = time.time() if now is None else now
+        window, elapsed = self._window(key, now)
+        allowed = self.limit - 1   # Estimated count that still admits one more hit
+        if window.previous * (1 - elapsed) + window.current <= allowed:
+            return 0.0
+        if window.current <= allowed:
+            # Wait until enough of the previous window has slid out
+            return max(self.window_s * (1 - (allowed - window.current) / window.previous - elapsed), 0.0)
+        # Wait for the next window, then until enough of this one has slid out
+        return self.window_s * (1 - elapsed) + self.window_s * (1 - allowed / window.current)
+
+    def hit(self, key: str, now: Optional[float] = None):
+        if not self.enabled:
+            return
+        now = time.time() if now is None else now
+        window, _ = self._window(key, now)
+        window.current += 1
+        slot = (key, window.index)
+        self.pending[slot] = self.pending.get(slot, 0) + 1
+
+    def take_pending(self) -> Dict[Tuple[str, int], int]:
+        pending, self.pending = self.pending, {}
+        return pending
+
+    def restore_pending(self, pending: Dict[Tuple[str, int], int]):
+        for slot, hits in pending.items():
+            self.pending[slot] = self.pending.get(slot, 0) + hits
+
+    def merge(self, key: str, index: int, cluster_hits: int):
+        """Raises the count of `key` in window `index` to the cluster-wide total (plus unsent local hits)."""
+        window = self._windows.get(key)
+        if window is None:
+            if len(self._windows) >= self.max_keys:
+                return
+            window = self._windows[key] = _Window(index)
+        total = cluster_hits + self.pending.get((key, index), 0)
+        if index == window.index:
+            window.current = max(window.current, total)
+        elif index == window.index - 1:
+            window.previous = max(window.previous, total)
+        elif index > window.index:
+            window.roll(index)
+            window.current = max(window.current, total)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+
+class RateLimitSync:
+    """
+    Shares limiter counts between workers through the UNLOGGED `auth_rate_limits` table: each run
+    adds this worker's pending hits with one upsert per limiter and reads back the cluster-wide
+    counts of the current and previous windows (only keys seen more than once, so a spray of
+    single-hit keys stays local). Without it every worker enforces its limits on its own.
+    """
+
+    def __init__(self, limiters: Iterable[SlidingWindowLimiter]):
+        self.limiters = list(limiters)
+
+    async def sync(self, db: Database):
+        async with db.acquire("auth") as conn:
+            for limiter in self.limiters:
+                if not limiter.enabled:
+                    continue
+                pending = limiter.take_pending()
+                try:
+                    if pending:
+                        slots = list(pending)
+                        await conn.execute(
+                            """
+                            INSERT INTO auth_rate_limits (limiter, key, window_index, hits, expires_at)
+                            SELECT $1, k, w, h, NOW() + make_interval(secs => $5)
+                            FROM unnest($2::TEXT[], $3::BIGINT[], $4::INTEGER[]) AS t(k, w, h)
+                            ON CONFLICT (limiter, key, window_index) DO UPDATE
+                            SET hits = auth_rate_limits.hits + EXCLUDED.hits
+                            """,
+                            limiter.name, [key for key, _ in slots], [index for _, index in slots],
+                            [pending[slot] for slot in slots], 2 * limiter.window_s,
+                        )
+                except Exception:
+                    limiter.restore_pending(pending)
+                    raise
+                current = int(time.time() // limiter.window_s)
+                rows = await conn.fetch(
+                    """
+                    SELECT key, window_index, hits FROM auth_rate_limits
+                    WHERE limiter = $1 AND window_index >= $2 AND hits > 1
+                    ORDER BY hits DESC LIMIT $3
+                    """,
+                    limiter.name, current - 1, limiter.max_keys,
+                )
+                for row in rows:
+                    limiter.merge(row["key"], row["window_index"], row["hits"])
+            await conn.execute("DELETE FROM auth_rate_limits WHERE expires_at < NOW()")
+
+
+def client_ip(request: Request) -> str:
+    """
+    The client address; behind a trusted reverse proxy (AUTH_RATE_LIMIT_TRUST_FORWARDED) the
+    last X-Forwarded-For entry, i.e. the address the proxy itself saw.
+    """
+    if settings.AUTH_RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def enforce(checks: List[Tuple[SlidingWindowLimiter, str]]):
+    """
+    Raises 429 with Retry-After if any (limiter, key) is over its limit, otherwise counts a hit
+    on each. Called before any database or password hashing work.
+    """
+    now = time.time()
+    retry_after = max(limiter.retry_after(key, now) for limiter, key in checks)
+    if retry_after > 0:
+        for limiter, key in checks:
+            if limiter.retry_after(key, now) > 0:
+                limiter.rejected += 1
+        logger.warning("Authentication rate limit exceeded", keys=[f"{limiter.name}:{key}" for limiter, key in checks],
+                       retry_after_s=round(retry_after, 1))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+    for limiter, key in checks:
+        limiter.hit(key, now)
+
+
+login_ip_limiter = SlidingWindowLimiter("login_ip", settings.AUTH_RATE_LIMIT_LOGIN_PER_IP,
+                                        settings.AUTH_RATE_LIMIT_WINDOW_SECONDS, settings.AUTH_RATE_LIMIT_MAX_KEYS)
+login_account_limiter = SlidingWindowLimiter("login_account", settings.AUTH_RATE_LIMIT_LOGIN_PER_ACCOUNT,
+                                             settings.AUTH_RATE_LIMIT_WINDOW_SECONDS, settings.AUTH_RATE_LIMIT_MAX_KEYS)
+refresh_ip_limiter = SlidingWindowLimiter("refresh_ip", settings.AUTH_RATE_LIMIT_REFRESH_PER_IP,
+                                          settings.AUTH_RATE_LIMIT_WINDOW_SECONDS, settings.AUTH_RATE_LIMIT_MAX_KEYS)
+rate_limit_sync = RateLimitSync([login_ip_limiter, login_account_limiter, refresh_ip_limiter])
+
+
+def limit_login(request: Request, username: str):
+    enforce([(login_ip_limiter, client_ip(request)), (login_account_limiter, username.strip().lower())])
+
+
+def limit_refresh(request: Request):
+    enforce([(refresh_ip_limiter, client_ip(request))])
@@ -1,19 +1,22 @@
 # backend/apps/auth/routes.py
 from datetime import datetime # Import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from typing import Annotated # Use Annotated for Depends with OAuth2
 from pydantic import EmailStr # Use EmailStr for email validation
 
 # Import necessary functions and schemas from our modules
 from config.logging_util import get_logger
-from utils.db_utils import get_db_connection
+from utils.db_utils import db_connection
 from apps.auth.services import (
     authenticate_user, UserNotFound, InvalidPassword,
     get_user_by_email as service_get_user_by_email,
     blacklist_token, is_token_blacklisted # Import is_token_blacklisted
 )
-from apps.auth.security import create_access_token, create_refresh_token, decode_token
+from apps.auth.security import (
+    create_access_token, create_refresh_token, decode_token, decode_token_data, forget_token, get_public_jwks
+)
+from apps.auth.rate_limit import limit_login, limit_refresh
 from apps.auth.schemas import TokenData, UserOut, Token, RefreshTokenRequest, AccessTokenResponse, LogoutRequest # Import new schemas
 from config.settings import get_token_expiry_by_role
 
@@ -39,14 +42,10 @@ async def get_current_token_data(token: Annotated[str, Depends(oauth2_scheme)])
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
-    if payload is None: # decode_token returns None on JWTError
+    # Cached per token until its exp: repeat tokens skip signature verification and TokenData validation
+    token_data = decode_token_data(token)
+    if token_data is None: # Invalid signature, expired, or payload structure is wrong
         raise credentials_exception
-    try:
-        # Validate payload structure using TokenData schema
-        token_data = TokenData(**payload)
-    except Exception: # Catch potential Pydantic validation errors or missing keys
-         raise credentials_exception
 
     # Add check for token type if necessary (e.g., ensure it's an access token)
     if token_data.type != "access":
@@ -88,6 +87,13 @@ async def get_current_active_user(
     #     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User account not verified")
     return UserOut(**user_in_db.model_dump())
 
+@router.get("/jwks.json")
+async def jwks():
+    """
+    Public JWK Set for verifying tokens without the signing key (empty for HS* algorithms).
+    """
+    return get_public_jwks()
+
 @router.post("/send-verification-email", status_code=status.HTTP_200_OK)
 async def send_verification_email(
     current_user: Annotated[UserOut, Depends(get_current_active_user)]
@@ -123,11 +129,14 @@ async def reset_password(email: EmailStr):
 
 @router.post('/login', response_model=Token) # Use Token response model
 async def login_for_access_token(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ):
     """
     Logs in a user using email/password form data and returns an access token.
+    Attempts beyond the per-IP or per-account rate limit get 429 + Retry-After before any DB or bcrypt work.
     """
+    limit_login(request, form_data.username)
     try:
         # form_data.username contains the email
         user = await authenticate_user(form_data.username, form_data.password)
@@ -186,11 +195,13 @@ async def admin_test_route(
 
 @router.post("/refresh", response_model=AccessTokenResponse)
 async def refresh_access_token(
+    request: Request,
     refresh_request: RefreshTokenRequest
 ):
     """
-    Refreshes the access token using a valid refresh token.
+    Refreshes the access token using a valid refresh token (rate limited per IP, like login).
     """
+    limit_refresh(request)
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate refresh token",
@@ -247,7 +258,8 @@ async def refresh_access_token(
 async def logout(
     logout_payload: LogoutRequest, # Expect refresh token in request body
     access_token_data: Annotated[TokenData, Depends(get_current_token_data)], # Validate access token first
-    db = Depends(get_db_connection)
+    access_token: Annotated[str, Depends(oauth2_scheme)],
+    db = Depends(db_connection("auth"))
 ):
     """
     Endpoint to logout user by blacklisting both access and refresh tokens.
@@ -297,6 +309,10 @@ async def logout(
     else:
         logger.warning(f"Invalid or malformed refresh token provided during logout for user {access_token_data.sub}. Could not blacklist.")
 
+    # 3. Drop both tokens from this worker's verification cache
+    forget_token(access_token)
+    forget_token(logout_payload.refresh_token)
+
     # Note: The overall endpoint will still return 204 even if one of the blacklisting operations fails internally,
     # as long as no HTTPException is explicitly raised to stop the process.
     # This is a design choice: prioritize completing logout flow vs. strict error on partial failure.
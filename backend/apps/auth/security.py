@@ -1,23 +1,146 @@
 # backend/apps/auth/security.py
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
+import hashlib
+import os
+import time
+from typing import Optional
 import uuid
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 # Import necessary functions and schemas from our modules
 from config.logging_util import get_logger
-from config.settings import settings 
+from config.settings import settings
+from apps.auth.schemas import TokenData
 
 # Initialize logger
 logger = get_logger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto") # Use the same context
+# Algorithms signed with a private key and verifiable with the public key alone
+ASYMMETRIC_ALGORITHM_PREFIXES = ("RS", "ES", "PS")
+
+# passlib/bcrypt and jose (with its cryptography backend) are imported on first use rather than
+# at module import: they are a large share of worker boot time and most requests never hash passwords.
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto") # Use the same context
+
+
+def is_asymmetric_algorithm(algorithm: str = None) -> bool:
+    return (algorithm or settings.JWT_ALGORITHM).upper().startswith(ASYMMETRIC_ALGORITHM_PREFIXES)
+
+
+def _read_key_material(value: Optional[str], setting_name: str) -> str:
+    """Accepts either PEM content or a path to a PEM file."""
+    if not value:
+        raise RuntimeError(f"{setting_name} must be set when JWT_ALGORITHM is {settings.JWT_ALGORITHM}.")
+    if "-----BEGIN" in value:
+        return value.replace("\\n", "\n")  # Allow single-line PEM values in .env files
+    with open(os.path.expanduser(value)) as f:
+        return f.read()
+
+
+# Prepared keys: parsing a PEM (or even wrapping an HMAC secret) on every request is wasted CPU,
+# so the jose Key objects are built once per process and reused for every sign/verify call.
+@lru_cache(maxsize=1)
+def get_signing_key():
+    from jose import jwk
+    if is_asymmetric_algorithm():
+        return jwk.construct(_read_key_material(settings.JWT_PRIVATE_KEY, "JWT_PRIVATE_KEY"), settings.JWT_ALGORITHM)
+    return jwk.construct(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+
+
+@lru_cache(maxsize=1)
+def get_verification_key():
+    from jose import jwk
+    if not is_asymmetric_algorithm():
+        return get_signing_key()
+    if settings.JWT_PUBLIC_KEY:
+        return jwk.construct(_read_key_material(settings.JWT_PUBLIC_KEY, "JWT_PUBLIC_KEY"), settings.JWT_ALGORITHM)
+    return get_signing_key().public_key()
+
+
+@lru_cache(maxsize=1)
+def get_key_id() -> Optional[str]:
+    """`kid` header for asymmetric tokens: JWT_KEY_ID, or a digest of the public key."""
+    if not is_asymmetric_algorithm():
+        return None
+    if settings.JWT_KEY_ID:
+        return settings.JWT_KEY_ID
+    public_pem = get_verification_key().to_pem()
+    return hashlib.sha256(public_pem).hexdigest()[:16]
+
+
+def get_public_jwks() -> dict:
+    """JWK Set with the public verification key (empty for shared-secret algorithms)."""
+    if not is_asymmetric_algorithm():
+        return {"keys": []}
+    jwk_dict = get_verification_key().to_dict()
+    jwk_dict.update({"kid": get_key_id(), "use": "sig", "alg": settings.JWT_ALGORITHM})
+    return {"keys": [jwk_dict]}
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of recently verified tokens, keyed by the SHA-256 digest of the token
+    (fixed 32-byte keys, and raw bearer tokens are not kept in memory).
+    An entry is served until the token's own `exp`, so a repeat token skips signature
+    verification and claim parsing entirely; expired entries are dropped on access.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, list]" = OrderedDict()  # digest -> [exp, payload, TokenData | None]
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[list]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, token: str, payload: dict) -> Optional[list]:
+        exp = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return None
+        entry = [exp, payload, None]
+        self._entries[self._key(token)] = entry
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, token: str):
+        self._entries.pop(self._key(token), None)
+
+
+# Per-process cache of verified tokens
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def _encode(to_encode: dict) -> str:
+    from jose import jwt
+    headers = {"kid": get_key_id()} if is_asymmetric_algorithm() else None
+    return jwt.encode(to_encode, get_signing_key(), algorithm=settings.JWT_ALGORITHM, headers=headers)
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=30)):
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex}) # Add jti claim
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm) # Use settings
+    return _encode(to_encode)
 
 def create_refresh_token(data: dict):
     """Creates a refresh token with a longer expiry."""
@@ -25,16 +148,47 @@ def create_refresh_token(data: dict):
     # Use refresh token expiry from settings
     expire = datetime.utcnow() + settings.refresh_token_expires
     to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex}) # Add jti claim
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return _encode(to_encode)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password) # Use pwd_context
+    return get_pwd_context().verify(plain_password, hashed_password) # Use pwd_context
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password) # Use pwd_context
+    return get_pwd_context().hash(password) # Use pwd_context
 
-def decode_token(token: str):
+def _decode_entry(token: str) -> Optional[list]:
+    """Cache lookup, falling back to full verification (and caching the result)."""
+    entry = token_cache.get(token)
+    if entry is not None:
+        return entry
+    from jose import JWTError, jwt
     try:
-        return jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]) # Use settings
+        payload = jwt.decode(token, get_verification_key(), algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
         return None
+    return token_cache.put(token, payload) or [payload.get("exp"), payload, None]
+
+def decode_token(token: str):
+    """Returns the verified claims (a copy, safe to modify) or None if the token is invalid/expired."""
+    entry = _decode_entry(token)
+    return dict(entry[1]) if entry is not None else None
+
+def decode_token_data(token: str) -> Optional[TokenData]:
+    """
+    Returns the validated TokenData for a token, or None if the token or its claims are invalid.
+    The TokenData instance is cached with the token, so repeat requests skip pydantic validation too;
+    treat it as read-only.
+    """
+    entry = _decode_entry(token)
+    if entry is None:
+        return None
+    if entry[2] is None:
+        try:
+            entry[2] = TokenData(**entry[1])
+        except Exception:
+            return None
+    return entry[2]
+
+def forget_token(token: str):
+    """Evicts a token from the verification cache (e.g. on logout)."""
+    token_cache.invalidate(token)
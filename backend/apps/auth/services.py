@@ -1,4 +1,5 @@
 # backend/apps/auth/services.py
+import asyncio
 from datetime import datetime
 import asyncpg
 from fastapi import HTTPException, status
@@ -6,7 +7,7 @@ from typing import Union
 
 # Import necessary functions and schemas from our modules
 from config.logging_util import get_logger
-from utils.db_utils import fetch_one, get_db_connection
+from utils.db_utils import fetch_one, acquire_connection
 from apps.auth.security import verify_password
 from apps.auth.schemas import UserOut, UserInDB
 
@@ -39,9 +40,8 @@ class InvalidPassword(Exception):
 #                         NOW() is common for PostgreSQL):
 # DELETE FROM token_blacklist WHERE expires_at < NOW();
 #
-# This cleanup can be implemented as:
-# - A cron job running at regular intervals (e.g., daily).
-# - A scheduled task within the application if using a task scheduler (e.g., APScheduler, Celery).
+# This cleanup runs as the `token_cleanup` job (see main.py and config.tasks.JobScheduler),
+# on exactly one worker per interval, deleting in bounded batches via delete_expired_tokens().
 #
 # Regularly cleaning this table ensures optimal performance and manages database size.
 
@@ -49,17 +49,41 @@ async def is_token_blacklisted(jti: str):
     """
     Checks if a token (by jti) is blacklisted in the database.
     """
-    conn = None
     try:
-        conn = await get_db_connection()
-        result = await fetch_one(conn, "SELECT jti FROM token_blacklist WHERE jti = $1", jti)
+        async with acquire_connection("auth") as conn:
+            result = await fetch_one(conn, "SELECT jti FROM token_blacklist WHERE jti = $1", jti)
         return result is not None # Returns True if jti found (blacklisted)
     except Exception as e:
         logger.error(f"Database error checking token blacklist: {e}")
         return False # Assume not blacklisted on DB error for safety (or raise exception)
-    finally:
-            if conn:
-                await conn.close()
+
+
+async def delete_expired_tokens(batch_size: int, pause_s: float = 0.05) -> int:
+    """
+    Deletes expired blacklist entries in batches of at most `batch_size` rows, each batch in its
+    own short transaction, so row locks and WAL bursts stay small on a large table.
+    Concurrent lookups/inserts are never blocked for long. Returns the number of rows deleted.
+    """
+    total = 0
+    while True:
+        async with acquire_connection() as conn:  # Background job: default pool, not the login pool
+            status = await conn.execute(
+                """
+                DELETE FROM token_blacklist
+                WHERE jti IN (
+                    SELECT jti FROM token_blacklist
+                    WHERE expires_at < NOW()
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                )
+                """,
+                batch_size
+            )
+        deleted = int(status.split()[-1])  # asyncpg returns the command tag, e.g. "DELETE 5000"
+        total += deleted
+        if deleted < batch_size:
+            return total
+        await asyncio.sleep(pause_s)  # Yield to other work between batches
 
 
 async def blacklist_token(jti: str, expires_at: datetime, db: any):
@@ -88,9 +112,7 @@ class InvalidPassword(Exception):
 
 async def get_user_by_email(email: str) -> Union[UserInDB, None]:
     """Fetches a user from the database by email and returns UserInDB object."""
-    conn = None
-    try:
-        conn = await get_db_connection()
+    async with acquire_connection("auth") as conn:
         user_row = await fetch_one(
             conn,
             """
@@ -109,9 +131,6 @@ async def get_user_by_email(email: str) -> Union[UserInDB, None]:
             user_data['role'] = user_data.pop('role_name')
             return UserInDB(**user_data)
         return None
-    finally:
-        if conn:
-            await conn.close()
 
 
 async def authenticate_user(email: str, password: str) -> UserOut:
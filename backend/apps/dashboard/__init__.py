@@ -0,0 +1 @@
+# backend\apps\dashboard\__init__.py
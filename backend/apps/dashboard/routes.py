@@ -0,0 +1,31 @@
+# backend/apps/dashboard/routes.py
+from typing import Annotated
+from fastapi import APIRouter, Depends, Request
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from utils.responses import json_response
+from apps.auth.routes import get_current_token_data
+from apps.auth.schemas import TokenData
+from apps.dashboard.schemas import BatchRequest
+from apps.dashboard.services import run_batch
+
+# No prefix here: config.routes mounts this router under /dashboard
+router = APIRouter(tags=["Dashboard"])
+
+# Initialize logger
+logger = get_logger(__name__)
+
+
+@router.post("/batch")
+async def batch(
+    request: Request,
+    body: BatchRequest,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)]
+):
+    """
+    Several dashboard reads in one round trip: `{"queries": {"key": {"resource": "checks", "url_id": 1}, ...}}`.
+    The token is verified once; the sub-queries run concurrently on pooled connections and their results
+    come back under the same keys, each with its own status (one failing query does not fail the batch).
+    """
+    return await json_response(request, {"results": await run_batch(body.queries, token_data)})
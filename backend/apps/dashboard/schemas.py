@@ -0,0 +1,73 @@
+# backend/apps/dashboard/schemas.py
+from datetime import datetime
+from typing import Annotated, Dict, List, Literal, Optional, Union
+from uuid import UUID
+from pydantic import BaseModel, Field
+
+from config.settings import settings
+
+
+class MeQuery(BaseModel):
+    resource: Literal["me"]
+
+
+class StatusQuery(BaseModel):
+    resource: Literal["status"]
+    include_disabled: bool = False
+
+
+class ChecksQuery(BaseModel):
+    resource: Literal["checks"]
+    url_id: int
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    limit: Optional[int] = Field(default=None, gt=0)
+    layout: Literal["columnar", "rows"] = "columnar"
+
+
+class CertificatesQuery(BaseModel):
+    resource: Literal["certificates"]
+    expiring_within_days: Optional[int] = Field(default=None, ge=0)
+
+
+class AnomaliesQuery(BaseModel):
+    resource: Literal["anomalies"]
+    hours: int = Field(default=24, ge=1, le=24 * 31)
+    include_normal: bool = False
+
+
+class IncidentsQuery(BaseModel):
+    resource: Literal["incidents"]
+    hours: int = Field(default=24, ge=1, le=24 * 31)
+    open_only: bool = False
+
+
+class IncidentQuery(BaseModel):
+    resource: Literal["incident"]
+    incident_id: UUID
+
+
+class SlaQuery(BaseModel):
+    resource: Literal["sla"]
+    month: Optional[str] = None
+    url_id: Optional[List[int]] = None
+
+
+class MaintenanceQuery(BaseModel):
+    resource: Literal["maintenance"]
+    days: int = Field(default=31, ge=0)
+
+
+# One sub-query: `resource` names the single endpoint it stands for, the other fields are that endpoint's parameters
+BatchQuery = Annotated[
+    Union[MeQuery, StatusQuery, ChecksQuery, CertificatesQuery, AnomaliesQuery, IncidentsQuery, IncidentQuery,
+          SlaQuery, MaintenanceQuery],
+    Field(discriminator="resource"),
+]
+
+
+class BatchRequest(BaseModel):
+    # Client-chosen key -> sub-query; results come back under the same keys
+    queries: Dict[Annotated[str, Field(max_length=64)], BatchQuery] = Field(
+        min_length=1, max_length=settings.BATCH_MAX_QUERIES
+    )
@@ -0,0 +1,124 @@
+# backend/apps/dashboard/services.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from asyncpg import Connection
+from fastapi import HTTPException, status
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.database import database
+from config.settings import settings
+from utils.responses import records_to_columns
+from apps.auth.schemas import TokenData
+from apps.auth.services import get_user_by_email
+from apps.monitoring.services import (
+    get_status_board, get_check_series, get_certificates, get_anomalies, get_incidents, get_incident, SERIES_COLUMNS
+)
+from apps.monitoring.sla import get_maintenance_windows, get_sla_report, parse_month
+from apps.dashboard.schemas import BatchQuery
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Each handler returns the body its single endpoint would (same shape, so clients parse both alike)
+Handler = Callable[[Optional[Connection], Any, TokenData], Awaitable[Any]]
+
+
+async def _me(conn, query, token_data: TokenData):
+    user = await get_user_by_email(token_data.sub)  # Its own connection from the "auth" pool
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user.model_dump(exclude={"password"})
+
+
+async def _status(conn, query, token_data):
+    records = await get_status_board(conn, enabled_only=not query.include_disabled)
+    return {"count": len(records), "urls": records}
+
+
+async def _checks(conn, query, token_data):
+    end = query.end or datetime.now(timezone.utc)
+    start = query.start or end - timedelta(hours=24)
+    records = await get_check_series(conn, query.url_id, start, end, query.limit)
+    series = records_to_columns(records, SERIES_COLUMNS) if query.layout == "columnar" else records
+    return {"url_id": query.url_id, "start": start, "end": end, "series": series}
+
+
+async def _certificates(conn, query, token_data):
+    records = await get_certificates(conn, query.expiring_within_days)
+    return {"count": len(records), "certificates": records}
+
+
+async def _anomalies(conn, query, token_data):
+    records = await get_anomalies(conn, datetime.now(timezone.utc) - timedelta(hours=query.hours), not query.include_normal)
+    return {"count": len(records), "anomalies": records}
+
+
+async def _incidents(conn, query, token_data):
+    records = await get_incidents(conn, datetime.now(timezone.utc) - timedelta(hours=query.hours), query.open_only)
+    return {"count": len(records), "incidents": records}
+
+
+async def _incident(conn, query, token_data):
+    incident = await get_incident(conn, query.incident_id)
+    if incident is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found")
+    return incident
+
+
+async def _sla(conn, query, token_data):
+    try:
+        month_start = parse_month(query.month) if query.month else datetime.now(timezone.utc).date().replace(day=1)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="month must be YYYY-MM")
+    report = await get_sla_report(conn, month_start, query.url_id)
+    return {**report, "count": len(report["reports"])}
+
+
+async def _maintenance(conn, query, token_data):
+    records = await get_maintenance_windows(conn, datetime.now(timezone.utc) - timedelta(days=query.days))
+    return {"count": len(records), "maintenance_windows": records}
+
+
+# resource -> (handler, pool, readonly); pool None: the handler needs no connection from the batch
+RESOURCES: Dict[str, Tuple[Handler, Optional[str], bool]] = {
+    "me": (_me, None, False),
+    "status": (_status, "analytics", True),
+    "checks": (_checks, "analytics", True),
+    "certificates": (_certificates, "analytics", True),
+    "anomalies": (_anomalies, "analytics", True),
+    "incidents": (_incidents, "analytics", True),
+    "incident": (_incident, "analytics", True),
+    "sla": (_sla, "analytics", False),  # Caches finished months in sla_reports
+    "maintenance": (_maintenance, "analytics", True),
+}
+
+
+async def run_batch(queries: Dict[str, BatchQuery], token_data: TokenData) -> Dict[str, dict]:
+    """
+    Runs the sub-queries of one batch concurrently, each on its own pooled connection, at most
+    BATCH_CONCURRENCY at a time so one batch cannot take the whole analytics pool. A failing sub-query
+    only fails its own entry: {"status": 200, "body": ...} or {"status": 4xx/5xx, "detail": ...}.
+    """
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(key: str, query: BatchQuery) -> dict:
+        handler, pool, readonly = RESOURCES[query.resource]
+        try:
+            async with semaphore:
+                if pool is None:
+                    body = await handler(None, query, token_data)
+                else:
+                    async with database.acquire(pool, readonly=readonly) as conn:
+                        body = await handler(conn, query, token_data)
+            return {"status": status.HTTP_200_OK, "body": body}
+        except HTTPException as e:
+            return {"status": e.status_code, "detail": e.detail}
+        except Exception as e:
+            logger.error(f"Batch query {key!r} ({query.resource}) failed: {e}", exc_info=True)
+            return {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": "Internal server error"}
+
+    results = await asyncio.gather(*(run(key, query) for key, query in queries.items()))
+    return dict(zip(queries, results))
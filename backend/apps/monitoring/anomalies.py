@@ -0,0 +1,206 @@
+# backend/apps/monitoring/anomalies.py
+import argparse
+import asyncio
+import itertools
+import time
+import warnings
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import setup_logging, get_logger
+from config.database import database, Database
+from config.settings import settings
+from apps.monitoring.checks import UP_SQL
+from apps.monitoring.runs import check_samples_sql
+
+# Initialize logger
+logger = get_logger(__name__)
+
+HOUR = timedelta(hours=1)
+# Rollups of the last hours are recomputed on every run, for results that arrive late (spill log replay)
+REROLL_HOURS = 2
+# Scales a median absolute deviation to the standard deviation of normally distributed data
+MAD_TO_SIGMA = 1.4826
+# The scale never drops below this fraction of the expected latency, so flat series are not flagged for jitter
+MIN_SCALE_RATIO = 0.05
+
+ANOMALY_COLUMNS = ("time", "url_id", "value_ms", "expected_ms", "scale_ms", "ewma_ms", "seasonal", "score", "is_anomaly")
+
+
+def score_hour(matrix, ewma_alpha: float = 0.1, min_samples: int = 24, min_seasonal_samples: int = 3,
+               min_scale_ms: float = 5.0, threshold: float = 3.5) -> dict:
+    """
+    Scores the last column of `matrix` (URLs x hours of median latency, NaN where there was no data)
+    against baselines built from the columns before it, for all URLs at once:
+
+    *   seasonal: median and MAD of the same hour of day on previous days, when there are at least
+        `min_seasonal_samples` of them; otherwise median and MAD of the whole history;
+    *   trend: EWMA of the history (`ewma_alpha` per hour).
+
+    score = min(value - baseline, value - EWMA) / scale, with scale = MAD * 1.4826 floored at
+    `min_scale_ms` and 5% of the baseline: an hour is anomalous (score >= `threshold`) only if it is
+    slow for that time of day and relative to the recent level. URLs with fewer than `min_samples`
+    hours of history or no value in the scored hour get NaN scores.
+    """
+    import numpy as np
+
+    history, current = matrix[:, :-1], matrix[:, -1]
+    # Same hour of day on previous days: every 24th column counting back from the scored hour
+    same_hour = history[:, ::-1][:, 23::24]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN rows simply yield NaN
+        median = np.nanmedian(history, axis=1)
+        mad = np.nanmedian(np.abs(history - median[:, None]), axis=1) * MAD_TO_SIGMA
+        seasonal_median = np.nanmedian(same_hour, axis=1)
+        seasonal_mad = np.nanmedian(np.abs(same_hour - seasonal_median[:, None]), axis=1) * MAD_TO_SIGMA
+
+    seasonal = np.count_nonzero(~np.isnan(same_hour), axis=1) >= min_seasonal_samples
+    expected = np.where(seasonal, seasonal_median, median)
+    scale = np.fmax(np.where(seasonal, seasonal_mad, mad), np.fmax(min_scale_ms, MIN_SCALE_RATIO * expected))
+
+    # EWMA over the hours, skipping gaps: one vector update per hour instead of a loop per URL
+    ewma = np.full(len(matrix), np.nan)
+    for column in history.T:
+        present = ~np.isnan(column)
+        ewma = np.where(present, np.where(np.isnan(ewma), column, ewma_alpha * column + (1 - ewma_alpha) * ewma), ewma)
+
+    score = (current - expected) / scale
+    score = np.where(np.isnan(ewma), score, np.fmin(score, (current - ewma) / scale))
+    valid = ~np.isnan(current) & (np.count_nonzero(~np.isnan(history), axis=1) >= min_samples)
+    score = np.where(valid, score, np.nan)
+    return {"expected": expected, "scale": scale, "ewma": ewma, "seasonal": seasonal, "score": score,
+            "valid": valid, "is_anomaly": valid & (score >= threshold)}
+
+
+async def roll_up(conn, start: datetime, end: datetime) -> str:
+    """Adds the hourly rollups of check_results in [start, end) that are missing (and recomputes recent ones)."""
+    last = await conn.fetchval("SELECT max(hour) FROM latency_rollups WHERE hour >= $1", start)
+    since = start if last is None else max(start, min(last + HOUR, end - REROLL_HOURS * HOUR))
+    return await conn.execute(
+        f"""
+        INSERT INTO latency_rollups (url_id, hour, checks, failures, p50_ms)
+        SELECT url_id, date_trunc('hour', time), count(*), count(*) FILTER (WHERE NOT {UP_SQL}),
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY response_time_ms) FILTER (WHERE {UP_SQL})
+        FROM ({check_samples_sql("TRUE", "$1", "$2")}) c
+        GROUP BY 1, 2
+        ON CONFLICT (url_id, hour) DO UPDATE
+        SET checks = EXCLUDED.checks, failures = EXCLUDED.failures, p50_ms = EXCLUDED.p50_ms
+        """,
+        since, end
+    )
+
+
+# COPY ... (FORMAT binary) of (url_id BIGINT, hour TIMESTAMPTZ, p50_ms REAL) without NULLs: fixed-size rows
+# (field count, then length + big-endian value per field) that NumPy reads in place, with no per-row Python
+ROLLUP_ROW = [("fields", ">i2"), ("url_id_len", ">i4"), ("url_id", ">i8"), ("hour_len", ">i4"), ("hour", ">i8"),
+              ("p50_len", ">i4"), ("p50_ms", ">f4")]
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\0"
+PG_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)  # Binary timestamps are microseconds since this
+
+
+def parse_binary_copy(buffer: bytes, row_fields):
+    """Rows of a binary COPY with fixed-size fields as a NumPy structured array."""
+    import numpy as np
+
+    dtype = np.dtype(row_fields)
+    if not buffer.startswith(COPY_SIGNATURE):
+        raise ValueError("Not a binary COPY stream")
+    offset = len(COPY_SIGNATURE) + 4
+    offset += 4 + int.from_bytes(buffer[offset:offset + 4], "big")  # Header extension
+    count, trailer = divmod(len(buffer) - offset - 2, dtype.itemsize)
+    if trailer:
+        raise ValueError("Binary COPY rows are not of the expected fixed size")
+    rows = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+    if count and (rows["fields"] != len(row_fields) // 2).any():
+        raise ValueError("Unexpected field count in binary COPY rows")
+    return rows
+
+
+async def load_matrix(conn, start: datetime, hours: int):
+    """Rollups of every URL in `hours` hours from `start` as (url_ids, URLs x hours matrix with NaN gaps)."""
+    import numpy as np
+
+    chunks = []
+
+    async def collect(chunk):
+        chunks.append(chunk)
+
+    await conn.copy_from_query(
+        """
+        SELECT url_id, hour, p50_ms FROM latency_rollups
+        WHERE hour >= $1 AND hour < $2 AND p50_ms IS NOT NULL
+        """,
+        start, start + hours * HOUR, output=collect, format="binary"
+    )
+    rows = parse_binary_copy(b"".join(chunks), ROLLUP_ROW)
+    url_ids, url_index = np.unique(rows["url_id"], return_inverse=True)
+    start_us = (start - PG_EPOCH) // timedelta(microseconds=1)
+    columns = (rows["hour"] - start_us) // (3600 * 1_000_000)
+    matrix = np.full((len(url_ids), hours), np.nan)
+    matrix[url_index, columns] = rows["p50_ms"]
+    return url_ids, matrix
+
+
+async def detect_anomalies(db: Database, hour: Optional[datetime] = None) -> dict:
+    """
+    Scores one hour (default: the last complete one) for the whole fleet: rolls up new check results,
+    loads ANOMALY_BASELINE_DAYS of hourly medians into one NumPy matrix, scores it in a worker thread
+    and replaces that hour's rows in `latency_anomalies` with one COPY. Safe to run repeatedly.
+    """
+    started = time.perf_counter()
+    hour = (hour or datetime.now(timezone.utc) - HOUR).replace(minute=0, second=0, microsecond=0)
+    hours = settings.ANOMALY_BASELINE_DAYS * 24 + 1
+    start = hour - (hours - 1) * HOUR
+    async with db.acquire("analytics") as conn:
+        await roll_up(conn, start, hour + HOUR)
+        url_ids, matrix = await load_matrix(conn, start, hours)
+        loaded = time.perf_counter()
+        scores = await asyncio.to_thread(
+            score_hour, matrix,
+            ewma_alpha=settings.ANOMALY_EWMA_ALPHA,
+            min_samples=settings.ANOMALY_MIN_SAMPLES,
+            min_seasonal_samples=settings.ANOMALY_MIN_SEASONAL_SAMPLES,
+            min_scale_ms=settings.ANOMALY_MIN_SCALE_MS,
+            threshold=settings.ANOMALY_SCORE_THRESHOLD,
+        )
+        computed = time.perf_counter()
+        valid = scores["valid"]
+        ewma = scores["ewma"][valid]
+        records = list(zip(
+            itertools.repeat(hour), url_ids[valid].tolist(), matrix[valid, -1].tolist(),
+            scores["expected"][valid].tolist(), scores["scale"][valid].tolist(),
+            [None if v != v else v for v in ewma.tolist()],  # NaN -> NULL
+            scores["seasonal"][valid].tolist(), scores["score"][valid].tolist(), scores["is_anomaly"][valid].tolist(),
+        ))
+        async with conn.transaction():
+            await conn.execute("DELETE FROM latency_anomalies WHERE time = $1", hour)
+            await conn.copy_records_to_table("latency_anomalies", records=records, columns=ANOMALY_COLUMNS)
+            await conn.execute("DELETE FROM latency_anomalies WHERE time < $1",
+                               hour - timedelta(days=settings.ANOMALY_RETENTION_DAYS))
+            await conn.execute("DELETE FROM latency_rollups WHERE hour < $1", start - 24 * HOUR)
+    summary = {
+        "hour": hour.isoformat(), "urls": len(url_ids), "scored": len(records),
+        "anomalies": int(scores["is_anomaly"].sum()),
+        "load_ms": round((loaded - started) * 1000, 1), "compute_ms": round((computed - loaded) * 1000, 1),
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info("Latency anomaly detection finished.", **summary)
+    return summary
+
+
+async def main(hour: Optional[datetime]):
+    await database.initialize()
+    try:
+        print(await detect_anomalies(database, hour))
+    finally:
+        await database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score one hour of latency for every monitored URL.")
+    parser.add_argument("--hour", type=datetime.fromisoformat, default=None,
+                        help="Hour to score, ISO 8601 with offset (default: the last complete hour)")
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(main(args.hour))
@@ -0,0 +1,256 @@
+# backend/apps/monitoring/assertions.py
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Bytes of the previous chunk kept for regex matches that straddle a chunk boundary
+# (patterns matching longer spans than this are not supported)
+REGEX_OVERLAP_BYTES = 4096
+
+_MISSING = object()
+
+
+@dataclass
+class AssertionResult:
+    name: str
+    passed: bool
+    message: Optional[str] = None
+
+
+class BodyAssertion:
+    """
+    Base class: consumes the body chunk by chunk and decides as early as it can.
+    `decided` turns True once more bytes cannot change the outcome; `finish()` is called at end of body.
+    """
+
+    name = "assertion"
+
+    def __init__(self):
+        self.decided = False
+        self.passed = False
+        self.message: Optional[str] = None
+
+    def feed(self, chunk: bytes):
+        raise NotImplementedError
+
+    def finish(self):
+        self.decided = True
+
+    def result(self) -> AssertionResult:
+        return AssertionResult(self.name, self.passed, self.message)
+
+    def _decide(self, passed: bool, message: Optional[str] = None):
+        self.decided, self.passed, self.message = True, passed, message
+
+
+class RegexAssertion(BodyAssertion):
+    """`{"type": "regex", "pattern": "...", "expect": "present" | "absent"}` (bytes regex on the raw body)."""
+
+    def __init__(self, pattern: str, expect: str = "present"):
+        super().__init__()
+        self.name = f"regex:{pattern}"
+        self.pattern = re.compile(pattern.encode())
+        self.expect_present = expect != "absent"
+        self._tail = b""
+
+    def feed(self, chunk: bytes):
+        window = self._tail + chunk
+        if self.pattern.search(window):
+            # Found: "present" passes and "absent" fails right away; the rest of the body is irrelevant
+            self._decide(self.expect_present, None if self.expect_present else "Pattern found")
+            return
+        self._tail = window[-REGEX_OVERLAP_BYTES:]
+
+    def finish(self):
+        if not self.decided:
+            self._decide(not self.expect_present, "Pattern not found" if self.expect_present else None)
+
+
+class JsonPathAssertion(BodyAssertion):
+    """
+    `{"type": "json_path", "path": "$.status", "equals": "ok"}` or `{"type": "json_path", "path": "$.items[*].id"}`
+    (existence only). Parsed incrementally with ijson; decided at the first matching value.
+    Supports dotted keys and `[*]` for any array element.
+    """
+
+    def __init__(self, path: str, equals: Any = _MISSING):
+        super().__init__()
+        import ijson
+        self.name = f"json_path:{path}"
+        self.prefix = self.path_to_prefix(path)
+        self.equals = equals
+        self._events = ijson.sendable_list()
+        self._parser = ijson.parse_coro(self._events, use_float=True)
+        self._seen_values: List[Any] = []
+
+    @staticmethod
+    def path_to_prefix(path: str) -> str:
+        path = path.strip()
+        if path.startswith("$"):
+            path = path[1:]
+        path = path.replace("[*]", ".item").replace("[]", ".item")
+        return ".".join(part for part in path.split(".") if part)
+
+    def feed(self, chunk: bytes):
+        try:
+            self._parser.send(chunk)
+        except Exception as e:  # ijson.JSONError and backend-specific errors
+            self._decide(False, f"Invalid JSON: {e}")
+            return
+        self._inspect()
+
+    def _inspect(self):
+        for prefix, event, value in self._events:
+            if prefix != self.prefix or event in ("end_map", "end_array", "map_key"):
+                continue
+            if self.equals is _MISSING:
+                self._decide(True)
+                break
+            if event in ("start_map", "start_array"):
+                continue
+            if value == self.equals:
+                self._decide(True)
+                break
+            if len(self._seen_values) < 3:
+                self._seen_values.append(value)
+        del self._events[:]
+
+    def finish(self):
+        if self.decided:
+            return
+        try:
+            self._parser.close()
+        except Exception as e:
+            self._decide(False, f"Invalid JSON: {e}")
+            return
+        self._inspect()
+        if not self.decided:
+            if self.equals is _MISSING or not self._seen_values:
+                self._decide(False, f"Path {self.prefix or '$'} not found")
+            else:
+                self._decide(False, f"Expected {self.equals!r}, got {self._seen_values[0]!r}")
+
+
+class ContentHashAssertion(BodyAssertion):
+    """
+    `{"type": "content_hash"}`: incremental BLAKE2b over the body (up to the probe's byte limit).
+    Never fails; reports whether the digest differs from the previous check's (`changed`).
+    """
+
+    name = "content_hash"
+
+    def __init__(self, previous_hash: Optional[str] = None):
+        super().__init__()
+        self.previous_hash = previous_hash
+        self._hasher = hashlib.blake2b(digest_size=16)
+        self.digest: Optional[str] = None
+
+    def feed(self, chunk: bytes):
+        self._hasher.update(chunk)
+
+    def finish(self):
+        self.digest = self._hasher.hexdigest()
+        self._decide(True)
+
+    @property
+    def changed(self) -> Optional[bool]:
+        if self.digest is None or self.previous_hash is None:
+            return None
+        return self.digest != self.previous_hash
+
+
+# Keys each assertion type accepts (besides "type")
+ASSERTION_KEYS = {
+    "regex": {"pattern", "expect"},
+    "json_path": {"path", "equals"},
+    "content_hash": set(),
+}
+REGEX_EXPECT = ("present", "absent")
+
+
+def validate_assertions(specs: Any):
+    """
+    Strict check of a URL's `assertions` JSON, run when the URL is saved: raises ValueError for
+    anything build_assertions() would skip or fail on (unknown type or key, missing or non-string
+    pattern/path, invalid regex, unknown `expect`).
+    """
+    if not isinstance(specs, list):
+        raise ValueError("assertions must be a list")
+    for index, spec in enumerate(specs):
+        where = f"assertions[{index}]"
+        if not isinstance(spec, dict):
+            raise ValueError(f"{where} must be an object")
+        kind = spec.get("type")
+        if kind not in ASSERTION_KEYS:
+            raise ValueError(f"{where}.type must be one of {', '.join(ASSERTION_KEYS)}, got {kind!r}")
+        unknown = set(spec) - ASSERTION_KEYS[kind] - {"type"}
+        if unknown:
+            raise ValueError(f"{where}: unknown key(s) {', '.join(sorted(unknown))} for a {kind} assertion")
+        for key in {"regex": ("pattern",), "json_path": ("path",)}.get(kind, ()):
+            if not isinstance(spec.get(key), str) or not spec[key]:
+                raise ValueError(f"{where}.{key} must be a non-empty string")
+        if kind == "regex":
+            if spec.get("expect", "present") not in REGEX_EXPECT:
+                raise ValueError(f"{where}.expect must be one of {', '.join(REGEX_EXPECT)}")
+            try:
+                re.compile(spec["pattern"].encode())
+            except re.error as e:
+                raise ValueError(f"{where}.pattern is not a valid regex: {e}")
+
+
+def build_assertions(specs: List[Dict[str, Any]], previous_hash: Optional[str] = None) -> List[BodyAssertion]:
+    """
+    Instantiates assertions from a URL's `assertions` JSON; invalid specs (saved before
+    validate_assertions() existed, or edited in the database) are logged and skipped.
+    """
+    assertions = []
+    for spec in specs or []:
+        kind = spec.get("type") if isinstance(spec, dict) else None
+        try:
+            if kind == "regex":
+                assertions.append(RegexAssertion(spec["pattern"], spec.get("expect", "present")))
+            elif kind == "json_path":
+                assertions.append(JsonPathAssertion(spec["path"], spec.get("equals", _MISSING)))
+            elif kind == "content_hash":
+                assertions.append(ContentHashAssertion(previous_hash))
+            else:
+                logger.warning(f"Unknown assertion type: {kind!r}")
+        except (KeyError, TypeError, AttributeError, ValueError, re.error) as e:
+            logger.warning(f"Invalid {kind} assertion {spec!r}: {e}")
+    return assertions
+
+
+class BodyInspector:
+    """
+    Runs a set of assertions over a streamed body. `feed()` returns False once every assertion
+    is decided, so the caller can stop reading (and close the connection) without downloading the rest.
+    """
+
+    def __init__(self, assertions: List[BodyAssertion]):
+        self.assertions = assertions
+        self._undecided = [a for a in assertions if not a.decided]
+        self.bytes_read = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        self.bytes_read += len(chunk)
+        for assertion in self._undecided:
+            assertion.feed(chunk)
+        self._undecided = [a for a in self._undecided if not a.decided]
+        return bool(self._undecided)
+
+    def finish(self) -> List[AssertionResult]:
+        for assertion in self._undecided:
+            assertion.finish()
+        self._undecided = []
+        return [assertion.result() for assertion in self.assertions]
+
+    @property
+    def content_hash(self) -> Optional[ContentHashAssertion]:
+        return next((a for a in self.assertions if isinstance(a, ContentHashAssertion)), None)
@@ -0,0 +1,149 @@
+# backend/apps/monitoring/checks.py
+import asyncio
+import importlib
+import pkgutil
+import socket
+import ssl
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Type
+from urllib.parse import urlsplit
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+
+if TYPE_CHECKING:
+    from apps.monitoring.engine import ProbeEngine, ProbeTarget
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Package scanned by load_plugins() for modules that register check types
+PLUGIN_PACKAGE = "plugins"
+# HTTP responses with a status from here up are failures (`http_error`), although a response arrived
+HTTP_ERROR_STATUS = 400
+# Whether a check_results row (or check sample) counts as up, for SLA, anomaly and incident logic alike.
+# The status test also covers rows stored before http checks reported `http_error`, and agents that
+# report `success` for any response
+UP_SQL = f"(result = 'success' AND (status_code IS NULL OR status_code < {HTTP_ERROR_STATUS}))"
+
+
+@dataclass
+class CheckOutcome:
+    """What a check type reports; the engine adds the timestamp, URL id and total duration."""
+    result: str = "success"
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    content_length: Optional[int] = None
+    content_changed: Optional[bool] = None
+    connect_ms: Optional[float] = None
+    peer_ip: Optional[str] = None  # Address connected to, for outage correlation (apps.monitoring.incidents)
+
+
+class CheckType:
+    """
+    A kind of check run by the ProbeEngine (`monitored_urls.check_type`).
+
+    One instance per engine; `check()` is called concurrently for many targets, bounded by the
+    engine's semaphore, and its outcome goes to the engine's shared writer. Subclasses implement
+    `check()` and register with @register_check_type. `run()` applies the engine timeout and maps
+    common network errors, so implementations can simply let them propagate; anything else becomes
+    a `check_error` result, so every check still writes a row. Subclasses that take options
+    override `validate_options()`, which the API calls before storing them.
+    """
+
+    name = ""
+    default_port: Optional[int] = None
+
+    def __init__(self, engine: "ProbeEngine"):
+        self.engine = engine
+
+    @classmethod
+    def validate_options(cls, options: Dict[str, Any]):
+        """Raises ValueError for `check_options` this type cannot run with."""
+        pass
+
+    async def check(self, target: "ProbeTarget") -> CheckOutcome:
+        raise NotImplementedError
+
+    async def run(self, target: "ProbeTarget") -> CheckOutcome:
+        try:
+            return await asyncio.wait_for(self.check(target), timeout=self.engine.timeout_s)
+        except asyncio.TimeoutError:
+            return CheckOutcome("timeout", f"No response within {self.engine.timeout_s}s")
+        except socket.gaierror as e:
+            return CheckOutcome("dns_error", str(e))
+        except ssl.SSLError as e:  # Includes certificate verification failures
+            return CheckOutcome("tls_error", str(e))
+        except (OSError, ValueError) as e:
+            return CheckOutcome("connection_failed", str(e))
+        except Exception as e:  # A bug or an unexpected reply (e.g. a malformed DNS message)
+            return check_error(e)
+
+    def host_port(self, target: "ProbeTarget"):
+        """(host, port) of a `scheme://host:port` target, falling back to the type's default port."""
+        parts = urlsplit(target.url)
+        port = parts.port or self.default_port
+        if not parts.hostname or port is None:
+            raise ValueError(f"Target {target.url!r} needs a host and port")
+        return parts.hostname, port
+
+
+def is_up(result: str, status_code: Optional[int]) -> bool:
+    """UP_SQL for one result."""
+    return result == "success" and (status_code is None or status_code < HTTP_ERROR_STATUS)
+
+
+def check_error(e: Exception) -> CheckOutcome:
+    return CheckOutcome("check_error", f"{type(e).__name__}: {e}")
+
+
+def option_type(options: Dict[str, Any], name: str, types, description: str):
+    """Raises ValueError unless `options[name]` is absent/None or an instance of `types` (bool is never an int)."""
+    value = options.get(name)
+    if value is not None and (not isinstance(value, types) or (isinstance(value, bool) and bool not in types)):
+        raise ValueError(f"check_options.{name} must be {description}")
+
+
+_check_types: Dict[str, Type[CheckType]] = {}
+
+
+def register_check_type(cls: Type[CheckType]) -> Type[CheckType]:
+    """Class decorator: makes a CheckType available to every engine under `cls.name`."""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} has no name")
+    _check_types[cls.name] = cls
+    return cls
+
+
+def get_check_types() -> Dict[str, Type[CheckType]]:
+    return dict(_check_types)
+
+
+def load_plugins(package: str = PLUGIN_PACKAGE):
+    """Imports every module of the plugin package so their @register_check_type decorators run."""
+    module = importlib.import_module(package)
+    for info in pkgutil.iter_modules(module.__path__, f"{package}."):
+        try:
+            importlib.import_module(info.name)
+        except Exception as e:
+            logger.error(f"Could not load plugin {info.name}: {e}")
+
+
+def load_check_types() -> Dict[str, Type[CheckType]]:
+    """Registers the built-in `http` type (apps.monitoring.engine) and every plugin; returns the registry."""
+    importlib.import_module("apps.monitoring.engine")
+    load_plugins()
+    return get_check_types()
+
+
+async def resolve(host: str, port: int):
+    """First TCP socket address for host:port, so checks can time the connect without DNS."""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    if not infos:
+        raise socket.gaierror(f"No address for {host}")
+    return infos[0][4]
+
+
+def elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
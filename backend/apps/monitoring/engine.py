@@ -0,0 +1,529 @@
+# backend/apps/monitoring/engine.py
+import asyncio
+import heapq
+import signal
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import aiohttp
+import orjson
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import setup_logging, get_logger
+from config.database import database, Database
+from config.settings import settings
+from apps.monitoring.assertions import BodyInspector, build_assertions
+from apps.monitoring.incidents import outage_correlator
+from apps.monitoring.checks import (
+    HTTP_ERROR_STATUS, CheckOutcome, CheckType, check_error, load_check_types, register_check_type
+)
+from apps.monitoring.tenants import FairQueue, TenantQuotas, UsageCounters, usage_counters
+from apps.monitoring.tls import (
+    CertificateCache, CertificateInfo, TLSAwareResponse, connect_timing_trace, new_connect_timing
+)
+from apps.monitoring.writer import CheckResultWriter, check_writer
+
+# Initialize logger
+logger = get_logger(__name__)
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass
+class ProbeTarget:
+    url_id: int
+    url: str
+    interval_s: float
+    owner_id: Optional[UUID] = None
+    check_type: str = "http"
+    options: Dict[str, Any] = field(default_factory=dict)
+    assertions: List[Dict[str, Any]] = field(default_factory=list)
+    content_hash: Optional[str] = None
+    tls_fingerprint: Optional[str] = None
+    resolved_ip: Optional[str] = None
+    resume_in_s: Optional[float] = None  # Time that was left until the next check at the last shutdown
+
+
+class ProbeEngine:
+    """
+    Checks every enabled monitored URL on its own interval and hands the results to a CheckResultWriter.
+
+    One scheduling loop keeps a heap of (next due time, url_id) and moves due checks into a per-tenant
+    FairQueue; a dispatch loop takes the fairest next check whenever one of `concurrency` slots frees up,
+    so one tenant's burst only delays its own checks. Checks of every type (`http` below, TCP/DNS/TLS
+    and others registered from `plugins/`, see apps.monitoring.checks) share those slots, and HTTP
+    checks share one aiohttp session (connection pooling, DNS cache). The target list is reloaded from
+    `monitored_urls` every `refresh_s` seconds, with tenant quotas applied (URL count, minimum interval);
+    with a `partition` the engine only checks its share of the URLs (one engine per process, see runner).
+    Bodies are only read when the URL has assertions, in chunks, and reading stops as soon as every
+    assertion is decided (or at `max_body_bytes`).
+    For https URLs the served certificate is looked up in a CertificateCache and only written to
+    `tls_certificates` / `url_tls_state` when a URL starts serving a different one; likewise the address
+    a check connected to is only written to `monitored_urls.resolved_ip` when it changes (it indexes
+    the URL for outage correlation, see apps.monitoring.incidents).
+    """
+
+    def __init__(self, db: Database, writer: CheckResultWriter, concurrency: int = 200, timeout_s: float = 10.0,
+                 max_body_bytes: int = 10 * 1024 * 1024, refresh_s: float = 60.0, cert_cache_size: int = 10000,
+                 usage: UsageCounters = usage_counters, usage_flush_s: float = 60.0, partition: Tuple[int, int] = (0, 1),
+                 clock: Callable[[], float] = time.monotonic):
+        self.db = db
+        self.clock = clock  # Due times; the event loop's clock (apps.monitoring.simulate runs one in virtual time)
+        self.partition = partition  # (index, count): only URLs with url_id % count == index (see apps.monitoring.runner)
+        self.writer = writer
+        self.concurrency = concurrency
+        self.timeout_s = timeout_s
+        self.max_body_bytes = max_body_bytes
+        self.refresh_s = refresh_s
+        self.targets: Dict[int, ProbeTarget] = {}
+        self.certificates = CertificateCache(cert_cache_size)
+        self.check_types: Dict[str, CheckType] = {}
+        self.quotas = TenantQuotas()
+        self.usage = usage
+        self.usage_flush_s = usage_flush_s
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._heap: List[tuple] = []
+        self._queue = FairQueue()
+        self._queued: Dict[int, float] = {}  # url_id -> due time, while waiting in the fair queue
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight: Dict[asyncio.Task, int] = {}  # Check task -> url_id
+        self._wakeup = asyncio.Event()
+        self.checks = 0
+        self.dropped_results = 0
+        self.skipped_backlogged = 0   # Due again while the previous run was still queued
+        self.dispatched = 0
+        self.dispatch_lag_total_s = 0.0  # Due time to start of the check, summed over dispatched checks
+        self.dispatch_lag_max_s = 0.0
+
+    # --- Targets ---
+
+    async def load_targets(self) -> Dict[int, ProbeTarget]:
+        await self.db.initialize()
+        async with self.db.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT u.id, u.url, u.interval_seconds, u.owner_id, u.check_type, u.check_options, u.assertions,
+                       u.content_hash, s.fingerprint, host(u.resolved_ip) AS resolved_ip,
+                       EXTRACT(EPOCH FROM p.next_run_at - p.saved_at)::FLOAT8 AS resume_in_s
+                FROM monitored_urls u
+                LEFT JOIN url_tls_state s ON s.url_id = u.id
+                LEFT JOIN probe_schedule p ON p.url_id = u.id
+                WHERE u.enabled
+                """
+            )
+            self.quotas = await TenantQuotas.load(conn)
+        allowed = self.quotas.allowed_urls((row["id"], row["owner_id"]) for row in rows)
+        index, count = self.partition
+        targets = {}
+        for row in rows:
+            # Quotas are applied over all URLs first, so every partition agrees on which ones are allowed
+            if row["id"] not in allowed or row["id"] % count != index:
+                continue
+            if row["check_type"] not in self.check_types:
+                logger.warning(f"Probe engine: skipping {row['url']}: unknown check type {row['check_type']!r}.")
+                continue
+            min_interval_s = self.quotas.get(row["owner_id"]).min_interval_s
+            targets[row["id"]] = ProbeTarget(
+                row["id"], row["url"], float(max(row["interval_seconds"], min_interval_s)),
+                owner_id=row["owner_id"],
+                check_type=row["check_type"],
+                options=orjson.loads(row["check_options"]) if row["check_options"] else {},
+                assertions=orjson.loads(row["assertions"]) if row["assertions"] else [],
+                content_hash=row["content_hash"],
+                tls_fingerprint=row["fingerprint"],
+                resolved_ip=row["resolved_ip"],
+                resume_in_s=row["resume_in_s"],
+            )
+        return targets
+
+    async def refresh_targets(self):
+        """
+        Applies added, removed and changed URLs. New URLs resume the schedule saved at the last shutdown
+        (the same time left until their next check), or else are spread over their first interval.
+        """
+        targets = await self.load_targets()
+        now = self.clock()
+        for url_id, target in targets.items():
+            current = self.targets.get(url_id)
+            if current is not None:
+                # In-memory hash, certificate and address are at least as recent
+                target.content_hash, target.tls_fingerprint = current.content_hash, current.tls_fingerprint
+                target.resolved_ip = current.resolved_ip
+            elif target.resume_in_s is not None:
+                heapq.heappush(self._heap, (now + min(max(target.resume_in_s, 0.0), target.interval_s), url_id))
+            else:
+                heapq.heappush(self._heap, (now + (url_id % 1000) / 1000 * target.interval_s, url_id))
+        self.targets = targets
+        self._wakeup.set()
+        logger.info(f"Probe engine: {len(targets)} target(s) loaded.")
+
+    # --- Lifecycle ---
+
+    async def open(self):
+        """Instantiates the check types and opens the shared HTTP session; enough to call check() directly."""
+        self.check_types = {name: cls(self) for name, cls in load_check_types().items()}
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+            trace_configs=[connect_timing_trace()],
+            response_class=TLSAwareResponse,
+            headers={"User-Agent": f"{settings.app_name}/{settings.app_version}"},
+        )
+        logger.info(f"Probe engine: check types {', '.join(sorted(self.check_types))}.")
+
+    async def start(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._wakeup = asyncio.Event()
+        self._queue = FairQueue()
+        self._queued = {}
+        await self.open()
+        await self.refresh_targets()
+        self._tasks = [
+            asyncio.create_task(self._schedule_loop(), name="probe-scheduler"),
+            asyncio.create_task(self._dispatch_loop(), name="probe-dispatcher"),
+            asyncio.create_task(self._refresh_loop(), name="probe-target-refresh"),
+            asyncio.create_task(self._usage_flush_loop(), name="probe-usage-flush"),
+        ]
+
+    async def stop(self, drain_s: Optional[float] = None):
+        """
+        Graceful drain: stops scheduling and dispatching, lets in-flight checks finish and hand their
+        results to the writer for up to `drain_s` (default: the check timeout), cancels the rest, and
+        saves every URL's next run so the next start resumes the schedule. Stop the writer after this.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        interrupted = []
+        if self._in_flight:
+            _, pending = await asyncio.wait(list(self._in_flight), timeout=self.timeout_s if drain_s is None else drain_s)
+            if pending:
+                interrupted = [self._in_flight[task] for task in pending]
+                logger.warning(f"Probe engine: {len(pending)} check(s) still running at the drain deadline; cancelled.")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        try:
+            await self.save_schedule(interrupted)
+        except Exception as e:
+            logger.error(f"Probe engine: could not save the schedule: {e}")
+        await self.usage.flush(self.db)
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def next_runs(self, overdue: Sequence[int] = ()) -> Dict[int, float]:
+        """Seconds until each target's next check; checks waiting for a slot (and `overdue`) are due now."""
+        now = self.clock()
+        remaining = {}
+        for due, url_id in self._heap:
+            if url_id in self.targets:
+                remaining[url_id] = min(remaining.get(url_id, due - now), due - now)
+        for url_id in list(self._queued) + list(overdue):
+            remaining[url_id] = 0.0
+        return {url_id: max(seconds, 0.0) for url_id, seconds in remaining.items()}
+
+    async def save_schedule(self, overdue: Sequence[int] = ()):
+        """Stores next_runs() in probe_schedule, one statement for all targets of this engine."""
+        remaining = self.next_runs(overdue)
+        if not remaining:
+            return
+        async with self.db.pool.acquire() as conn:
+            # Joined to monitored_urls: URLs deleted since the last refresh are skipped, not a foreign key error
+            await conn.execute(
+                """
+                INSERT INTO probe_schedule (url_id, next_run_at, saved_at)
+                SELECT s.url_id, $3::TIMESTAMPTZ + make_interval(secs => s.remaining_s), $3::TIMESTAMPTZ
+                FROM unnest($1::BIGINT[], $2::FLOAT8[]) AS s(url_id, remaining_s)
+                JOIN monitored_urls u ON u.id = s.url_id
+                ON CONFLICT (url_id) DO UPDATE SET next_run_at = EXCLUDED.next_run_at, saved_at = EXCLUDED.saved_at
+                """,
+                list(remaining), list(remaining.values()), datetime.now(timezone.utc)
+            )
+        logger.info(f"Probe engine: next run of {len(remaining)} target(s) saved.")
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_s)
+            try:
+                await self.refresh_targets()
+            except Exception as e:
+                logger.error(f"Probe engine: target refresh failed: {e}")
+
+    async def _usage_flush_loop(self):
+        while True:
+            await asyncio.sleep(self.usage_flush_s)
+            await self.usage.flush(self.db)
+
+    async def _schedule_loop(self):
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            due, url_id = self._heap[0]
+            delay = due - self.clock()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            target = self.targets.get(url_id)
+            if target is None:
+                continue  # Removed or disabled since it was scheduled
+            # Next run keeps the URL's phase; if the engine fell a whole interval behind, skip the missed runs
+            next_due = due + target.interval_s
+            if next_due < self.clock():
+                next_due = self.clock() + target.interval_s
+            heapq.heappush(self._heap, (next_due, url_id))
+            if url_id in self._queued:
+                self.skipped_backlogged += 1  # Still waiting for a slot: never queue a URL twice
+                continue
+            self._queued[url_id] = due
+            self._queue.put(target.owner_id, url_id, self.quotas.get(target.owner_id).weight)
+
+    async def _dispatch_loop(self):
+        while True:
+            # Take a slot first, then the fairest check at that moment
+            await self._semaphore.acquire()
+            url_id = await self._queue.get()
+            due = self._queued.pop(url_id, None)
+            target = self.targets.get(url_id)
+            if target is None:
+                self._semaphore.release()
+                continue
+            if due is not None:
+                self._record_lag(self.clock() - due)
+            task = asyncio.create_task(self._run_check(target))
+            self._in_flight[task] = url_id
+            task.add_done_callback(lambda done: self._in_flight.pop(done, None))
+
+    def _record_lag(self, lag_s: float):
+        """How late a check starts: waiting in the fair queue for a slot (the engine is saturated when this grows)."""
+        self.dispatched += 1
+        self.dispatch_lag_total_s += lag_s
+        self.dispatch_lag_max_s = max(self.dispatch_lag_max_s, lag_s)
+
+    async def _run_check(self, target: ProbeTarget):
+        try:
+            row = await self.check(target)
+            self.checks += 1
+            self.usage.add_check(target.owner_id, row[3])
+            if not self.writer.offer([row]):
+                self.dropped_results += 1
+        except Exception as e:
+            logger.error(f"Probe engine: check of {target.url} crashed: {e}", exc_info=True)
+        finally:
+            self._semaphore.release()
+
+    # --- Checking ---
+
+    async def check(self, target: ProbeTarget) -> tuple:
+        """Runs one check of the target's type and returns a check_results row (see writer.CHECK_RESULT_COLUMNS)."""
+        checked_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        outcome = await self.check_types[target.check_type].run(target)
+        response_time_ms = (time.perf_counter() - started) * 1000
+        if outcome.peer_ip is not None and outcome.peer_ip != target.resolved_ip:
+            await self._store_resolved_ip(target, outcome.peer_ip)
+        return (checked_at, target.url_id, outcome.status_code, response_time_ms, outcome.content_length,
+                outcome.result, outcome.error, outcome.content_changed, outcome.connect_ms)
+
+    async def _store_resolved_ip(self, target: ProbeTarget, ip: str):
+        try:
+            async with self.db.pool.acquire() as conn:
+                await conn.execute("UPDATE monitored_urls SET resolved_ip = $2::INET WHERE id = $1", target.url_id, ip)
+        except Exception as e:
+            logger.warning(f"Probe engine: could not store resolved address for {target.url}: {e}")
+            return
+        target.resolved_ip = ip
+
+    async def observe_certificate(self, target: ProbeTarget, host: str, ssl_object) -> Optional[CertificateInfo]:
+        """
+        Records the certificate of a TLS connection made for `target` (any check type): parsed through
+        the CertificateCache, and written only when the target starts serving a different certificate.
+        """
+        if ssl_object is None:
+            return None
+        info = self.certificates.lookup(host, ssl_object)
+        if info is not None and info.fingerprint != target.tls_fingerprint:
+            cipher = ssl_object.cipher()
+            await self._store_certificate(target, info, ssl_object.version(), cipher[0] if cipher else None)
+        return info
+
+    async def _store_certificate(self, target: ProbeTarget, info: CertificateInfo, tls_version: Optional[str],
+                                 cipher: Optional[str]):
+        try:
+            async with self.db.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        """
+                        INSERT INTO tls_certificates (fingerprint, subject, issuer, sans, serial_number,
+                                                      not_before, not_after, chain_not_after, chain_length)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                        ON CONFLICT (fingerprint) DO NOTHING
+                        """,
+                        info.fingerprint, info.subject, info.issuer, info.sans, info.serial_number,
+                        info.not_before, info.not_after, info.chain_not_after, info.chain_length
+                    )
+                    await conn.execute(
+                        """
+                        INSERT INTO url_tls_state (url_id, fingerprint, tls_version, cipher, since)
+                        VALUES ($1, $2, $3, $4, NOW())
+                        ON CONFLICT (url_id) DO UPDATE
+                        SET fingerprint = EXCLUDED.fingerprint, tls_version = EXCLUDED.tls_version,
+                            cipher = EXCLUDED.cipher, since = EXCLUDED.since
+                        """,
+                        target.url_id, info.fingerprint, tls_version, cipher
+                    )
+        except Exception as e:
+            logger.warning(f"Probe engine: could not store TLS certificate for {target.url}: {e}")
+            return
+        if target.tls_fingerprint is not None:
+            logger.info(f"Probe engine: {target.url} now serves certificate {info.fingerprint[:16]} "
+                        f"(expires {info.not_after:%Y-%m-%d}).")
+        target.tls_fingerprint = info.fingerprint
+
+    def metrics(self) -> dict:
+        return {"targets": len(self.targets), "queued": len(self._queue), "in_flight": len(self._in_flight),
+                "checks": self.checks, "dropped_results": self.dropped_results,
+                "skipped_backlogged": self.skipped_backlogged,
+                "dispatch_lag_avg_ms": round(self.dispatch_lag_total_s / self.dispatched * 1000, 1) if self.dispatched else None,
+                "dispatch_lag_max_ms": round(self.dispatch_lag_max_s * 1000, 1), "certificates_cached": len(self.certificates),
+                "certificate_cache_hits": self.certificates.hits, "certificate_cache_misses": self.certificates.misses}
+
+
+@register_check_type
+class HttpCheck(CheckType):
+    """
+    HTTP(S) GET through the engine's shared aiohttp session: status, timing, body assertions
+    (`monitored_urls.assertions`) and, for https, the served certificate. A 4xx/5xx status (after
+    redirects) is an `http_error`; its body is not inspected.
+    """
+
+    name = "http"
+
+    async def run(self, target: ProbeTarget) -> CheckOutcome:
+        try:
+            return await self.check(target)  # The session enforces the timeout; aiohttp errors are mapped below
+        except Exception as e:
+            return check_error(e)
+
+    async def check(self, target: ProbeTarget) -> CheckOutcome:
+        engine = self.engine
+        outcome = CheckOutcome()
+        timing = new_connect_timing()
+        tls_peer = None
+        try:
+            async with engine.session.get(target.url, allow_redirects=True, trace_request_ctx=timing) as resp:
+                outcome.status_code = resp.status
+                outcome.content_length = resp.content_length
+                tls_peer = (resp.url.host, resp.ssl_object)
+                outcome.peer_ip = resp.peer_ip
+                if resp.status >= HTTP_ERROR_STATUS:
+                    outcome.result, outcome.error = "http_error", f"HTTP {resp.status} {resp.reason or ''}".rstrip()
+                    resp.release()
+                elif target.assertions:
+                    outcome.result, outcome.error, outcome.content_changed = await self._inspect_body(target, resp)
+                else:
+                    resp.release()  # Status and timing only: do not download the body
+        except asyncio.TimeoutError:
+            outcome.result, outcome.error = "timeout", f"No response within {engine.timeout_s}s"
+        except aiohttp.ClientSSLError as e:  # Expired/untrusted certificate, hostname mismatch, handshake failure
+            outcome.result, outcome.error = "tls_error", str(e)
+        except aiohttp.ClientConnectorError as e:
+            is_dns = isinstance(e.os_error, socket.gaierror)
+            outcome.result, outcome.error = ("dns_error" if is_dns else "connection_failed"), str(e)
+        except aiohttp.ClientPayloadError as e:
+            outcome.result, outcome.error = "body_read_error", str(e)
+        except aiohttp.ClientError as e:
+            outcome.result, outcome.error = "connection_failed", str(e)
+        outcome.connect_ms = timing.connect_ms
+        if tls_peer is not None:
+            await engine.observe_certificate(target, *tls_peer)
+        return outcome
+
+    async def _inspect_body(self, target: ProbeTarget, resp: aiohttp.ClientResponse):
+        inspector = BodyInspector(build_assertions(target.assertions, target.content_hash))
+        complete = True
+        async for chunk in resp.content.iter_chunked(READ_CHUNK_BYTES):
+            remaining = self.engine.max_body_bytes - inspector.bytes_read
+            if len(chunk) >= remaining:
+                inspector.feed(chunk[:remaining])
+                complete = False
+                break
+            if not inspector.feed(chunk):
+                complete = False  # Every assertion decided: skip the rest of the body
+                break
+        if not complete:
+            resp.close()  # Drop the connection instead of draining the remaining body
+        failures = [r for r in inspector.finish() if not r.passed]
+
+        content_changed = None
+        hash_assertion = inspector.content_hash
+        if hash_assertion is not None:
+            content_changed = hash_assertion.changed
+            if hash_assertion.digest != target.content_hash:
+                target.content_hash = hash_assertion.digest
+                await self._store_content_hash(target)
+        if failures:
+            return "assertion_failed", "; ".join(f"{r.name}: {r.message}" for r in failures)[:1000], content_changed
+        return "success", None, content_changed
+
+    async def _store_content_hash(self, target: ProbeTarget):
+        try:
+            async with self.engine.db.pool.acquire() as conn:
+                await conn.execute("UPDATE monitored_urls SET content_hash = $2 WHERE id = $1",
+                                   target.url_id, target.content_hash)
+        except Exception as e:
+            logger.warning(f"Probe engine: could not store content hash for {target.url}: {e}")
+
+
+async def main():
+    """Runs the probe engine and its writer in this process until SIGINT/SIGTERM."""
+    engine = ProbeEngine(
+        database, check_writer,
+        concurrency=settings.PROBE_CONCURRENCY,
+        timeout_s=settings.PROBE_TIMEOUT_SECONDS,
+        max_body_bytes=settings.PROBE_MAX_BODY_BYTES,
+        refresh_s=settings.PROBE_TARGET_REFRESH_SECONDS,
+        cert_cache_size=settings.PROBE_CERT_CACHE_SIZE,
+        usage_flush_s=settings.TENANT_USAGE_FLUSH_SECONDS,
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await database.initialize()
+    await check_writer.start()
+    if settings.INCIDENT_CORRELATION_ENABLED:
+        check_writer.add_listener(outage_correlator.observe)
+        await outage_correlator.start()
+    await engine.start()
+    logger.info("Probe engine running.")
+    await stop.wait()
+    logger.info("Probe engine stopping...", **engine.metrics())
+    # One deadline for the whole drain: in-flight checks first, then the buffered results
+    deadline = time.monotonic() + settings.SHUTDOWN_DRAIN_SECONDS
+    await engine.stop(drain_s=min(settings.PROBE_TIMEOUT_SECONDS, settings.SHUTDOWN_DRAIN_SECONDS / 2))
+    await check_writer.stop(timeout_s=max(deadline - time.monotonic(), 1.0))
+    if settings.INCIDENT_CORRELATION_ENABLED:
+        await outage_correlator.stop()
+        logger.info("Outage correlator stopped.", **outage_correlator.metrics())
+    await database.close()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+# backend/apps/monitoring/export.py
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from asyncpg import Connection
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from apps.monitoring.runs import check_samples_sql
+
+# Initialize logger
+logger = get_logger(__name__)
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Timestamps are selected as epoch microseconds so each chunk becomes an int64 array that is
+# reinterpreted as timestamp[us, UTC] without creating a datetime object per row.
+EXPORT_QUERY = f"""
+SELECT url_id,
+       (EXTRACT(EPOCH FROM time) * 1000000)::BIGINT AS time_us,
+       status_code, response_time_ms, content_length, result, error
+FROM ({check_samples_sql("url_id = ANY($1::BIGINT[])", "$2", "$3")}) c
+ORDER BY url_id, c.time
+"""
+
+
+def export_schema(url_map: Dict[int, str]):
+    """Arrow schema of an export; the url_id -> URL mapping travels as schema metadata instead of a per-row column."""
+    import pyarrow as pa
+    return pa.schema(
+        [
+            ("url_id", pa.int64()),
+            ("time", pa.timestamp("us", tz="UTC")),
+            ("status_code", pa.int16()),
+            ("response_time_ms", pa.float32()),
+            ("content_length", pa.int32()),
+            ("result", pa.string()),
+            ("error", pa.string()),
+        ],
+        metadata={"urls": json.dumps({str(url_id): url for url_id, url in url_map.items()})},
+    )
+
+
+def _to_batch(rows: Sequence, schema):
+    import pyarrow as pa
+    url_ids, times, status_codes, response_times, lengths, results, errors = zip(*rows)
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(url_ids, pa.int64()),
+            pa.array(times, pa.int64()).view(schema.field("time").type),
+            pa.array(status_codes, pa.int16()),
+            pa.array(response_times, pa.float32()),
+            pa.array(lengths, pa.int32()),
+            pa.array(results, pa.string()),
+            pa.array(errors, pa.string()),
+        ],
+        schema=schema,
+    )
+
+
+class _DrainableSink:
+    """Write-only file object whose buffered bytes are handed out (and released) after every chunk."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.closed = False
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+async def resolve_urls(conn: Connection, url_ids: Optional[List[int]]) -> Dict[int, str]:
+    """Maps the requested URL IDs (all URLs when None) to their URLs; unknown IDs are left out."""
+    rows = await conn.fetch(
+        "SELECT id, url FROM monitored_urls WHERE $1::BIGINT[] IS NULL OR id = ANY($1::BIGINT[]) ORDER BY id",
+        url_ids
+    )
+    return {row["id"]: row["url"] for row in rows}
+
+
+async def stream_export(conn: Connection, url_map: Dict[int, str], start: datetime, end: datetime,
+                        fmt: str = "arrow", chunk_rows: int = DEFAULT_CHUNK_ROWS) -> AsyncIterator[bytes]:
+    """
+    Streams check results as an Arrow IPC stream or a Parquet file.
+    Rows are read through a server-side cursor `chunk_rows` at a time and each chunk is encoded and
+    yielded before the next is fetched (one record batch / Parquet row group per chunk), so memory
+    stays constant regardless of the time range. Runs inside a read-only transaction on `conn`.
+    """
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    schema = export_schema(url_map)
+    sink = _DrainableSink()
+    writer = ipc.new_stream(sink, schema) if fmt == "arrow" else pq.ParquetWriter(sink, schema, compression="zstd")
+
+    total_rows = 0
+    async with conn.transaction(readonly=True):
+        cursor = await conn.cursor(EXPORT_QUERY, list(url_map), start, end)
+        while True:
+            rows = await cursor.fetch(chunk_rows)
+            if not rows:
+                break
+            batch = _to_batch(rows, schema)
+            del rows
+            if fmt == "arrow":
+                writer.write_batch(batch)
+            else:
+                writer.write_batch(batch, row_group_size=chunk_rows)
+            total_rows += batch.num_rows
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
+    logger.info(f"Exported {total_rows} check results for {len(url_map)} URL(s) as {fmt}.")
@@ -0,0 +1,389 @@
+# backend/apps/monitoring/incidents.py
+import asyncio
+import ipaddress
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit
+from uuid import UUID, uuid4
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.database import database, Database
+from config.settings import settings
+from apps.monitoring.checks import is_up
+from apps.monitoring.writer import CheckRow
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Root cause when several keys are shared by equally many URLs of an incident: the most specific one
+ROOT_PRIORITY = {"host": 0, "ip": 1, "network": 2}
+# Incidents are logged again when their URL count reaches each of these
+LOG_SIZES = (10, 100, 1000, 10000)
+
+
+def correlation_keys(url: str, ip: Optional[str], ipv4_prefix: int = 24, ipv6_prefix: int = 48) -> Tuple[str, ...]:
+    """
+    Index keys of a URL: `host:<hostname>` and, once a probe has connected to it, `ip:<address>`
+    and `network:<prefix>` (e.g. `network:203.0.113.0/24`). URLs sharing a key share infrastructure.
+    """
+    keys = []
+    host = urlsplit(url).hostname
+    if host:
+        keys.append(f"host:{host}")
+    if ip:
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return tuple(keys)
+        prefix = ipv4_prefix if address.version == 4 else ipv6_prefix
+        keys.append(f"ip:{address}")
+        keys.append(f"network:{ipaddress.ip_network((address, prefix), strict=False)}")
+    return tuple(keys)
+
+
+class Incident:
+    """One correlated outage: the failing URLs that share a host, IP or network, and when they failed."""
+    __slots__ = ("id", "started_at", "last_failure_at", "last_joined_at", "resolved_at", "quiet_since", "members",
+                 "failing", "key_counts", "new_members", "dirty", "persisted", "logged_size")
+
+    def __init__(self, incident_id: UUID, started_at: datetime):
+        self.id = incident_id
+        self.started_at = started_at
+        self.last_failure_at = started_at
+        self.last_joined_at = started_at                 # Latest first failure of a member: the correlation clock
+        self.resolved_at: Optional[datetime] = None
+        self.quiet_since: Optional[datetime] = None      # When the last failing URL recovered
+        self.members: Dict[int, datetime] = {}           # url_id -> first failure
+        self.failing: Set[int] = set()
+        self.key_counts: Counter = Counter()             # Members per correlation key
+        self.new_members: List[int] = []                 # Not yet written to incident_urls
+        self.dirty = True
+        self.persisted = False
+        self.logged_size = 1
+
+    def add(self, url_id: int, failed_at: datetime, keys: Sequence[str]):
+        self.members[url_id] = failed_at
+        self.last_joined_at = max(self.last_joined_at, failed_at)
+        self.failing.add(url_id)
+        self.key_counts.update(keys)
+        self.new_members.append(url_id)
+        self.quiet_since = None
+        self.dirty = True
+
+    def root(self, urls: Dict[int, str]) -> Tuple[str, str]:
+        """(kind, key) of the key shared by most members; ("url", <url>) while nothing is shared."""
+        if self.key_counts:
+            key, count = max(self.key_counts.items(),
+                             key=lambda item: (item[1], -ROOT_PRIORITY[item[0].partition(":")[0]]))
+            if count > 1:
+                kind, _, value = key.partition(":")
+                return kind, value
+        url_id = next(iter(self.members))
+        return "url", urls.get(url_id, str(url_id))
+
+
+class OutageCorrelator:
+    """
+    Groups failing checks into one incident per shared root cause instead of one per URL.
+
+    Every URL is indexed under its hostname, its last resolved IP (`monitored_urls.resolved_ip`) and
+    that IP's network prefix. A failure looks up the open incident of each of its keys (a few dict
+    lookups, never a comparison with other URLs) and joins it if a URL started failing there within
+    `window_s`; otherwise it opens a new incident. A URL that links two open incidents merges them.
+    Only first failures count: a URL that stays down keeps its own incident open, but its repeated
+    failures do not make unrelated failures on the same host or network join it hours later.
+    An incident resolves once all its URLs have passed checks for `recovery_s`.
+
+    Results arrive through CheckResultWriter listeners, so one correlator sees every probe worker's
+    results. Incidents are written every `flush_s` seconds with one upsert for all changed incidents
+    and one insert for all new members: a load balancer outage that fails 500 URLs is one row in
+    `incidents` and one log line, not 500.
+    """
+
+    def __init__(self, db: Database, window_s: float = 60.0, recovery_s: float = 120.0, flush_s: float = 5.0,
+                 refresh_s: float = 60.0, ipv4_prefix: int = 24, ipv6_prefix: int = 48):
+        self.db = db
+        self.window = timedelta(seconds=window_s)
+        self.recovery = timedelta(seconds=recovery_s)
+        self.flush_s = flush_s
+        self.refresh_s = refresh_s
+        self.ipv4_prefix = ipv4_prefix
+        self.ipv6_prefix = ipv6_prefix
+        self.urls: Dict[int, str] = {}
+        self.keys: Dict[int, Tuple[str, ...]] = {}
+        self._by_key: Dict[str, Incident] = {}
+        self._by_url: Dict[int, Incident] = {}
+        self._open: Dict[UUID, Incident] = {}
+        self._closing: List[Incident] = []               # Resolved, final state not yet written
+        self._merged: List[Tuple[UUID, UUID]] = []       # (absorbed, surviving) incidents already written
+        self._tasks: List[asyncio.Task] = []
+        self.failures = 0
+        self.correlated = 0
+        self.opened = 0
+        self.merges = 0
+
+    # --- Index ---
+
+    async def refresh_index(self):
+        async with self.db.acquire() as conn:
+            rows = await conn.fetch("SELECT id, url, host(resolved_ip) AS ip FROM monitored_urls WHERE enabled")
+        self.urls = {row["id"]: row["url"] for row in rows}
+        self.keys = {row["id"]: correlation_keys(row["url"], row["ip"], self.ipv4_prefix, self.ipv6_prefix)
+                     for row in rows}
+        # URLs deleted or disabled mid-outage will not report a recovery
+        for incident in self._open.values():
+            gone = [url_id for url_id in incident.failing if url_id not in self.keys]
+            if gone:
+                incident.failing.difference_update(gone)
+                incident.dirty = True
+                if not incident.failing:
+                    incident.quiet_since = datetime.now(timezone.utc)
+
+    async def load_open_incidents(self):
+        """Resumes the incidents a previous run left open; their URLs count as failing until they pass."""
+        async with self.db.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT i.id, i.started_at, i.last_failure_at, array_agg(m.url_id) AS url_ids,
+                       array_agg(m.first_failure_at) AS first_failures
+                FROM incidents i
+                JOIN incident_urls m ON m.incident_id = i.id
+                WHERE i.resolved_at IS NULL
+                GROUP BY i.id
+                """
+            )
+        for row in rows:
+            incident = Incident(row["id"], row["started_at"])
+            incident.last_failure_at = row["last_failure_at"]
+            for url_id, failed_at in zip(row["url_ids"], row["first_failures"]):
+                keys = self.keys.get(url_id, ())
+                incident.add(url_id, failed_at, keys)
+                self._by_url[url_id] = incident
+                for key in keys:
+                    self._by_key[key] = incident
+            incident.new_members, incident.dirty, incident.persisted = [], False, True
+            incident.logged_size = len(incident.members)
+            self._open[incident.id] = incident
+        if rows:
+            logger.info(f"Outage correlator: resumed {len(rows)} open incident(s).")
+
+    # --- Correlation ---
+
+    def observe(self, rows: Sequence[CheckRow]):
+        """CheckResultWriter listener: correlates the failures and recoveries in `rows` (see writer.CHECK_RESULT_COLUMNS)."""
+        for row in rows:
+            checked_at, url_id, result = row[0], row[1], row[5]
+            incident = self._by_url.get(url_id)
+            if is_up(result, row[2]):
+                if incident is not None and url_id in incident.failing:
+                    incident.failing.discard(url_id)
+                    incident.dirty = True
+                    if not incident.failing:
+                        incident.quiet_since = checked_at
+                continue
+            self.failures += 1
+            if incident is None:
+                incident = self._correlate(url_id, checked_at)
+            elif url_id not in incident.failing:
+                incident.failing.add(url_id)
+                incident.quiet_since = None
+                incident.dirty = True
+            if checked_at > incident.last_failure_at:
+                incident.last_failure_at = checked_at
+
+    def _correlate(self, url_id: int, failed_at: datetime) -> Incident:
+        keys = self.keys.get(url_id, ())
+        found = None
+        for key in keys:
+            incident = self._by_key.get(key)
+            if incident is None or incident.resolved_at is not None or failed_at - incident.last_joined_at > self.window:
+                continue
+            if found is None:
+                found = incident
+            elif incident is not found:
+                found = self._merge(found, incident)
+        if found is None:
+            found = Incident(uuid4(), failed_at)
+            self._open[found.id] = found
+            self.opened += 1
+        else:
+            self.correlated += 1
+        found.add(url_id, failed_at, keys)
+        self._by_url[url_id] = found
+        for key in keys:
+            self._by_key[key] = found
+        return found
+
+    def _merge(self, first: Incident, second: Incident) -> Incident:
+        """Folds the smaller of two open incidents into the larger one."""
+        survivor, absorbed = (first, second) if len(first.members) >= len(second.members) else (second, first)
+        for url_id, failed_at in absorbed.members.items():
+            survivor.members.setdefault(url_id, failed_at)
+            self._by_url[url_id] = survivor
+        survivor.failing |= absorbed.failing
+        survivor.key_counts += absorbed.key_counts
+        survivor.new_members += absorbed.new_members
+        survivor.started_at = min(survivor.started_at, absorbed.started_at)
+        survivor.last_failure_at = max(survivor.last_failure_at, absorbed.last_failure_at)
+        survivor.last_joined_at = max(survivor.last_joined_at, absorbed.last_joined_at)
+        survivor.quiet_since = None if survivor.failing else survivor.quiet_since
+        survivor.dirty = True
+        for key in absorbed.key_counts:
+            if self._by_key.get(key) is absorbed:
+                self._by_key[key] = survivor
+        del self._open[absorbed.id]
+        self._merged = [(old, survivor.id if into == absorbed.id else into) for old, into in self._merged]
+        if absorbed.persisted:
+            self._merged.append((absorbed.id, survivor.id))
+        self.merges += 1
+        return survivor
+
+    def _resolve_quiet(self, now: datetime):
+        for incident in list(self._open.values()):
+            if incident.failing or incident.quiet_since is None or now - incident.quiet_since < self.recovery:
+                continue
+            incident.resolved_at = incident.quiet_since
+            incident.dirty = True
+            del self._open[incident.id]
+            for url_id in incident.members:
+                if self._by_url.get(url_id) is incident:
+                    del self._by_url[url_id]
+            for key in incident.key_counts:
+                if self._by_key.get(key) is incident:
+                    del self._by_key[key]
+            self._closing.append(incident)
+
+    # --- Persistence ---
+
+    async def flush(self):
+        """Resolves quiet incidents and writes every changed incident and new member in one transaction."""
+        self._resolve_quiet(datetime.now(timezone.utc))
+        changed = [incident for incident in list(self._open.values()) + self._closing if incident.dirty]
+        merged = self._merged
+        if not changed and not merged:
+            return
+        members = [(incident, list(incident.new_members)) for incident in changed]
+        new = [(incident.id, url_id, incident.members[url_id]) for incident, url_ids in members for url_id in url_ids]
+        roots = [incident.root(self.urls) for incident in changed]
+        opened = [not incident.persisted for incident in changed]
+        for incident in changed:
+            # Marked before the write: an incident merged away meanwhile must have its rows moved too
+            incident.dirty, incident.persisted = False, True
+        self._merged = []
+        try:
+            async with self.db.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        """
+                        INSERT INTO incidents (id, root_kind, root_key, started_at, last_failure_at, resolved_at,
+                                               url_count, failing_count, updated_at)
+                        SELECT *, NOW() FROM unnest($1::UUID[], $2::TEXT[], $3::TEXT[], $4::TIMESTAMPTZ[],
+                                                    $5::TIMESTAMPTZ[], $6::TIMESTAMPTZ[], $7::INTEGER[], $8::INTEGER[])
+                        ON CONFLICT (id) DO UPDATE
+                        SET root_kind = EXCLUDED.root_kind, root_key = EXCLUDED.root_key,
+                            started_at = EXCLUDED.started_at, last_failure_at = EXCLUDED.last_failure_at,
+                            resolved_at = EXCLUDED.resolved_at, url_count = EXCLUDED.url_count,
+                            failing_count = EXCLUDED.failing_count, updated_at = EXCLUDED.updated_at
+                        """,
+                        [incident.id for incident in changed], [kind for kind, _ in roots], [key for _, key in roots],
+                        [incident.started_at for incident in changed], [incident.last_failure_at for incident in changed],
+                        [incident.resolved_at for incident in changed], [len(incident.members) for incident in changed],
+                        [len(incident.failing) for incident in changed],
+                    )
+                    if merged:
+                        await conn.execute(
+                            """
+                            UPDATE incident_urls m SET incident_id = t.survivor
+                            FROM unnest($1::UUID[], $2::UUID[]) AS t(absorbed, survivor)
+                            WHERE m.incident_id = t.absorbed
+                            """,
+                            [absorbed for absorbed, _ in merged], [survivor for _, survivor in merged],
+                        )
+                        await conn.execute("DELETE FROM incidents WHERE id = ANY($1::UUID[])",
+                                           [absorbed for absorbed, _ in merged])
+                    if new:
+                        await conn.execute(
+                            """
+                            INSERT INTO incident_urls (incident_id, url_id, first_failure_at)
+                            SELECT * FROM unnest($1::UUID[], $2::BIGINT[], $3::TIMESTAMPTZ[])
+                            ON CONFLICT DO NOTHING
+                            """,
+                            [row[0] for row in new], [row[1] for row in new], [row[2] for row in new],
+                        )
+        except Exception:
+            for incident, was_opened in zip(changed, opened):
+                incident.dirty = True
+                incident.persisted = not was_opened
+            self._merged = merged + self._merged
+            raise
+        for (incident, url_ids), (kind, key), was_opened in zip(members, roots, opened):
+            del incident.new_members[:len(url_ids)]
+            self._log_change(incident, kind, key, was_opened)
+        self._closing = [incident for incident in self._closing if incident.dirty]
+
+    def _log_change(self, incident: Incident, kind: str, key: str, opened: bool):
+        size = len(incident.members)
+        if opened:
+            logger.warning("Outage incident opened.", incident_id=str(incident.id), root=f"{kind}:{key}", urls=size)
+        elif incident.resolved_at is not None:
+            logger.info("Outage incident resolved.", incident_id=str(incident.id), root=f"{kind}:{key}", urls=size,
+                        duration_s=round((incident.resolved_at - incident.started_at).total_seconds()))
+        elif any(incident.logged_size < threshold <= size for threshold in LOG_SIZES):
+            logger.warning("Outage incident growing.", incident_id=str(incident.id), root=f"{kind}:{key}", urls=size)
+        incident.logged_size = size
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        await self.refresh_index()
+        await self.load_open_incidents()
+        self._tasks = [
+            asyncio.create_task(self._flush_loop(), name="incident-flush"),
+            asyncio.create_task(self._refresh_loop(), name="incident-index-refresh"),
+        ]
+        logger.info(f"Outage correlator started ({len(self.keys)} URLs indexed).")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Outage correlator: final flush failed: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_s)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Outage correlator: writing incidents failed: {e}")
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_s)
+            try:
+                await self.refresh_index()
+            except Exception as e:
+                logger.error(f"Outage correlator: index refresh failed: {e}")
+
+    def metrics(self) -> dict:
+        return {"open_incidents": len(self._open), "indexed_urls": len(self.keys), "indexed_keys": len(self._by_key),
+                "failures": self.failures, "correlated_failures": self.correlated, "incidents_opened": self.opened,
+                "incident_merges": self.merges}
+
+
+# Global correlator (started by the probe engine / runner process, fed by check_writer)
+outage_correlator = OutageCorrelator(
+    database,
+    window_s=settings.INCIDENT_WINDOW_SECONDS,
+    recovery_s=settings.INCIDENT_RECOVERY_SECONDS,
+    flush_s=settings.INCIDENT_FLUSH_SECONDS,
+    refresh_s=settings.PROBE_TARGET_REFRESH_SECONDS,
+    ipv4_prefix=settings.INCIDENT_IPV4_PREFIX,
+    ipv6_prefix=settings.INCIDENT_IPV6_PREFIX,
+)
@@ -0,0 +1,257 @@
+# backend/apps/monitoring/routes.py
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, List, Literal, Optional
+from uuid import UUID
+
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from utils.db_utils import get_db_connection, get_read_connection, db_connection, acquire_connection
+from utils.responses import json_response, records_to_columns
+from apps.auth.routes import get_current_token_data, RoleChecker
+from apps.auth.schemas import TokenData
+from apps.monitoring.services import (
+    get_status_board, get_check_series, get_certificates, get_anomalies, get_incidents, get_incident,
+    create_monitored_url, QuotaExceeded, SERIES_COLUMNS
+)
+from apps.monitoring.schemas import MonitoredUrlCreate, MaintenanceWindowCreate
+from apps.monitoring.sla import add_maintenance_window, get_maintenance_windows, get_sla_report, parse_month
+from apps.monitoring.tenants import TenantQuotas
+from apps.monitoring.checks import load_check_types
+from apps.monitoring.assertions import validate_assertions
+from apps.monitoring.export import EXPORT_FORMATS, resolve_urls, stream_export
+
+# No prefix here: config.routes mounts this router under /monitoring
+router = APIRouter(tags=["Monitoring"])
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Endpoints below return Response objects built by utils.responses.json_response, so FastAPI does not
+# revalidate or re-encode the rows: asyncpg records go straight to orjson, then to gzip/brotli.
+
+
+@router.get("/status")
+async def status_board(
+    request: Request,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    include_disabled: bool = False,
+    db = Depends(get_read_connection)
+):
+    """
+    Latest check result for every monitored URL.
+    """
+    records = await get_status_board(db, enabled_only=not include_disabled)
+    return await json_response(request, {"count": len(records), "urls": records})
+
+
+@router.post("/urls", status_code=status.HTTP_201_CREATED)
+async def add_monitored_url(
+    request: Request,
+    body: MonitoredUrlCreate,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    db = Depends(get_db_connection)
+):
+    """
+    Adds a URL owned by the current user, within the user's tenant quota
+    (403 when the URL count quota is reached, 422 for an interval below the minimum, invalid check options
+    or invalid body assertions).
+    """
+    owner_id = await db.fetchval("SELECT id FROM users WHERE email = $1", token_data.sub)
+    if owner_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    check_type = load_check_types().get(body.check_type)
+    if check_type is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"Unknown check type {body.check_type!r}")
+    try:
+        check_type.validate_options(body.check_options)
+        validate_assertions(body.assertions)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    quota = (await TenantQuotas.load(db)).get(owner_id)
+    if body.interval_seconds < quota.min_interval_s:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"interval_seconds must be at least {quota.min_interval_s}")
+    try:
+        record = await create_monitored_url(db, owner_id, body, quota)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except asyncpg.UniqueViolationError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="You already monitor this URL")
+    return await json_response(request, record, status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/urls/{url_id}/checks")
+async def check_series(
+    request: Request,
+    url_id: int,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Annotated[Optional[int], Query(gt=0)] = None,
+    layout: Literal["columnar", "rows"] = "columnar",
+    db = Depends(get_read_connection)
+):
+    """
+    Check results for one URL (default: the last 24 hours). `time` is epoch milliseconds.
+    `layout=columnar` (default) returns one array per column; `layout=rows` returns one object per check.
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(hours=24)
+    records = await get_check_series(db, url_id, start, end, limit)
+    if layout == "columnar":
+        series = records_to_columns(records, SERIES_COLUMNS)
+    else:
+        series = records
+    return await json_response(request, {"url_id": url_id, "start": start, "end": end, "series": series})
+
+
+@router.get("/certificates")
+async def certificates(
+    request: Request,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    expiring_within_days: Annotated[Optional[int], Query(ge=0)] = None,
+    db = Depends(get_read_connection)
+):
+    """
+    TLS certificate currently served by each https URL (as last seen by the probe engine),
+    soonest expiry first. `chain_not_after` is the earliest expiry anywhere in the verified chain.
+    """
+    records = await get_certificates(db, expiring_within_days)
+    return await json_response(request, {"count": len(records), "certificates": records})
+
+
+@router.get("/anomalies")
+async def anomalies(
+    request: Request,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    hours: Annotated[int, Query(ge=1, le=24 * 31)] = 24,
+    include_normal: bool = False,
+    db = Depends(get_read_connection)
+):
+    """
+    Hours of the last `hours` in which a URL's median latency was abnormal for that time of day
+    (scored hourly by apps.monitoring.anomalies); `include_normal=true` returns every score.
+    """
+    records = await get_anomalies(db, datetime.now(timezone.utc) - timedelta(hours=hours), not include_normal)
+    return await json_response(request, {"count": len(records), "anomalies": records})
+
+
+@router.get("/incidents")
+async def incidents(
+    request: Request,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    hours: Annotated[int, Query(ge=1, le=24 * 31)] = 24,
+    open_only: bool = False,
+    db = Depends(get_read_connection)
+):
+    """
+    Outages of the last `hours` plus any still open, newest first. Failures of URLs that share a host,
+    IP or network are one incident; `root_kind`/`root_key` name what they share.
+    """
+    records = await get_incidents(db, datetime.now(timezone.utc) - timedelta(hours=hours), open_only)
+    return await json_response(request, {"count": len(records), "incidents": records})
+
+
+@router.get("/incidents/{incident_id}")
+async def incident_detail(
+    request: Request,
+    incident_id: UUID,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    db = Depends(get_read_connection)
+):
+    """
+    One incident with every URL it affected and when each first failed.
+    """
+    incident = await get_incident(db, incident_id)
+    if incident is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found")
+    return await json_response(request, incident)
+
+
+@router.get("/sla")
+async def sla_report(
+    request: Request,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    month: Optional[str] = None,
+    url_id: Annotated[Optional[List[int]], Query()] = None,
+    db = Depends(db_connection("analytics"))
+):
+    """
+    Monthly SLA report (UTC calendar month `YYYY-MM`, default: the current one) for every URL, or for
+    the given `url_id`s: time-weighted uptime, downtime intervals outside maintenance, incidents and MTTR.
+    Finished months are computed once and then served from `sla_reports`.
+    """
+    try:
+        month_start = parse_month(month) if month else datetime.now(timezone.utc).date().replace(day=1)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="month must be YYYY-MM")
+    report = await get_sla_report(db, month_start, url_id)
+    return await json_response(request, {**report, "count": len(report["reports"])})
+
+
+@router.get("/maintenance")
+async def maintenance_windows(
+    request: Request,
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    days: Annotated[int, Query(ge=0)] = 31,
+    db = Depends(get_read_connection)
+):
+    """
+    Maintenance windows that are upcoming, ongoing or ended within the last `days` days.
+    """
+    records = await get_maintenance_windows(db, datetime.now(timezone.utc) - timedelta(days=days))
+    return await json_response(request, {"count": len(records), "maintenance_windows": records})
+
+
+@router.post("/maintenance", status_code=status.HTTP_201_CREATED)
+async def add_maintenance(
+    request: Request,
+    body: MaintenanceWindowCreate,
+    admin_user_data: Annotated[TokenData, Depends(RoleChecker(["admin"]))],
+    db = Depends(get_db_connection)
+):
+    """
+    Adds a maintenance window (`url_id` omitted: all URLs). Its time is excluded from SLA downtime,
+    also for months whose reports were already computed.
+    """
+    created_by = await db.fetchval("SELECT id FROM users WHERE email = $1", admin_user_data.sub)
+    try:
+        record = await add_maintenance_window(db, body, created_by)
+    except asyncpg.ForeignKeyViolationError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="URL not found")
+    return await json_response(request, record, status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/export")
+async def export_checks(
+    token_data: Annotated[TokenData, Depends(get_current_token_data)],
+    start: datetime,
+    end: Optional[datetime] = None,
+    url_id: Annotated[Optional[List[int]], Query()] = None,
+    format: Literal["arrow", "parquet"] = "arrow",
+    db = Depends(get_read_connection)
+):
+    """
+    Streams check results for the given URLs (repeat `url_id`; all URLs if omitted) in [start, end)
+    as an Arrow IPC stream or a Parquet file, for loading straight into pandas/DuckDB/Polars.
+    """
+    end = end or datetime.now(timezone.utc)
+    url_map = await resolve_urls(db, url_id)
+    if not url_map:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No matching URLs.")
+
+    async def body():
+        # The export holds its own pooled connection for as long as the client keeps reading
+        async with acquire_connection("analytics", readonly=True) as conn:
+            async for chunk in stream_export(conn, url_map, start, end, format):
+                yield chunk
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"check_results_{start:%Y%m%dT%H%M%S}_{end:%Y%m%dT%H%M%S}.{extension}"
+    return StreamingResponse(body(), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
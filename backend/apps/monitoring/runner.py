@@ -0,0 +1,302 @@
+# backend/apps/monitoring/runner.py
+import argparse
+import asyncio
+import multiprocessing
+import os
+import pickle
+import signal
+import struct
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import setup_logging, get_logger
+from config.database import database
+from config.settings import settings
+from apps.monitoring.writer import CheckRow, check_writer
+from apps.monitoring.incidents import outage_correlator
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Frames on the IPC socket: 4-byte big-endian length, then a pickled list of check_results rows
+FRAME_HEADER = struct.Struct(">I")
+IPC_BATCH_SIZE = 500
+IPC_FLUSH_INTERVAL_S = 0.2
+IPC_MAX_PENDING = 50_000
+RESTART_DELAY_S = 5.0
+# How often a worker checks that the runner that spawned it is still its parent
+PARENT_CHECK_INTERVAL_S = 1.0
+
+
+def install_uvloop() -> bool:
+    """Uses uvloop for the event loops of this process when it is installed (it ships with uvicorn[standard])."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+class IpcResultWriter:
+    """
+    Stand-in for CheckResultWriter inside a probe worker: `offer()` buffers rows and one task sends
+    them in batches over the runner's Unix socket to the single writer in the parent process.
+    When the parent stops reading (its writer is full), the socket and then this buffer fill up and
+    `offer()` returns False, which the engine counts as dropped results. When the connection breaks
+    (the parent died), `on_lost` is called so the worker shuts down instead of probing on unheard.
+    """
+
+    def __init__(self, socket_path: str, batch_size: int = IPC_BATCH_SIZE,
+                 flush_interval_s: float = IPC_FLUSH_INTERVAL_S, max_pending: int = IPC_MAX_PENDING,
+                 on_lost: Optional[Callable[[], None]] = None):
+        self.socket_path = socket_path
+        self.on_lost = on_lost
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self.sent_rows = 0
+        self._pending: Deque[CheckRow] = deque()
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def offer(self, rows: Sequence[CheckRow]) -> bool:
+        if self._stopping or len(self._pending) + len(rows) > self.max_pending:
+            return False
+        self._pending.extend(rows)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        _, self._writer = await asyncio.open_unix_connection(self.socket_path)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._send_loop(), name="probe-ipc-writer")
+
+    async def stop(self, timeout_s: float = 10.0):
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            logger.error(f"Probe worker: {len(self._pending)} results not sent before shutdown deadline.")
+            self._task.cancel()
+        self._writer.close()
+
+    async def _send_loop(self):
+        while True:
+            if not self._pending:
+                if self._stopping:
+                    return
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            payload = pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL)
+            try:
+                self._writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+                await self._writer.drain()  # Waits while the parent is not reading
+            except (ConnectionError, OSError) as e:
+                logger.error(f"Probe worker: connection to the runner lost ({e!r}); "
+                             f"{len(batch) + len(self._pending)} results dropped.")
+                self._stopping = True
+                self._pending.clear()
+                if self.on_lost is not None:
+                    self.on_lost()
+                return
+            self.sent_rows += len(batch)
+
+
+async def _watch_parent(parent_pid: int, stop: asyncio.Event):
+    """Sets `stop` once the runner that spawned this worker is gone (the worker was re-parented)."""
+    while not stop.is_set():
+        if os.getppid() != parent_pid:
+            logger.error(f"Probe worker: runner (pid {parent_pid}) is gone; stopping.")
+            stop.set()
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=PARENT_CHECK_INTERVAL_S)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _worker_main(index: int, count: int, socket_path: str, parent_pid: int):
+    # Imported here: the parent process only runs the writer
+    from apps.monitoring.engine import ProbeEngine
+
+    stop = asyncio.Event()
+    writer = IpcResultWriter(socket_path, on_lost=stop.set)
+    engine = ProbeEngine(
+        database, writer,
+        concurrency=settings.PROBE_CONCURRENCY,
+        timeout_s=settings.PROBE_TIMEOUT_SECONDS,
+        max_body_bytes=settings.PROBE_MAX_BODY_BYTES,
+        refresh_s=settings.PROBE_TARGET_REFRESH_SECONDS,
+        cert_cache_size=settings.PROBE_CERT_CACHE_SIZE,
+        usage_flush_s=settings.TENANT_USAGE_FLUSH_SECONDS,
+        partition=(index, count),
+    )
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    loop.add_signal_handler(signal.SIGINT, lambda: None)  # Ctrl-C reaches the whole group; the parent decides
+
+    # Neither a SIGKILLed runner nor a crashed one stops its workers by itself: watch for either
+    watcher = asyncio.create_task(_watch_parent(parent_pid, stop), name="probe-parent-watch")
+    await database.initialize()
+    await writer.start()
+    await engine.start()
+    await stop.wait()
+    await watcher
+    logger.info(f"Probe worker {index}/{count} stopping...", sent_rows=writer.sent_rows, **engine.metrics())
+    deadline = time.monotonic() + settings.SHUTDOWN_DRAIN_SECONDS
+    await engine.stop(drain_s=min(settings.PROBE_TIMEOUT_SECONDS, settings.SHUTDOWN_DRAIN_SECONDS / 2))
+    await writer.stop(timeout_s=max(deadline - time.monotonic(), 1.0))
+    await database.close()
+
+
+def run_worker(index: int, count: int, socket_path: str, parent_pid: int):
+    """Entry point of a worker process: its own uvloop event loop, aiohttp session and database pools."""
+    setup_logging()
+    install_uvloop()
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(_worker_main(index, count, socket_path, parent_pid))
+    # Results are sent and pools closed. Neither loop.close() nor interpreter teardown: with uvloop both
+    # wait out every DNS lookup still queued for a target that will never be checked (minutes when
+    # the resolver is down), and the runner would kill the worker at its deadline
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(0)
+
+
+class ProbeRunner:
+    """
+    Runs `workers` probe engine processes, each checking one partition of the monitored URLs
+    (url_id % workers), and writes all their results through the one CheckResultWriter of this
+    process. Workers share nothing: each has its own event loop, connection pools and caches, so
+    parsing and TLS work spreads over the cores instead of queuing behind one GIL. A worker that
+    exits unexpectedly is restarted after RESTART_DELAY_S; a worker whose runner is gone stops.
+    """
+
+    def __init__(self, workers: int, socket_path: Optional[str] = None):
+        self.workers = workers
+        self.socket_path = socket_path or os.path.join(tempfile.mkdtemp(prefix="probe-runner-"), "results.sock")
+        self.received_rows = 0
+        self._context = multiprocessing.get_context("spawn")  # Children never inherit this loop or its sockets
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+        self._stopping = False
+
+    def _spawn(self, index: int):
+        # Daemonic: terminated (gracefully, by SIGTERM) if the runner exits without stop()
+        process = self._context.Process(target=run_worker,
+                                        args=(index, self.workers, self.socket_path, os.getpid()),
+                                        name=f"probe-worker-{index}", daemon=True)
+        process.start()
+        self._processes[index] = process
+        logger.info(f"Probe runner: worker {index} started (pid {process.pid}).")
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_worker, path=self.socket_path)
+        for index in range(self.workers):
+            self._spawn(index)
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                rows: List[CheckRow] = pickle.loads(await reader.readexactly(FRAME_HEADER.unpack(header)[0]))
+                # Backpressure: stop reading (workers block on drain) until the writer can take the batch
+                while not check_writer.has_capacity(len(rows)):
+                    await asyncio.sleep(0.1)
+                if check_writer.offer(rows):
+                    self.received_rows += len(rows)
+        except asyncio.IncompleteReadError:
+            pass  # Worker closed its end
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def supervise(self, stop: asyncio.Event):
+        """Restarts workers that exit while the runner is running; returns once `stop` is set."""
+        while not stop.is_set():
+            for index, process in list(self._processes.items()):
+                if process.exitcode is not None:
+                    logger.error(f"Probe runner: worker {index} exited with code {process.exitcode}; restarting.")
+                    await asyncio.sleep(RESTART_DELAY_S)
+                    if not stop.is_set():
+                        self._spawn(index)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self, timeout_s: float = 30.0):
+        """SIGTERMs the workers and waits for them to flush their results to this process."""
+        for process in self._processes.values():
+            if process.exitcode is None:
+                process.terminate()
+        deadline = time.monotonic() + timeout_s
+        while any(p.exitcode is None for p in self._processes.values()) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for index, process in self._processes.items():
+            if process.exitcode is None:
+                logger.error(f"Probe runner: worker {index} did not stop in time; killing it.")
+                process.kill()
+        while self._connections and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)  # Let the last frames reach the writer
+        self._server.close()
+        await self._server.wait_closed()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+async def main(workers: int):
+    """Runs the probe workers and the shared result writer until SIGINT/SIGTERM."""
+    runner = ProbeRunner(workers, settings.PROBE_IPC_SOCKET or None)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await database.initialize()
+    await check_writer.start()
+    if settings.INCIDENT_CORRELATION_ENABLED:
+        # Here rather than in the workers: correlation needs the results of every partition
+        check_writer.add_listener(outage_correlator.observe)
+        await outage_correlator.start()
+    await runner.start()
+    logger.info(f"Probe runner: {workers} worker(s), results via {runner.socket_path}.")
+    await runner.supervise(stop)
+    logger.info("Probe runner stopping...")
+    # Workers drain and send their last results within the deadline; the writer flushes in what is left
+    deadline = time.monotonic() + settings.SHUTDOWN_DRAIN_SECONDS
+    await runner.stop(timeout_s=settings.SHUTDOWN_DRAIN_SECONDS)
+    await check_writer.stop(timeout_s=max(deadline - time.monotonic(), 1.0))
+    if settings.INCIDENT_CORRELATION_ENABLED:
+        await outage_correlator.stop()
+        logger.info("Outage correlator stopped.", **outage_correlator.metrics())
+    logger.info("Probe runner stopped.", received_rows=runner.received_rows, written_rows=check_writer.stats.written_rows)
+    await database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the probe engine in one process per core.")
+    parser.add_argument("--workers", type=int, default=settings.PROBE_WORKERS or os.cpu_count() or 1,
+                        help="Worker processes (default: PROBE_WORKERS, or one per core)")
+    args = parser.parse_args()
+    setup_logging()
+    install_uvloop()
+    asyncio.run(main(max(1, args.workers)))
@@ -0,0 +1,203 @@
+# backend/apps/monitoring/runs.py
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+import asyncpg
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.database import Database
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# A run never spans more than this from the stored row that starts it, so readers can bound their
+# index scans of check_runs (see check_samples_sql)
+MAX_RUN_SECONDS = 3600
+# A sample arriving later than this many times the run's first interval (plus a second) ends the run,
+# so expansion never spreads samples over a gap in monitoring
+MAX_GAP_FACTOR = 2.0
+
+# Ended runs kept for the next flush while the database is unreachable; beyond this the oldest are dropped
+MAX_CLOSED_RUNS = 100_000
+# Runs the database refuses for good; retrying the batch would fail the same way on every flush
+PERMANENT_RUN_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+RUN_COLUMNS = ("url_id", "start_time", "end_time", "count", "status_code", "result", "error", "content_length",
+               "response_time_min_ms", "response_time_max_ms", "response_time_sum_ms")
+
+
+class _Run:
+    """The last stored check of a URL and the samples folded into it since."""
+    __slots__ = ("url_id", "anchor_time", "status_code", "result", "error", "content_length", "anchor_ms",
+                 "step_s", "start_time", "end_time", "count", "min_ms", "max_ms", "sum_ms", "dirty")
+
+    def __init__(self, row: tuple):
+        self.anchor_time, self.url_id, self.status_code, self.anchor_ms, self.content_length, self.result, \
+            self.error = row[:7]
+        self.step_s: Optional[float] = None
+        self.start_time: Optional[datetime] = None
+        self.end_time: Optional[datetime] = None
+        self.count = 0
+        self.min_ms = self.max_ms = self.sum_ms = 0.0
+        self.dirty = False
+
+    def add(self, checked_at: datetime, response_time_ms: float):
+        if not self.count:
+            self.start_time = checked_at
+            self.step_s = (checked_at - self.anchor_time).total_seconds()
+            self.min_ms = self.max_ms = response_time_ms
+        else:
+            self.min_ms = min(self.min_ms, response_time_ms)
+            self.max_ms = max(self.max_ms, response_time_ms)
+        self.end_time = checked_at
+        self.count += 1
+        self.sum_ms += response_time_ms
+        self.dirty = True
+
+    def record(self) -> tuple:
+        return (self.url_id, self.start_time, self.end_time, self.count, self.status_code, self.result, self.error,
+                self.content_length, self.min_ms, self.max_ms, self.sum_ms)
+
+
+class RunLengthEncoder:
+    """
+    Change-only storage for CheckResultWriter (INGEST_CHANGE_ONLY).
+
+    A check is stored as a full `check_results` row only when it differs from the URL's last stored
+    row: another status code, result or error, a content change, a gap in the check interval, or a
+    latency outside the tolerance band (`tolerance_ms`, or `tolerance_ratio` of the stored latency,
+    whichever is larger). Every other check only extends the URL's open run (count, min, max and sum
+    of latency) in memory; runs are upserted into `check_runs` every `flush_s` seconds, one statement
+    for all of them. A stable fleet stores one row per URL per MAX_RUN_SECONDS instead of one per check.
+
+    Runs are kept per writer process, so URLs whose results arrive through several API workers form
+    interleaved runs; expansion still yields every sample. `connect_ms` of folded checks is not kept.
+    Runs of URLs deleted meanwhile are skipped by the upsert; a run the database still refuses is
+    dropped (`dropped_runs`) rather than retried, so it cannot fail every later flush.
+    """
+
+    def __init__(self, tolerance_ms: float = 50.0, tolerance_ratio: float = 0.25, flush_s: float = 30.0):
+        self.tolerance_ms = tolerance_ms
+        self.tolerance_ratio = tolerance_ratio
+        self.flush_s = flush_s
+        self._runs: Dict[int, _Run] = {}
+        self._closed: List[_Run] = []   # Ended runs whose final state is not written yet
+        self.folded_rows = 0
+        self.written_runs = 0
+        self.dropped_runs = 0
+
+    def _extends(self, run: _Run, row: tuple) -> bool:
+        checked_at, _, status_code, response_time_ms, _, result, error, content_changed = row[:8]
+        if response_time_ms is None or run.anchor_ms is None or content_changed:
+            return False
+        if status_code != run.status_code or result != run.result or error != run.error:
+            return False
+        last = run.end_time or run.anchor_time
+        if checked_at <= last or (checked_at - run.anchor_time).total_seconds() > MAX_RUN_SECONDS:
+            return False
+        if run.step_s is not None and (checked_at - last).total_seconds() > MAX_GAP_FACTOR * run.step_s + 1:
+            return False
+        return abs(response_time_ms - run.anchor_ms) <= max(self.tolerance_ms, self.tolerance_ratio * run.anchor_ms)
+
+    def encode(self, rows: Sequence[tuple]) -> List[tuple]:
+        """Folds the rows that extend a run; returns the rows to store in full (see writer.CHECK_RESULT_COLUMNS)."""
+        stored = []
+        for row in rows:
+            run = self._runs.get(row[1])
+            if run is not None and self._extends(run, row):
+                run.add(row[0], row[3])
+                self.folded_rows += 1
+                continue
+            if run is not None and run.count:
+                self._closed.append(run)
+            self._runs[row[1]] = _Run(row)
+            stored.append(row)
+        return stored
+
+    async def flush(self, db: Database, pool_name: str = "ingest"):
+        """Upserts every run that changed since the last flush, then forgets runs that can no longer grow."""
+        runs = self._closed + [run for run in self._runs.values() if run.dirty]
+        if runs:
+            closed, self._closed = self._closed, []
+            records = [run.record() for run in runs]
+            for run in runs:
+                run.dirty = False
+            try:
+                async with db.acquire(pool_name) as conn:
+                    try:
+                        written = await _upsert_runs(conn, records)
+                    except PERMANENT_RUN_ERRORS as e:
+                        written = await self._upsert_each(conn, records, e)
+            except BaseException:  # Cancelled at shutdown too: CheckResultWriter.stop() flushes them once more
+                for run in runs:
+                    run.dirty = True
+                self._closed = closed + self._closed
+                if len(self._closed) > MAX_CLOSED_RUNS:
+                    self.dropped_runs += len(self._closed) - MAX_CLOSED_RUNS
+                    logger.error(f"Check runs: {len(self._closed) - MAX_CLOSED_RUNS} ended run(s) dropped "
+                                 f"while the database is unavailable.")
+                    self._closed = self._closed[-MAX_CLOSED_RUNS:]
+                raise
+            self.written_runs += written
+        horizon = datetime.now(timezone.utc) - timedelta(seconds=MAX_RUN_SECONDS)
+        self._runs = {url_id: run for url_id, run in self._runs.items() if run.dirty or run.anchor_time >= horizon}
+
+    async def _upsert_each(self, conn, records: List[tuple], error: Exception) -> int:
+        """Retries a refused batch one run at a time and drops the runs the database refuses. Returns the runs written."""
+        written = refused = 0
+        for record in records:
+            try:
+                written += await _upsert_runs(conn, [record])
+            except PERMANENT_RUN_ERRORS:
+                refused += 1
+        self.dropped_runs += refused
+        logger.error(f"Check runs: {refused} run(s) refused by the database and dropped (first error: {error!r}).")
+        return written
+
+    def metrics(self) -> dict:
+        return {"open_runs": len(self._runs), "folded_rows": self.folded_rows, "written_runs": self.written_runs,
+                "dropped_runs": self.dropped_runs}
+
+
+async def _upsert_runs(conn, records: List[tuple]) -> int:
+    """One statement for all `records` (RUN_COLUMNS); runs of URLs that no longer exist are skipped. Returns the runs written."""
+    status = await conn.execute(
+        f"""
+        INSERT INTO check_runs ({", ".join(RUN_COLUMNS)})
+        SELECT r.* FROM unnest($1::BIGINT[], $2::TIMESTAMPTZ[], $3::TIMESTAMPTZ[], $4::INTEGER[],
+                               $5::SMALLINT[], $6::VARCHAR[], $7::TEXT[], $8::INTEGER[], $9::REAL[],
+                               $10::REAL[], $11::FLOAT8[]) AS r({", ".join(RUN_COLUMNS)})
+        JOIN monitored_urls m ON m.id = r.url_id
+        ON CONFLICT (url_id, start_time) DO UPDATE
+        SET end_time = EXCLUDED.end_time, count = EXCLUDED.count,
+            response_time_min_ms = EXCLUDED.response_time_min_ms,
+            response_time_max_ms = EXCLUDED.response_time_max_ms,
+            response_time_sum_ms = EXCLUDED.response_time_sum_ms
+        """,
+        *[list(column) for column in zip(*records)]
+    )
+    return int(status.split()[-1])  # "INSERT 0 <rows>"
+
+
+def check_samples_sql(url_filter: str, start: str, end: str) -> str:
+    """
+    Subquery of every check sample of the URLs matching `url_filter` (on an unqualified `url_id`) in
+    [`start`, `end`) (SQL expressions): `check_results` rows plus the samples of `check_runs`, spread
+    evenly over each run with its mean latency. Columns: time, url_id, status_code, response_time_ms,
+    content_length, result, error. Without change-only storage, the second branch is one empty index scan.
+    """
+    return f"""
+    SELECT time, url_id, status_code, response_time_ms, content_length, result, error
+    FROM check_results
+    WHERE {url_filter} AND time >= {start} AND time < {end}
+    UNION ALL
+    SELECT s.time, url_id, status_code, (response_time_sum_ms / count)::REAL, content_length, result, error
+    FROM check_runs r
+    CROSS JOIN LATERAL (
+        SELECT r.start_time + (r.end_time - r.start_time) * (i::FLOAT8 / GREATEST(r.count - 1, 1)) AS time
+        FROM generate_series(0, r.count - 1) i
+    ) s
+    WHERE {url_filter} AND r.start_time > ({start}) - make_interval(secs => {MAX_RUN_SECONDS})
+      AND r.start_time < {end} AND r.end_time >= {start} AND s.time >= {start} AND s.time < {end}
+    """
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, model_validator
+
+
+class MonitoredUrlCreate(BaseModel):
+    url: str = Field(max_length=2048)
+    name: Optional[str] = Field(default=None, max_length=255)
+    interval_seconds: int = Field(default=60, gt=0)
+    check_type: str = "http"
+    check_options: Dict[str, Any] = Field(default_factory=dict)
+    assertions: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class MaintenanceWindowCreate(BaseModel):
+    url_id: Optional[int] = None  # None: every URL
+    starts_at: datetime
+    ends_at: datetime
+    reason: Optional[str] = Field(default=None, max_length=1000)
+
+    @model_validator(mode="after")
+    def check_period(self):
+        if self.ends_at <= self.starts_at:
+            raise ValueError("ends_at must be after starts_at")
+        return self
@@ -1,2 +1,182 @@
 # backend\apps\monitoring\services.py
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
 
+import orjson
+from asyncpg import Connection, Record
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from utils.db_utils import fetch_all, fetch_one
+from apps.monitoring.schemas import MonitoredUrlCreate
+from apps.monitoring.tenants import TenantQuota
+from apps.monitoring.runs import check_samples_sql
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Columns of a check series as returned to clients; `time` is epoch milliseconds (smaller and
+# cheaper to serialize and parse than ISO strings, and what charting libraries consume directly)
+SERIES_COLUMNS = ["time", "status_code", "response_time_ms", "content_length", "result"]
+
+
+async def get_status_board(conn: Connection, enabled_only: bool = True) -> List[Record]:
+    """
+    Latest check of every monitored URL (one index probe per URL via LATERAL, plus one into
+    check_runs, whose last sample is newer while a change-only run is open).
+    Records are returned as-is for direct serialization.
+    """
+    return await fetch_all(
+        conn,
+        """
+        SELECT u.id, u.url, u.name, u.check_type, u.interval_seconds, u.enabled,
+               c.time AS last_checked_at, c.status_code, c.response_time_ms, c.result, c.error
+        FROM monitored_urls u
+        LEFT JOIN LATERAL (
+            SELECT * FROM (
+                (SELECT time, status_code, response_time_ms, result, error
+                 FROM check_results
+                 WHERE url_id = u.id
+                 ORDER BY time DESC
+                 LIMIT 1)
+                UNION ALL
+                (SELECT end_time, status_code, (response_time_sum_ms / count)::REAL, result, error
+                 FROM check_runs
+                 WHERE url_id = u.id
+                 ORDER BY start_time DESC
+                 LIMIT 1)
+            ) latest
+            ORDER BY time DESC
+            LIMIT 1
+        ) c ON TRUE
+        WHERE u.enabled OR NOT $1
+        ORDER BY u.id
+        """,
+        enabled_only
+    )
+
+
+async def get_check_series(conn: Connection, url_id: int, start: datetime, end: datetime,
+                           limit: Optional[int] = None) -> List[Record]:
+    """
+    Check results for one URL in [start, end), oldest first, with columns in SERIES_COLUMNS order
+    (change-only runs expanded back into samples, see apps.monitoring.runs).
+    """
+    return await fetch_all(
+        conn,
+        f"""
+        SELECT (EXTRACT(EPOCH FROM time) * 1000)::BIGINT AS time,
+               status_code, response_time_ms, content_length, result
+        FROM ({check_samples_sql("url_id = $1", "$2", "$3")}) c
+        ORDER BY c.time
+        LIMIT $4
+        """,
+        url_id, start, end, limit
+    )
+
+
+async def get_certificates(conn: Connection, expiring_within_days: Optional[int] = None) -> List[Record]:
+    """
+    Certificate currently served by each https URL, soonest chain expiry first.
+    With `expiring_within_days`, only certificates whose chain expires within that many days (or already has).
+    """
+    return await fetch_all(
+        conn,
+        """
+        SELECT u.id AS url_id, u.url, s.tls_version, s.cipher, s.since,
+               c.fingerprint, c.subject, c.issuer, c.sans, c.serial_number,
+               c.not_before, c.not_after, c.chain_not_after, c.chain_length
+        FROM url_tls_state s
+        JOIN monitored_urls u ON u.id = s.url_id
+        JOIN tls_certificates c ON c.fingerprint = s.fingerprint
+        WHERE $1::INTEGER IS NULL OR c.chain_not_after < NOW() + make_interval(days => $1::INTEGER)
+        ORDER BY c.chain_not_after, u.id
+        """,
+        expiring_within_days
+    )
+
+
+async def get_anomalies(conn: Connection, since: datetime, anomalies_only: bool = True) -> List[Record]:
+    """Latency scores from `since` (see apps.monitoring.anomalies), newest hour and highest score first."""
+    return await fetch_all(
+        conn,
+        """
+        SELECT a.time, a.url_id, u.url, a.value_ms, a.expected_ms, a.scale_ms, a.ewma_ms, a.seasonal,
+               a.score, a.is_anomaly
+        FROM latency_anomalies a
+        JOIN monitored_urls u ON u.id = a.url_id
+        WHERE a.time >= $1 AND (a.is_anomaly OR NOT $2)
+        ORDER BY a.time DESC, a.score DESC
+        """,
+        since, anomalies_only
+    )
+
+
+async def get_incidents(conn: Connection, since: datetime, open_only: bool = False) -> List[Record]:
+    """Correlated outages (see apps.monitoring.incidents) started since `since` or still open, newest first."""
+    return await fetch_all(
+        conn,
+        """
+        SELECT id, root_kind, root_key, started_at, last_failure_at, resolved_at, url_count, failing_count
+        FROM incidents
+        WHERE (started_at >= $1 OR resolved_at IS NULL) AND (resolved_at IS NULL OR NOT $2)
+        ORDER BY started_at DESC
+        """,
+        since, open_only
+    )
+
+
+async def get_incident(conn: Connection, incident_id: UUID) -> Optional[dict]:
+    """One incident with its URLs (first failure first), or None."""
+    incident = await fetch_one(
+        conn,
+        """
+        SELECT id, root_kind, root_key, started_at, last_failure_at, resolved_at, url_count, failing_count
+        FROM incidents WHERE id = $1
+        """,
+        incident_id
+    )
+    if incident is None:
+        return None
+    urls = await fetch_all(
+        conn,
+        """
+        SELECT m.url_id, u.url, host(u.resolved_ip) AS resolved_ip, m.first_failure_at
+        FROM incident_urls m
+        JOIN monitored_urls u ON u.id = m.url_id
+        WHERE m.incident_id = $1
+        ORDER BY m.first_failure_at, m.url_id
+        """,
+        incident_id
+    )
+    return {**dict(incident), "urls": urls}
+
+
+class QuotaExceeded(Exception):
+    """The tenant already has as many monitored URLs as its quota allows."""
+    pass
+
+
+async def create_monitored_url(conn: Connection, owner_id: UUID, url: MonitoredUrlCreate,
+                               quota: TenantQuota) -> Record:
+    """
+    Adds a URL owned by `owner_id` within its quota. The count check and the insert run under a
+    per-owner advisory lock, so concurrent requests cannot overshoot `max_urls`.
+    """
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1::TEXT))", str(owner_id))
+        if quota.max_urls is not None:
+            count = await conn.fetchval("SELECT count(*) FROM monitored_urls WHERE owner_id = $1", owner_id)
+            if count >= quota.max_urls:
+                raise QuotaExceeded(f"URL quota of {quota.max_urls} reached")
+        return await fetch_one(
+            conn,
+            """
+            INSERT INTO monitored_urls (url, name, interval_seconds, owner_id, check_type, check_options, assertions)
+            VALUES ($1, $2, $3, $4, $5, $6::JSONB, $7::JSONB)
+            RETURNING id, url, name, interval_seconds, enabled, check_type, created_at
+            """,
+            url.url, url.name, url.interval_seconds, owner_id, url.check_type,
+            orjson.dumps(url.check_options).decode(), orjson.dumps(url.assertions).decode()
+        )
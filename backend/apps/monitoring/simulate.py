@@ -0,0 +1,338 @@
+# backend/apps/monitoring/simulate.py
+import argparse
+import asyncio
+import math
+import os
+import random
+import selectors
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import setup_logging, get_logger
+from config.database import database
+from config.settings import settings
+from apps.monitoring.engine import ProbeEngine, ProbeTarget
+from apps.monitoring.runs import check_samples_sql
+from apps.monitoring.tenants import FairQueue, TenantQuotas, UsageCounters
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# url_ids of simulated additional URLs start here, clear of any real inventory
+SYNTHETIC_URL_ID_BASE = 10 ** 12
+# Dispatch lag (p99) from which the report calls the engine saturated
+SATURATED_LAG_S = 1.0
+
+
+class _VirtualSelector(selectors.SelectSelector):
+    """Polls real file descriptors without blocking; a wait for the next timer advances `now` instead."""
+
+    def __init__(self):
+        super().__init__()
+        self.now = 0.0
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if not events and timeout:
+            self.now += timeout
+        return events
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop on a virtual clock: whenever every task is waiting, the clock jumps to the next timer.
+    An hour of checks runs in seconds, with the engine's own scheduling code. Nothing in it may wait
+    for real I/O (load the inventory before), since time would race ahead of the response.
+    """
+
+    def __init__(self):
+        self._virtual = _VirtualSelector()
+        super().__init__(self._virtual)
+
+    def time(self) -> float:
+        return self._virtual.now
+
+
+class LatencyModel:
+    """Check durations: log-normal around `median_ms`, or drawn from observed quantiles; a share times out."""
+
+    def __init__(self, median_ms: float = 150.0, sigma: float = 0.6, timeout_rate: float = 0.0,
+                 timeout_s: float = 10.0, quantiles_ms: Optional[Sequence[float]] = None, seed: int = 1):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.timeout_rate = timeout_rate
+        self.timeout_s = timeout_s
+        self.quantiles_ms = list(quantiles_ms) if quantiles_ms else None
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        """Duration of one check in seconds."""
+        if self.random.random() < self.timeout_rate:
+            return self.timeout_s
+        if self.quantiles_ms:
+            position = self.random.random() * (len(self.quantiles_ms) - 1)
+            index = int(position)
+            low, high = self.quantiles_ms[index], self.quantiles_ms[min(index + 1, len(self.quantiles_ms) - 1)]
+            ms = low + (high - low) * (position - index)
+        else:
+            ms = self.random.lognormvariate(math.log(self.median_ms), self.sigma)
+        return min(ms / 1000, self.timeout_s)
+
+    @classmethod
+    async def observed(cls, conn, hours: float, **kwargs) -> "LatencyModel":
+        """Percentiles of successful checks and the timeout share over the last `hours`."""
+        row = await conn.fetchrow(
+            f"""
+            SELECT percentile_cont(ARRAY(SELECT generate_series(0, 100) / 100.0))
+                       WITHIN GROUP (ORDER BY response_time_ms) FILTER (WHERE result = 'success') AS quantiles,
+                   (count(*) FILTER (WHERE result = 'timeout'))::FLOAT8 / GREATEST(count(*), 1) AS timeout_rate
+            FROM ({check_samples_sql("TRUE", "NOW() - make_interval(secs => $1)", "NOW()")}) c
+            """,
+            hours * 3600
+        )
+        if not row["quantiles"]:
+            raise ValueError(f"No successful checks in the last {hours} hour(s)")
+        return cls(quantiles_ms=row["quantiles"], timeout_rate=row["timeout_rate"], **kwargs)
+
+
+async def load_inventory(conn) -> Tuple[List[ProbeTarget], TenantQuotas]:
+    """Enabled monitored URLs with tenant quotas applied, as the probe engine would check them."""
+    rows = await conn.fetch("SELECT id, url, interval_seconds, owner_id, check_type FROM monitored_urls WHERE enabled")
+    quotas = await TenantQuotas.load(conn)
+    allowed = quotas.allowed_urls((row["id"], row["owner_id"]) for row in rows)
+    return [
+        ProbeTarget(row["id"], row["url"], float(max(row["interval_seconds"], quotas.get(row["owner_id"]).min_interval_s)),
+                    owner_id=row["owner_id"], check_type=row["check_type"])
+        for row in rows if row["id"] in allowed
+    ], quotas
+
+
+class SimulationStats:
+    """What the simulated engines did, per virtual second."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, warmup_s: float):
+        self.loop = loop
+        self.warmup_s = warmup_s
+        self.checks = Counter()      # Second -> checks started
+        self.rows = Counter()        # Second -> rows handed to the writer
+        self.lags: List[float] = []
+        self.connections = 0
+        self.peak_connections = 0
+
+    def measuring(self) -> bool:
+        return self.loop.time() >= self.warmup_s
+
+    def offer(self, rows) -> bool:
+        """Stands in for the CheckResultWriter: counts rows, never refuses them."""
+        self.rows[int(self.loop.time())] += len(rows)
+        return True
+
+
+class SimulatedEngine(ProbeEngine):
+    """
+    The real ProbeEngine scheduler, fair queue and concurrency slots, with each check replaced by a
+    sleep drawn from a LatencyModel (plus `cpu_s` on the worker's one core) and results counted
+    instead of written.
+    """
+
+    def __init__(self, inventory: List[ProbeTarget], quotas: TenantQuotas, latency: LatencyModel,
+                 stats: SimulationStats, cpu_s: float = 0.0, **kwargs):
+        super().__init__(None, stats, usage=UsageCounters(), clock=stats.loop.time, **kwargs)
+        self.inventory = inventory
+        self.latency = latency
+        self.stats = stats
+        self.cpu_s = cpu_s
+        self._cpu = asyncio.Lock()  # Parsing and TLS work of one process share one core
+        self.quotas = quotas
+
+    async def load_targets(self) -> Dict[int, ProbeTarget]:
+        index, count = self.partition
+        return {target.url_id: target for target in self.inventory if target.url_id % count == index}
+
+    async def start(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._wakeup = asyncio.Event()
+        self._queue = FairQueue()
+        self._queued = {}
+        self.targets = {}
+        await self.refresh_targets()
+        self._tasks = [
+            asyncio.create_task(self._schedule_loop(), name="probe-scheduler"),
+            asyncio.create_task(self._dispatch_loop(), name="probe-dispatcher"),
+        ]
+
+    async def stop(self):
+        for task in list(self._tasks) + list(self._in_flight):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._in_flight, return_exceptions=True)
+        self._tasks = []
+
+    def _record_lag(self, lag_s: float):
+        super()._record_lag(lag_s)
+        if self.stats.measuring():
+            self.stats.lags.append(lag_s)
+
+    async def check(self, target: ProbeTarget) -> tuple:
+        stats = self.stats
+        if stats.measuring():
+            stats.checks[int(stats.loop.time())] += 1
+        stats.connections += 1
+        stats.peak_connections = max(stats.peak_connections, stats.connections)
+        try:
+            duration_s = self.latency.sample()
+            if self.cpu_s:
+                async with self._cpu:
+                    await asyncio.sleep(self.cpu_s)
+            await asyncio.sleep(duration_s)
+        finally:
+            stats.connections -= 1
+        return (None, target.url_id, 200, duration_s * 1000, None, "success", None, None, None)
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return None
+    return values[round(q * (len(values) - 1))]
+
+
+def _rates(counter: Counter, start: int, end: int) -> dict:
+    seconds = [counter.get(second, 0) for second in range(start, end)]
+    return {"avg": round(sum(seconds) / max(len(seconds), 1), 1), "peak": max(seconds, default=0)}
+
+
+async def _simulate(inventory: List[ProbeTarget], quotas: TenantQuotas, latency: LatencyModel, workers: int,
+                    concurrency: int, duration_s: float, cpu_s: float) -> dict:
+    loop = asyncio.get_running_loop()
+    warmup_s = max((target.interval_s for target in inventory), default=0)  # New URLs spread over their first interval
+    stats = SimulationStats(loop, warmup_s)
+    engines = [SimulatedEngine(inventory, quotas, latency, stats, cpu_s=cpu_s, concurrency=concurrency,
+                               timeout_s=latency.timeout_s, refresh_s=10 * duration_s, partition=(index, workers))
+               for index in range(workers)]
+    for engine in engines:
+        await engine.start()
+    await asyncio.sleep(warmup_s + duration_s)
+    for engine in engines:
+        await engine.stop()
+
+    lags = sorted(stats.lags)
+    start, end = int(warmup_s), int(warmup_s + duration_s)
+    return {
+        "checks_per_s": _rates(stats.checks, start, end),
+        "expected_checks_per_s": round(sum(1 / target.interval_s for target in inventory), 1),
+        "scheduler_lag_ms": {name: None if value is None else round(value * 1000, 1) for name, value in (
+            ("p50", _percentile(lags, 0.5)), ("p95", _percentile(lags, 0.95)), ("p99", _percentile(lags, 0.99)),
+            ("max", lags[-1] if lags else None))},
+        "skipped_backlogged": sum(engine.skipped_backlogged for engine in engines),
+        "concurrent_checks_peak": stats.peak_connections,
+        "rows_per_s": _rates(stats.rows, start, end),
+        "_lag_p99_s": _percentile(lags, 0.99) or 0.0,
+    }
+
+
+def simulate(inventory: List[ProbeTarget], quotas: TenantQuotas, latency: LatencyModel, workers: int = 1,
+             concurrency: int = 200, duration_s: float = 3600.0, cpu_s: float = 0.0,
+             copy_rows_per_s: float = 50000.0) -> dict:
+    """
+    Runs `workers` simulated probe engines (one partition each, as apps.monitoring.runner does) over
+    `inventory` for `duration_s` virtual seconds after a warm-up of one check interval, and reports
+    throughput, scheduler lag, peak concurrent checks and the load on the COPY writer.
+    """
+    loop = VirtualTimeLoop()
+    started = time.perf_counter()
+    try:
+        result = loop.run_until_complete(
+            _simulate(inventory, quotas, latency, workers, concurrency, duration_s, cpu_s))
+    finally:
+        loop.close()
+    lag_p99_s = result.pop("_lag_p99_s")
+    peak_rows = result["rows_per_s"]["peak"]
+    writer_capacity = copy_rows_per_s * settings.INGEST_WRITER_CONCURRENCY
+    return {
+        "urls": len(inventory), "workers": workers, "concurrency_per_worker": concurrency,
+        "virtual_seconds": duration_s, "wall_seconds": round(time.perf_counter() - started, 1),
+        **result,
+        "writer": {
+            "copy_batches_per_s": round(max(result["rows_per_s"]["avg"] / settings.INGEST_BATCH_SIZE,
+                                            1 / settings.INGEST_FLUSH_INTERVAL_SECONDS), 2) if peak_rows else 0,
+            "copy_connections": settings.INGEST_WRITER_CONCURRENCY,
+            "ingest_pool_size": settings.DB_INGEST_POOL_SIZE,
+            "peak_utilization": round(peak_rows / writer_capacity, 3),
+        },
+        "saturated": lag_p99_s > SATURATED_LAG_S or result["skipped_backlogged"] > 0,
+    }
+
+
+def _verdict(report: dict) -> str:
+    lines = []
+    if report["saturated"]:
+        lines.append(f"SATURATED: checks wait {report['scheduler_lag_ms']['p99']} ms (p99) for a slot and "
+                     f"{report['skipped_backlogged']} runs were skipped; raise PROBE_CONCURRENCY or PROBE_WORKERS.")
+    else:
+        lines.append(f"OK: {report['checks_per_s']['avg']} checks/s of {report['expected_checks_per_s']} expected, "
+                     f"p99 scheduler lag {report['scheduler_lag_ms']['p99']} ms.")
+    if report["concurrent_checks_peak"] >= report["workers"] * report["concurrency_per_worker"]:
+        lines.append("All concurrency slots were in use at the peak.")
+    if report["writer"]["peak_utilization"] > 0.8:
+        lines.append(f"Writer: peak {report['rows_per_s']['peak']} rows/s is {report['writer']['peak_utilization']:.0%} "
+                     "of the COPY capacity; raise INGEST_WRITER_CONCURRENCY or enable INGEST_CHANGE_ONLY.")
+    if report["writer"]["copy_connections"] > report["writer"]["ingest_pool_size"]:
+        lines.append("DB_INGEST_POOL_SIZE is smaller than INGEST_WRITER_CONCURRENCY.")
+    return "\n".join(lines)
+
+
+async def _load(args) -> tuple:
+    inventory, quotas, latency = [], TenantQuotas(), None
+    timeout_s = settings.PROBE_TIMEOUT_SECONDS
+    if args.inventory or args.latency_from_db:
+        await database.initialize()
+        try:
+            async with database.acquire("analytics", readonly=True) as conn:
+                if args.inventory:
+                    inventory, quotas = await load_inventory(conn)
+                if args.latency_from_db:
+                    latency = await LatencyModel.observed(conn, args.latency_from_db, timeout_s=timeout_s, seed=args.seed)
+        finally:
+            await database.close()
+    if latency is None:
+        latency = LatencyModel(args.latency_ms, args.latency_sigma, args.timeout_rate, timeout_s, seed=args.seed)
+    inventory += [ProbeTarget(SYNTHETIC_URL_ID_BASE + i, f"https://simulated-{i}.invalid/", float(args.interval))
+                  for i in range(args.add_urls)]
+    return inventory, quotas, latency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simulate the probe scheduler in virtual time (no network) to plan capacity.")
+    parser.add_argument("--add-urls", type=int, default=0, help="Additional URLs to simulate")
+    parser.add_argument("--interval", type=float, default=60, help="Check interval of the additional URLs (seconds)")
+    parser.add_argument("--no-inventory", dest="inventory", action="store_false",
+                        help="Do not include the enabled URLs of the database")
+    parser.add_argument("--workers", type=int, default=settings.PROBE_WORKERS or os.cpu_count() or 1,
+                        help="Probe worker processes (default: PROBE_WORKERS, or one per core)")
+    parser.add_argument("--concurrency", type=int, default=settings.PROBE_CONCURRENCY, help="Checks in flight per worker")
+    parser.add_argument("--duration", type=float, default=3600, help="Virtual seconds to simulate after warm-up")
+    parser.add_argument("--latency-ms", type=float, default=150, help="Median check duration (log-normal)")
+    parser.add_argument("--latency-sigma", type=float, default=0.6, help="Spread of the log-normal durations")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of checks that run into PROBE_TIMEOUT_SECONDS")
+    parser.add_argument("--latency-from-db", type=float, metavar="HOURS", default=None,
+                        help="Draw durations and the timeout share from the checks of the last HOURS instead")
+    parser.add_argument("--cpu-ms", type=float, default=1.0, help="CPU time per check, serialized per worker process")
+    parser.add_argument("--copy-rows-per-s", type=float, default=50000,
+                        help="Rows one COPY flush task writes per second on the target database")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print only the JSON report")
+    args = parser.parse_args()
+    setup_logging()
+    inventory, quotas, latency = asyncio.run(_load(args))
+    if not inventory:
+        parser.error("Nothing to simulate: no enabled URLs and no --add-urls")
+    report = simulate(inventory, quotas, latency, workers=max(1, args.workers), concurrency=args.concurrency,
+                      duration_s=args.duration, cpu_s=args.cpu_ms / 1000, copy_rows_per_s=args.copy_rows_per_s)
+    print(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode())
+    if not args.json:
+        print(_verdict(report))
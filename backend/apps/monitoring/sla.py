@@ -0,0 +1,228 @@
+# backend/apps/monitoring/sla.py
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from asyncpg import Connection, Record
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.settings import settings
+from utils.db_utils import fetch_all, fetch_one
+from apps.monitoring.schemas import MaintenanceWindowCreate
+from apps.monitoring.checks import UP_SQL
+from apps.monitoring.runs import check_samples_sql
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Up/down/maintenance time of URLs ($3) in the period [$1, $2), as multirange arithmetic in Postgres.
+# A check is up by apps.monitoring.checks.UP_SQL: it succeeded and got no 4xx/5xx status.
+# Every check's state holds until the next check, or for at most $4 seconds for that URL (then: no data),
+# so the result is time-weighted and gaps in monitoring are not counted as uptime.
+# Each URL's checks (change-only runs expanded, see apps.monitoring.runs) are read in time order and
+# window functions keep only the first and last check of every run of equal state; the runs become
+# up/down multiranges, and maintenance windows are subtracted from both. Only run boundaries leave
+# the per-URL scans.
+SLA_COMPUTE_SQL = f"""
+WITH boundaries AS (
+    SELECT u.url_id, b.time, b.up, b.is_first, b.is_last, b.until
+    FROM unnest($3::BIGINT[], $4::FLOAT8[]) AS u(url_id, gap_s)
+    CROSS JOIN LATERAL (SELECT make_interval(secs => u.gap_s) AS gap) g
+    CROSS JOIN LATERAL (
+        SELECT time, up,
+               up IS DISTINCT FROM prev_up OR time - prev_time > g.gap AS is_first,
+               up IS DISTINCT FROM next_up OR next_time - time > g.gap AS is_last,
+               LEAST(COALESCE(next_time, $2), time + g.gap) AS until
+        FROM (
+            -- Descending order: LEAD is the previous check, LAG the next one
+            SELECT time, {UP_SQL} AS up,
+                   LEAD(time) OVER w AS prev_time, LEAD({UP_SQL}) OVER w AS prev_up,
+                   LAG(time) OVER w AS next_time, LAG({UP_SQL}) OVER w AS next_up
+            FROM ({check_samples_sql("url_id = u.url_id", "$1::TIMESTAMPTZ - g.gap", "$2")}) samples
+            WINDOW w AS (ORDER BY time DESC)
+        ) c
+    ) b
+    WHERE b.is_first OR b.is_last
+),
+runs AS (
+    SELECT url_id, up, start, until FROM (
+        SELECT url_id, up, is_last, until,
+               -- The boundary before the last check of a run is the run's first check
+               CASE WHEN is_first THEN time ELSE LAG(time) OVER (PARTITION BY url_id ORDER BY time) END AS start
+        FROM boundaries
+    ) r
+    WHERE is_last
+),
+states AS (
+    SELECT url_id,
+           range_agg(tstzrange(start, until)) FILTER (WHERE up) AS up,
+           range_agg(tstzrange(start, until)) FILTER (WHERE NOT up) AS down
+    FROM runs
+    GROUP BY url_id
+),
+maintenance AS (
+    SELECT ids.url_id, range_agg(tstzrange(m.starts_at, m.ends_at)) AS windows
+    FROM unnest($3::BIGINT[]) AS ids(url_id)
+    JOIN maintenance_windows m ON m.url_id = ids.url_id OR m.url_id IS NULL
+    WHERE m.starts_at < $2 AND m.ends_at > $1
+    GROUP BY ids.url_id
+),
+clipped AS (
+    SELECT ids.url_id, p.period,
+           COALESCE(s.up, '{{}}'::TSTZMULTIRANGE) * p.period - COALESCE(m.windows, '{{}}'::TSTZMULTIRANGE) AS up,
+           COALESCE(s.down, '{{}}'::TSTZMULTIRANGE) * p.period - COALESCE(m.windows, '{{}}'::TSTZMULTIRANGE) AS down,
+           COALESCE(m.windows, '{{}}'::TSTZMULTIRANGE) * p.period AS maintenance
+    FROM unnest($3::BIGINT[]) AS ids(url_id)
+    CROSS JOIN (SELECT tstzmultirange(tstzrange($1, $2)) AS period) p
+    LEFT JOIN states s ON s.url_id = ids.url_id
+    LEFT JOIN maintenance m ON m.url_id = ids.url_id
+),
+measured AS (
+    SELECT url_id, down,
+           (SELECT COALESCE(sum(EXTRACT(EPOCH FROM upper(r) - lower(r))), 0) FROM unnest(up) r)::FLOAT8 AS up_seconds,
+           (SELECT COALESCE(sum(EXTRACT(EPOCH FROM upper(r) - lower(r))), 0) FROM unnest(down) r)::FLOAT8 AS down_seconds,
+           (SELECT COALESCE(sum(EXTRACT(EPOCH FROM upper(r) - lower(r))), 0) FROM unnest(maintenance) r)::FLOAT8
+               AS maintenance_seconds,
+           (SELECT COALESCE(sum(EXTRACT(EPOCH FROM upper(r) - lower(r))), 0)
+            FROM unnest(period - up - down - maintenance) r)::FLOAT8 AS no_data_seconds,
+           (SELECT count(*) FROM unnest(down))::INTEGER AS incidents
+    FROM clipped
+)
+SELECT url_id, up_seconds, down_seconds, maintenance_seconds, no_data_seconds, incidents,
+       down_seconds / NULLIF(incidents, 0) AS mttr_seconds,
+       100 * up_seconds / NULLIF(up_seconds + down_seconds, 0) AS uptime_pct,
+       down AS downtime
+FROM measured
+"""
+
+REPORT_COLUMNS = ("url_id, up_seconds, down_seconds, maintenance_seconds, no_data_seconds, incidents, "
+                  "mttr_seconds, uptime_pct, downtime")
+
+# Downtime intervals as [[start, end], ...] for clients
+DOWNTIME_ARRAY = "ARRAY(SELECT ARRAY[lower(d), upper(d)] FROM unnest(r.downtime) d) AS downtime"
+
+
+def parse_month(value: str) -> date:
+    """'2026-09' -> date(2026, 9, 1); raises ValueError for anything else."""
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    end = datetime(month.year + month.month // 12, month.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+async def _report_urls(conn: Connection, end: datetime, url_ids: Optional[List[int]]) -> List[Record]:
+    """URLs that existed before `end` (all, or those in `url_ids`), with their check interval."""
+    return await fetch_all(
+        conn,
+        """
+        SELECT id, interval_seconds FROM monitored_urls
+        WHERE created_at < $1 AND ($2::BIGINT[] IS NULL OR id = ANY($2::BIGINT[]))
+        """,
+        end, url_ids
+    )
+
+
+def _compute_args(start: datetime, end: datetime, urls: List[Record]) -> tuple:
+    return (start, end, [url["id"] for url in urls],
+            [url["interval_seconds"] * settings.SLA_MAX_GAP_INTERVALS for url in urls])
+
+
+async def get_sla_report(conn: Connection, month: date, url_ids: Optional[List[int]] = None) -> dict:
+    """
+    Uptime, downtime intervals, incidents and MTTR per URL for one calendar month (UTC).
+
+    Months that ended more than SLA_FINALIZE_AFTER_HOURS ago are final: each URL's report is computed
+    once, stored in `sla_reports` and served from there (adding a maintenance window that touches the
+    month drops them). The current month is computed on each request, up to now.
+    """
+    start, end = month_bounds(month)
+    now = datetime.now(timezone.utc)
+    if start > now:
+        return {"month": month.strftime("%Y-%m"), "final": False, "computed": 0, "reports": []}
+    final = end + timedelta(hours=settings.SLA_FINALIZE_AFTER_HOURS) <= now
+    urls = await _report_urls(conn, min(end, now), url_ids)
+    if not final:
+        records = await fetch_all(
+            conn,
+            f"""
+            SELECT r.url_id, u.url, r.uptime_pct, r.up_seconds, r.down_seconds, r.maintenance_seconds,
+                   r.no_data_seconds, r.incidents, r.mttr_seconds, {DOWNTIME_ARRAY}
+            FROM ({SLA_COMPUTE_SQL}) r
+            JOIN monitored_urls u ON u.id = r.url_id
+            ORDER BY r.url_id
+            """,
+            *_compute_args(start, now, urls)
+        )
+        return {"month": month.strftime("%Y-%m"), "final": False, "computed": len(records), "reports": records}
+
+    cached = {row["url_id"] for row in await fetch_all(
+        conn, "SELECT url_id FROM sla_reports WHERE month = $1 AND url_id = ANY($2::BIGINT[])",
+        month, [url["id"] for url in urls]
+    )}
+    missing = [url for url in urls if url["id"] not in cached]
+    if missing:
+        await conn.execute(
+            f"""
+            INSERT INTO sla_reports (month, {REPORT_COLUMNS})
+            SELECT $5::DATE, {REPORT_COLUMNS} FROM ({SLA_COMPUTE_SQL}) r
+            ON CONFLICT (month, url_id) DO NOTHING
+            """,
+            *_compute_args(start, end, missing), month
+        )
+        logger.info(f"SLA reports for {month:%Y-%m} computed for {len(missing)} URL(s).")
+    records = await fetch_all(
+        conn,
+        f"""
+        SELECT r.url_id, u.url, r.uptime_pct, r.up_seconds, r.down_seconds, r.maintenance_seconds,
+               r.no_data_seconds, r.incidents, r.mttr_seconds, {DOWNTIME_ARRAY}
+        FROM sla_reports r
+        JOIN monitored_urls u ON u.id = r.url_id
+        WHERE r.month = $1 AND r.url_id = ANY($2::BIGINT[])
+        ORDER BY r.url_id
+        """,
+        month, [url["id"] for url in urls]
+    )
+    return {"month": month.strftime("%Y-%m"), "final": True, "computed": len(missing), "reports": records}
+
+
+async def add_maintenance_window(conn: Connection, window: MaintenanceWindowCreate,
+                                 created_by: Optional[UUID]) -> Record:
+    """Stores a maintenance window and drops the cached reports of the months it touches."""
+    async with conn.transaction():
+        record = await fetch_one(
+            conn,
+            """
+            INSERT INTO maintenance_windows (url_id, starts_at, ends_at, reason, created_by)
+            VALUES ($1, $2, $3, $4, $5)
+            RETURNING id, url_id, starts_at, ends_at, reason, created_at
+            """,
+            window.url_id, window.starts_at, window.ends_at, window.reason, created_by
+        )
+        await conn.execute(
+            """
+            DELETE FROM sla_reports
+            WHERE month >= date_trunc('month', $1::TIMESTAMPTZ AT TIME ZONE 'UTC')::DATE
+              AND month < $2::TIMESTAMPTZ AT TIME ZONE 'UTC' AND ($3::BIGINT IS NULL OR url_id = $3)
+            """,
+            window.starts_at, window.ends_at, window.url_id
+        )
+    return record
+
+
+async def get_maintenance_windows(conn: Connection, since: datetime) -> List[Record]:
+    """Maintenance windows that end after `since`, earliest first."""
+    return await fetch_all(
+        conn,
+        """
+        SELECT m.id, m.url_id, u.url, m.starts_at, m.ends_at, m.reason, m.created_at
+        FROM maintenance_windows m
+        LEFT JOIN monitored_urls u ON u.id = m.url_id
+        WHERE m.ends_at > $1
+        ORDER BY m.starts_at, m.id
+        """,
+        since
+    )
@@ -0,0 +1,299 @@
+# backend/apps/monitoring/spill.py
+import fcntl
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+
+import orjson
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Record frame: payload length and CRC32, then the payload (see encode_rows)
+FRAME_HEADER = struct.Struct("<II")
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+CURSOR_FILE = "CURSOR"
+LOCK_FILE = "LOCK"
+# Rows the database refused for good, kept for inspection; never replayed. Rotated once, to QUARANTINE_FILE + ".1"
+QUARANTINE_FILE = "quarantine.log"
+ROTATED_SUFFIX = ".1"
+# Version 1 payloads were a bare array of rows; version 2 names the columns of its rows
+FORMAT_VERSION = 2
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# (segment sequence number, byte offset within that segment)
+Position = Tuple[int, int]
+
+
+def encode_rows(rows: Sequence[tuple], columns: Sequence[str]) -> bytes:
+    """
+    check_results rows -> payload: {"v": 2, "columns": [...], "rows": [...]}. The leading datetime
+    is stored as epoch microseconds.
+    """
+    return orjson.dumps({
+        "v": FORMAT_VERSION,
+        "columns": list(columns),
+        "rows": [[(row[0] - EPOCH) // ONE_MICROSECOND, *row[1:]] for row in rows],
+    })
+
+
+def decode_rows(payload: bytes, columns: Sequence[str]) -> List[tuple]:
+    """
+    Payload -> rows laid out as `columns`, whatever layout they were spilled with: columns the record
+    lacks are None, columns the record has but `columns` does not are dropped. Version 1 rows (no
+    header) are a prefix of today's columns, which have only ever been added at the end.
+    """
+    document = orjson.loads(payload)
+    if isinstance(document, list):
+        stored, rows = None, document
+    else:
+        stored, rows = document["columns"], document["rows"]
+    if stored is not None and list(stored) != list(columns):
+        index = {name: i for i, name in enumerate(stored)}
+        rows = [[row[index[name]] if name in index else None for name in columns] for row in rows]
+    width = len(columns)
+    return [(EPOCH + timedelta(microseconds=row[0]), *row[1:width], *(None,) * (width - len(row)))
+            for row in rows]
+
+
+class SpillLogFull(Exception):
+    """The spill log reached its disk budget."""
+    pass
+
+
+class SpillLog:
+    """
+    Append-only, segmented on-disk log of check result batches.
+
+    Batches are appended as CRC-framed records with buffered sequential writes to the active
+    segment, which is rotated every `segment_bytes`. Records are read back strictly in append order;
+    the read position is persisted in a small CURSOR file after each committed batch, and segments
+    are deleted once fully replayed. Total size is capped at `max_bytes`: appends beyond it fail
+    (the caller pushes back) instead of silently dropping older data. A torn record at the end of a
+    segment (crash mid-write) is detected by its length/CRC and skipped.
+
+    Each record names the `columns` of its rows, and rows are read back in the current layout, so
+    rows spilled before an upgrade that added columns still replay after it. Rows the database
+    refuses for good, and records that cannot be decoded, go to a quarantine file instead of
+    blocking replay. The quarantine has its own budget, `quarantine_max_bytes`, outside `max_bytes`:
+    its file is rotated at half of it, and the previous rotation is deleted, so poison rows never
+    use up the room left for replay.
+
+    The directory is locked with flock, so each process owns exactly one log.
+    """
+
+    def __init__(self, directory: str, columns: Sequence[str], segment_bytes: int = 16 * 1024 * 1024,
+                 max_bytes: int = 1024 * 1024 * 1024, quarantine_max_bytes: int = 64 * 1024 * 1024,
+                 fsync: bool = False):
+        self.directory = directory
+        self.columns = tuple(columns)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.quarantine_max_bytes = quarantine_max_bytes
+        self.fsync = fsync
+        self._segments: List[int] = []   # Sequence numbers on disk, oldest first; the last one is active
+        self._sizes = {}
+        self._cursor: Position = (0, 0)
+        self._quarantine_sizes = [0, 0]   # Active quarantine file, rotated one
+        self._active = None
+        self._lock_fd = None
+
+    # --- Lifecycle ---
+
+    def try_open(self) -> bool:
+        """Locks and opens the log. Returns False if another process holds it."""
+        os.makedirs(self.directory, exist_ok=True)
+        lock_fd = os.open(os.path.join(self.directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock_fd)
+            return False
+        self._lock_fd = lock_fd
+
+        names = [name for name in os.listdir(self.directory) if name.startswith(SEGMENT_PREFIX)]
+        self._segments = sorted(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) for name in names)
+        self._sizes = {seq: os.path.getsize(self._path(seq)) for seq in self._segments}
+        for seq in [s for s in self._segments if not self._sizes[s]]:
+            os.remove(self._path(seq))  # Left by an earlier process that never spilled
+            self._segments.remove(seq)
+            del self._sizes[seq]
+        path = self._quarantine_path()
+        self._quarantine_sizes = [os.path.getsize(p) if os.path.exists(p) else 0 for p in (path, path + ROTATED_SUFFIX)]
+        self._cursor = self._load_cursor()
+        # Never append after a possibly torn tail: every process lifetime starts a fresh segment
+        self._open_new_segment()
+        if self.unread_bytes:
+            logger.warning(f"Spill log {self.directory} has {self.unread_bytes} bytes pending replay.")
+        return True
+
+    def close(self):
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # Releases the flock
+            self._lock_fd = None
+
+    # --- Introspection ---
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes of the segments, counted against `max_bytes` (the quarantine is not)."""
+        return sum(self._sizes.values())
+
+    @property
+    def quarantine_bytes(self) -> int:
+        return sum(self._quarantine_sizes)
+
+    @property
+    def unread_bytes(self) -> int:
+        seq, offset = self._cursor
+        return sum(size for s, size in self._sizes.items() if s >= seq) - (offset if seq in self._sizes else 0)
+
+    @property
+    def empty(self) -> bool:
+        return self.unread_bytes == 0
+
+    # --- Writing ---
+
+    def append(self, rows: Sequence[tuple]):
+        """Appends one batch as a single record. Raises SpillLogFull beyond the disk budget."""
+        record = _frame(encode_rows(rows, self.columns))
+        if self.total_bytes + len(record) > self.max_bytes:
+            raise SpillLogFull(f"Spill log {self.directory} is at its {self.max_bytes} byte limit")
+        active = self._segments[-1]
+        if self._sizes[active] and self._sizes[active] + len(record) > self.segment_bytes:
+            self._open_new_segment()
+            active = self._segments[-1]
+        self._active.write(record)
+        self._active.flush()  # Hand the bytes to the OS so the reader (and a restarted process) sees them
+        if self.fsync:
+            os.fsync(self._active.fileno())
+        self._sizes[active] += len(record)
+
+    def quarantine(self, rows: Sequence[tuple]):
+        """Sets rows aside in the quarantine file (same record format), rotating it past half its budget."""
+        self._quarantine(_frame(encode_rows(rows, self.columns)))
+
+    def _quarantine(self, record: bytes):
+        path = self._quarantine_path()
+        active, rotated = self._quarantine_sizes
+        if active and active + len(record) > self.quarantine_max_bytes // 2:
+            os.replace(path, path + ROTATED_SUFFIX)
+            if rotated:
+                logger.warning(f"Spill log {self.directory}: quarantine full; {rotated} bytes of older "
+                               f"quarantined rows deleted.")
+            self._quarantine_sizes = [0, active]
+        with open(path, "ab") as f:
+            f.write(record)
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._quarantine_sizes[0] += len(record)
+
+    # --- Reading ---
+
+    def read_next(self) -> Optional[Tuple[List[tuple], Position]]:
+        """
+        Returns the next unread batch and the position just after it, or None if everything has been read.
+        The position only becomes durable once passed to commit().
+        """
+        seq, offset = self._cursor
+        for seq in [s for s in self._segments if s >= seq]:
+            if seq != self._cursor[0]:
+                offset = 0
+            size = self._sizes[seq]
+            if offset < size:
+                with open(self._path(seq), "rb") as f:
+                    f.seek(offset)
+                    header = f.read(FRAME_HEADER.size)
+                    if len(header) == FRAME_HEADER.size:
+                        length, crc = FRAME_HEADER.unpack(header)
+                        payload = f.read(length)
+                        if len(payload) == length and zlib.crc32(payload) == crc:
+                            position = (seq, offset + FRAME_HEADER.size + length)
+                            try:
+                                return decode_rows(payload, self.columns), position
+                            except (ValueError, KeyError, TypeError, IndexError) as e:
+                                # Intact but unreadable: set it aside and read on, never retry it
+                                logger.error(f"Spill log {self.directory}: undecodable record in segment {seq} "
+                                             f"at offset {offset} ({e!r}); quarantined.")
+                                try:
+                                    self._quarantine(header + payload)
+                                except OSError as quarantine_error:
+                                    logger.error(f"Spill log {self.directory}: record dropped: {quarantine_error}")
+                                self.commit(position)
+                                return self.read_next()
+                if seq != self._segments[-1]:
+                    logger.error(f"Spill log {self.directory}: torn record in segment {seq} at offset {offset}; "
+                                 f"skipping {size - offset} bytes.")
+                    self._cursor = (seq, size)
+                continue
+        return None
+
+    def commit(self, position: Position):
+        """Marks everything before `position` as replayed and deletes fully replayed segments."""
+        self._cursor = position
+        seq, offset = position
+        for old in [s for s in self._segments if s < seq or (s == seq and offset >= self._sizes[s])]:
+            if old == self._segments[-1]:
+                break  # Keep the active segment
+            os.remove(self._path(old))
+            self._segments.remove(old)
+            del self._sizes[old]
+        self._store_cursor()
+
+    # --- Internals ---
+
+    def _quarantine_path(self) -> str:
+        return os.path.join(self.directory, QUARANTINE_FILE)
+
+    def _path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{seq:012d}{SEGMENT_SUFFIX}")
+
+    def _open_new_segment(self):
+        if self._active is not None:
+            self._active.close()
+        # Past the cursor too: it may name an empty segment that try_open() removed
+        seq = max(self._segments[-1] if self._segments else 0, self._cursor[0]) + 1
+        self._active = open(self._path(seq), "ab", buffering=1024 * 1024)
+        self._segments.append(seq)
+        self._sizes[seq] = 0
+
+    def _load_cursor(self) -> Position:
+        try:
+            with open(os.path.join(self.directory, CURSOR_FILE)) as f:
+                seq, offset = (int(value) for value in f.read().split())
+                return seq, offset
+        except (FileNotFoundError, ValueError):
+            return (self._segments[0], 0) if self._segments else (0, 0)
+
+    def _store_cursor(self):
+        path = os.path.join(self.directory, CURSOR_FILE)
+        with open(path + ".tmp", "w") as f:
+            f.write(f"{self._cursor[0]} {self._cursor[1]}")
+        os.replace(path + ".tmp", path)
+
+
+def _frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def open_slot(base_directory: str, columns: Sequence[str], max_slots: int = 256, **kwargs) -> Optional[SpillLog]:
+    """
+    Opens the first spill log under `base_directory` (slot-0, slot-1, ...) not locked by another process.
+    Slots are reused across restarts, so a new worker picks up and replays what a previous one left behind.
+    """
+    for slot in range(max_slots):
+        log = SpillLog(os.path.join(base_directory, f"slot-{slot}"), columns, **kwargs)
+        if log.try_open():
+            return log
+    logger.error(f"No free spill log slot under {base_directory}.")
+    return None
@@ -0,0 +1,196 @@
+# backend/apps/monitoring/tenants.py
+import asyncio
+import heapq
+import itertools
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from asyncpg import Connection
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.database import Database
+from config.settings import settings
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# A tenant is the owner (users.id) of a monitored URL. URLs without an owner are managed by
+# admins and are exempt from quotas; their usage is recorded under the nil UUID.
+UNOWNED_TENANT = UUID(int=0)
+
+
+@dataclass(frozen=True)
+class TenantQuota:
+    max_urls: Optional[int]           # None: unlimited
+    min_interval_s: int
+    weight: float                     # Share of the probe engine's capacity relative to other tenants
+
+
+UNLIMITED = TenantQuota(max_urls=None, min_interval_s=1, weight=1.0)
+
+
+def default_quota() -> TenantQuota:
+    return TenantQuota(settings.TENANT_DEFAULT_MAX_URLS, settings.TENANT_DEFAULT_MIN_INTERVAL_SECONDS,
+                       settings.TENANT_DEFAULT_WEIGHT)
+
+
+class TenantQuotas:
+    """
+    Effective quota of every tenant: a `tenant_quotas` row for the user, else one for the user's role,
+    else the TENANT_DEFAULT_* settings; each field falls back separately.
+    """
+
+    def __init__(self, overrides: Optional[Dict[UUID, TenantQuota]] = None):
+        self.default = default_quota()
+        self.overrides = overrides or {}
+
+    @classmethod
+    async def load(cls, conn: Connection) -> "TenantQuotas":
+        rows = await conn.fetch(
+            """
+            SELECT u.id,
+                   COALESCE(uq.max_urls, rq.max_urls) AS max_urls,
+                   COALESCE(uq.min_interval_seconds, rq.min_interval_seconds) AS min_interval_seconds,
+                   COALESCE(uq.weight, rq.weight) AS weight
+            FROM users u
+            LEFT JOIN tenant_quotas uq ON uq.user_id = u.id
+            LEFT JOIN tenant_quotas rq ON rq.role_id = u.role_id
+            WHERE uq.id IS NOT NULL OR rq.id IS NOT NULL
+            """
+        )
+        quotas = cls()
+        for row in rows:
+            quotas.overrides[row["id"]] = TenantQuota(
+                row["max_urls"] if row["max_urls"] is not None else quotas.default.max_urls,
+                row["min_interval_seconds"] if row["min_interval_seconds"] is not None else quotas.default.min_interval_s,
+                float(row["weight"]) if row["weight"] is not None else quotas.default.weight,
+            )
+        return quotas
+
+    def get(self, tenant: Optional[UUID]) -> TenantQuota:
+        if tenant is None:
+            return UNLIMITED
+        return self.overrides.get(tenant, self.default)
+
+    def allowed_urls(self, urls: Iterable[Tuple[int, Optional[UUID]]]) -> Set[int]:
+        """
+        Ids of the (url_id, owner) pairs within their owner's URL count quota; the oldest URLs
+        (lowest ids) are kept, so adding URLs beyond the quota never disables existing ones.
+        """
+        counts: Dict[Optional[UUID], int] = defaultdict(int)
+        allowed, over_quota = set(), defaultdict(int)
+        for url_id, owner in sorted(urls, key=lambda pair: pair[0]):
+            max_urls = self.get(owner).max_urls
+            if max_urls is not None and counts[owner] >= max_urls:
+                over_quota[owner] += 1
+                continue
+            counts[owner] += 1
+            allowed.add(url_id)
+        for owner, skipped in over_quota.items():
+            logger.warning(f"Tenant {owner}: {skipped} URL(s) over the quota of {self.get(owner).max_urls} are not checked.")
+        return allowed
+
+
+class FairQueue:
+    """
+    Weighted fair queue of due checks across tenants (start-time fair queuing).
+
+    Each item is tagged with a virtual start time: max(current virtual time, the finish tag of the
+    tenant's previous item), and the tenant's finish tag advances by 1 / weight. Items are served in
+    tag order, so a tenant that enqueues 50k checks at once only queues behind itself: another
+    tenant's next check is tagged at the current virtual time and served right away.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+        self._finish: Dict[Any, float] = {}
+        self.virtual_time = 0.0
+        self._not_empty = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def put(self, tenant, item, weight: float = 1.0):
+        start = max(self.virtual_time, self._finish.get(tenant, 0.0))
+        self._finish[tenant] = start + 1.0 / weight
+        heapq.heappush(self._heap, (start, next(self._seq), item))
+        self._not_empty.set()
+
+    async def get(self):
+        while not self._heap:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        start, _, item = heapq.heappop(self._heap)
+        self.virtual_time = start
+        if len(self._finish) > 4 * len(self._heap) + 1024:
+            # Tenants whose finish tag is in the past start from the virtual time anyway
+            self._finish = {t: f for t, f in self._finish.items() if f > self.virtual_time}
+        return item
+
+
+class UsageCounters:
+    """
+    Per-tenant, per-day usage accumulated in memory and added to `tenant_usage` by `flush()`
+    in one statement, instead of a row update per check or per ingested batch.
+    """
+
+    def __init__(self):
+        self._counters: Dict[Tuple[UUID, date], List[float]] = {}
+
+    def _slot(self, tenant: Optional[UUID]) -> List[float]:
+        key = (tenant or UNOWNED_TENANT, datetime.now(timezone.utc).date())
+        slot = self._counters.get(key)
+        if slot is None:
+            slot = self._counters[key] = [0, 0.0, 0]
+        return slot
+
+    def add_check(self, tenant: Optional[UUID], duration_ms: float):
+        slot = self._slot(tenant)
+        slot[0] += 1
+        slot[1] += duration_ms
+
+    def add_ingested(self, tenant: Optional[UUID], rows: int):
+        self._slot(tenant)[2] += rows
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    async def flush(self, db: Database) -> int:
+        """Writes and resets the counters; on failure they are merged back for the next flush."""
+        if not self._counters:
+            return 0
+        counters, self._counters = self._counters, {}
+        keys = list(counters)
+        try:
+            await db.initialize()
+            async with db.pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO tenant_usage (tenant_id, day, checks, check_ms, ingested_rows)
+                    SELECT * FROM unnest($1::UUID[], $2::DATE[], $3::BIGINT[], $4::DOUBLE PRECISION[], $5::BIGINT[])
+                    ON CONFLICT (tenant_id, day) DO UPDATE
+                    SET checks = tenant_usage.checks + EXCLUDED.checks,
+                        check_ms = tenant_usage.check_ms + EXCLUDED.check_ms,
+                        ingested_rows = tenant_usage.ingested_rows + EXCLUDED.ingested_rows
+                    """,
+                    [tenant for tenant, _ in keys], [day for _, day in keys],
+                    [int(counters[key][0]) for key in keys], [counters[key][1] for key in keys],
+                    [int(counters[key][2]) for key in keys],
+                )
+        except Exception as e:
+            logger.warning(f"Could not flush tenant usage ({len(keys)} counter(s)); will retry: {e}")
+            for key, values in counters.items():
+                slot = self._counters.setdefault(key, [0, 0.0, 0])
+                for i, value in enumerate(values):
+                    slot[i] += value
+            return 0
+        return len(keys)
+
+
+# Per-process usage counters (flushed by the probe engine, and by a scheduler job in API workers)
+usage_counters = UsageCounters()
@@ -0,0 +1,182 @@
+# backend/apps/monitoring/tls.py
+import hashlib
+import ssl
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
+
+import aiohttp
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+_ENCODING_DER = getattr(ssl, "_ssl").ENCODING_DER
+
+
+@dataclass
+class CertificateInfo:
+    """Leaf certificate details plus a summary of the verified chain (one row of `tls_certificates`)."""
+    fingerprint: str                  # SHA-256 of the leaf certificate (DER), hex
+    subject: str
+    issuer: str
+    sans: List[str]
+    serial_number: str
+    not_before: datetime
+    not_after: datetime
+    chain_not_after: datetime         # Earliest expiry in the chain (an intermediate can expire first)
+    chain_length: int
+
+
+def certificate_chain_der(ssl_object) -> List[bytes]:
+    """
+    DER certificates presented by the peer, leaf first. Uses the verified chain when the interpreter
+    exposes it (public on 3.13+, on the C object before that); otherwise only the leaf.
+    """
+    get_chain = getattr(ssl_object, "get_verified_chain", None) \
+        or getattr(getattr(ssl_object, "_sslobj", None), "get_verified_chain", None)
+    if get_chain is not None:
+        try:
+            chain = get_chain() or []
+            ders = [cert if isinstance(cert, bytes) else cert.public_bytes(_ENCODING_DER) for cert in chain]
+            if ders:
+                return ders
+        except (ssl.SSLError, ValueError, AttributeError):
+            pass
+    leaf = ssl_object.getpeercert(binary_form=True)
+    return [leaf] if leaf else []
+
+
+def fingerprint(der: bytes) -> str:
+    return hashlib.sha256(der).hexdigest()
+
+
+def parse_certificate_chain(chain_der: List[bytes]) -> CertificateInfo:
+    """Parses the chain with `cryptography` (the expensive part; callers go through CertificateCache)."""
+    from cryptography import x509
+
+    certificates = [x509.load_der_x509_certificate(der) for der in chain_der]
+    leaf = certificates[0]
+    try:
+        san_extension = leaf.extensions.get_extension_for_class(x509.SubjectAlternativeName)
+        sans = [str(name) for name in san_extension.value.get_values_for_type(x509.DNSName)]
+        sans += [str(ip) for ip in san_extension.value.get_values_for_type(x509.IPAddress)]
+    except x509.ExtensionNotFound:
+        sans = []
+    return CertificateInfo(
+        fingerprint=fingerprint(chain_der[0]),
+        subject=leaf.subject.rfc4514_string(),
+        issuer=leaf.issuer.rfc4514_string(),
+        sans=sans,
+        serial_number=format(leaf.serial_number, "x"),
+        not_before=leaf.not_valid_before_utc,
+        not_after=leaf.not_valid_after_utc,
+        chain_not_after=min(cert.not_valid_after_utc for cert in certificates),
+        chain_length=len(certificates),
+    )
+
+
+class CertificateCache:
+    """
+    LRU of parsed certificates keyed by (host, leaf fingerprint).
+
+    A repeat check of an unchanged certificate costs one SHA-256 of the leaf DER and a dict lookup;
+    the chain is only extracted and parsed when a host presents a certificate not seen before.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CertificateInfo]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, host: str, ssl_object) -> Optional[CertificateInfo]:
+        leaf = ssl_object.getpeercert(binary_form=True)
+        if not leaf:
+            return None
+        key = (host, fingerprint(leaf))
+        info = self._entries.get(key)
+        if info is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return info
+        self.misses += 1
+        try:
+            info = parse_certificate_chain(certificate_chain_der(ssl_object))
+        except Exception as e:  # Malformed certificates must not fail the check
+            logger.warning(f"Could not parse TLS certificate of {host}: {e}")
+            return None
+        self._entries[key] = info
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return info
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TLSAwareResponse(aiohttp.ClientResponse):
+    """
+    Session `response_class` that remembers the SSLObject and peer address of the connection that
+    served the response. aiohttp hands a short body's connection back to the pool before the caller
+    sees the response, so the transport cannot be asked afterwards.
+    """
+
+    ssl_object = None
+    peer_ip = None
+
+    async def start(self, connection):
+        transport = connection.transport
+        if transport is not None:
+            self.ssl_object = transport.get_extra_info("ssl_object")
+            peername = transport.get_extra_info("peername")
+            if peername:
+                self.peer_ip = peername[0]
+        return await super().start(connection)
+
+
+# --- Connection timing ---
+
+def new_connect_timing() -> SimpleNamespace:
+    """Per-request context for connect_timing_trace(); pass as `trace_request_ctx`."""
+    return SimpleNamespace(started=None, dns_s=0.0, dns_started=None, connect_ms=None)
+
+
+def connect_timing_trace() -> aiohttp.TraceConfig:
+    """
+    Records, per request, how long opening a new connection took without DNS resolution:
+    TCP connect plus, for https, the TLS handshake. Stays None when a pooled connection was reused.
+    """
+    async def on_create_start(session, ctx, params):
+        timing = ctx.trace_request_ctx
+        timing.started, timing.dns_s = time.perf_counter(), 0.0  # Redirects: the last new connection wins
+
+    async def on_dns_start(session, ctx, params):
+        ctx.trace_request_ctx.dns_started = time.perf_counter()
+
+    async def on_dns_end(session, ctx, params):
+        timing = ctx.trace_request_ctx
+        if timing.dns_started is not None:
+            timing.dns_s += time.perf_counter() - timing.dns_started
+
+    async def on_create_end(session, ctx, params):
+        timing = ctx.trace_request_ctx
+        if timing.started is not None:
+            timing.connect_ms = (time.perf_counter() - timing.started - timing.dns_s) * 1000
+
+    trace = aiohttp.TraceConfig(trace_config_ctx_factory=_timing_ctx_factory)
+    trace.on_connection_create_start.append(on_create_start)
+    trace.on_dns_resolvehost_start.append(on_dns_start)
+    trace.on_dns_resolvehost_end.append(on_dns_end)
+    trace.on_connection_create_end.append(on_create_end)
+    return trace
+
+
+def _timing_ctx_factory(trace_request_ctx=None):
+    # Requests made without a timing context (none today) get a throwaway one
+    return SimpleNamespace(trace_request_ctx=trace_request_ctx or new_connect_timing())
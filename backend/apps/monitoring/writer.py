@@ -0,0 +1,356 @@
+# backend/apps/monitoring/writer.py
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.database import database, Database
+from config.settings import settings
+from apps.monitoring.spill import SpillLog, SpillLogFull, open_slot
+from apps.monitoring.runs import RunLengthEncoder
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Column order of the tuples handed to CheckResultWriter.offer()
+CHECK_RESULT_COLUMNS = (
+    "time", "url_id", "status_code", "response_time_ms", "content_length", "result", "error", "content_changed",
+    "connect_ms",
+)
+
+CheckRow = Tuple
+
+RUNS_TASK_NAME = "check-writer:runs"
+
+# Bounds how long a flush task waits on an unhealthy database before the batch is spilled/retried
+COPY_TIMEOUT_S = 30.0
+# Errors that retrying cannot fix: rows the server refuses (deleted URL, NOT NULL) or asyncpg cannot encode
+# (a value outside SMALLINT/INTEGER, a wrong type or column count). Anything else (connection, timeout,
+# server overload) is retried.
+PERMANENT_COPY_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError,
+                         OverflowError, TypeError, ValueError, IndexError)
+
+
+@dataclass
+class WriterStats:
+    accepted_rows: int = 0
+    rejected_rows: int = 0        # Refused by offer() because the buffer was full (backpressure)
+    spilled_rows: int = 0         # Written to the on-disk spill log instead of memory
+    replayed_rows: int = 0        # Written from the spill log to the database
+    written_rows: int = 0
+    folded_rows: int = 0          # Change-only storage: folded into a check_runs run instead of written
+    dead_rows: int = 0            # Refused by the database for good (deleted URL, out-of-range value)
+    flushes: int = 0
+    failed_flushes: int = 0
+    last_flush_duration_s: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class CheckResultWriter:
+    """
+    Buffers check results in memory and writes them to `check_results` in batches with COPY.
+
+    Producers (the ingestion endpoint, probe engines) call `offer(rows)`, which never blocks and never
+    touches the database; it returns False when the buffer is full so the caller can push back
+    (e.g. HTTP 429). A small fixed number of flush tasks drain the buffer, each on one pooled
+    connection, so the database sees a few long-lived writers instead of one connection per agent.
+
+    With a spill directory configured, rows that do not fit in memory and batches whose COPY fails
+    go to an on-disk SpillLog instead (one per worker process) and are replayed in order once the
+    database keeps up again. Producers then only see backpressure when the disk budget is used up too.
+    A batch that fails for good (PERMANENT_COPY_ERRORS) is bisected down to the offending rows, which
+    are quarantined in the spill log (dropped without one; counted in `dead_rows`) so they never block
+    the rows behind them, in memory or in the spill log.
+
+    With a RunLengthEncoder (`runs`, INGEST_CHANGE_ONLY), only rows that change a URL's status or
+    latency band are written; the others extend runs in `check_runs`, flushed by a separate task.
+
+    Listeners (`add_listener`) see every accepted batch synchronously, before it is written; they must
+    be cheap and never block (e.g. apps.monitoring.incidents correlating failures in memory).
+    """
+
+    def __init__(self, db: Database, batch_size: int = 5000, flush_interval_s: float = 1.0,
+                 max_pending: int = 100_000, concurrency: int = 2, spill_dir: Optional[str] = None,
+                 spill_segment_bytes: int = 16 * 1024 * 1024, spill_max_bytes: int = 1024 * 1024 * 1024,
+                 spill_quarantine_max_bytes: int = 64 * 1024 * 1024, spill_fsync: bool = False, pool_name: str = "ingest", runs: Optional[RunLengthEncoder] = None):
+        self.db = db
+        self.pool_name = pool_name  # Named pool of config.database: COPY never competes with logins
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self.concurrency = concurrency
+        self.stats = WriterStats()
+        self._pending: Deque[CheckRow] = deque()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self.spill_dir = spill_dir
+        self._spill_options = dict(segment_bytes=spill_segment_bytes, max_bytes=spill_max_bytes,
+                                   quarantine_max_bytes=spill_quarantine_max_bytes, fsync=spill_fsync)
+        self.spill: Optional[SpillLog] = None
+        self._replay_lock = asyncio.Lock()
+        self.listeners: List[Callable[[Sequence[CheckRow]], None]] = []
+        self.runs = runs
+
+    def add_listener(self, listener: Callable[[Sequence[CheckRow]], None]):
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def has_capacity(self, rows: int = 1) -> bool:
+        if len(self._pending) + rows <= self.max_pending:
+            return True
+        return self.spill is not None and self.spill.total_bytes < self.spill.max_bytes
+
+    def offer(self, rows: Sequence[CheckRow]) -> bool:
+        """Queues rows for writing (all or nothing). Returns False if neither memory nor disk can take them."""
+        if self._stopping:
+            self.stats.rejected_rows += len(rows)
+            return False
+        stored = rows
+        if self.runs is not None:
+            if not self.has_capacity(len(rows)):  # Checked before folding, so rejected rows never count in a run
+                self.stats.rejected_rows += len(rows)
+                return False
+            stored = self.runs.encode(rows)
+            self.stats.folded_rows += len(rows) - len(stored)
+        if len(self._pending) + len(stored) <= self.max_pending:
+            self._pending.extend(stored)
+        elif not self._spill_rows(stored):
+            self.stats.rejected_rows += len(rows)
+            return False
+        self.stats.accepted_rows += len(rows)
+        for listener in self.listeners:
+            try:
+                listener(rows)
+            except Exception as e:  # A listener bug must not lose results
+                logger.error(f"Check result writer: listener {listener!r} failed: {e}", exc_info=True)
+        if len(self._pending) >= self.batch_size or self.spill is not None and not self.spill.empty:
+            self._wakeup.set()
+        return True
+
+    def _spill_rows(self, rows: Sequence[CheckRow]) -> bool:
+        if self.spill is None or not rows:
+            return False
+        try:
+            self.spill.append(rows)
+        except (SpillLogFull, OSError) as e:
+            logger.error(f"Check result writer: cannot spill {len(rows)} rows: {e}")
+            return False
+        self.stats.spilled_rows += len(rows)
+        return True
+
+    def _has_work(self) -> bool:
+        # Once stopping, only memory is drained: the spill log survives the restart
+        return bool(self._pending) or (not self._stopping and self.spill is not None and not self.spill.empty)
+
+    def retry_after_s(self) -> int:
+        """Rough time until the buffer has drained enough to accept a batch again."""
+        per_flush = self.batch_size * self.concurrency
+        return max(1, int(self.flush_interval_s * (len(self._pending) / per_flush + 1)))
+
+    async def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()  # Bind to the running loop (fresh per worker after fork)
+        self._replay_lock = asyncio.Lock()
+        if self.spill_dir and self.spill is None:
+            self.spill = open_slot(self.spill_dir, CHECK_RESULT_COLUMNS, **self._spill_options)  # Per process: opened after any fork
+        self._tasks = [asyncio.create_task(self._flush_loop(), name=f"check-writer:{i}") for i in range(self.concurrency)]
+        if self.runs is not None:
+            self._tasks.append(asyncio.create_task(self._runs_loop(), name=RUNS_TASK_NAME))
+        logger.info(f"Check result writer started ({self.concurrency} flush task(s), batch {self.batch_size}).")
+
+    async def stop(self, timeout_s: float = 10.0):
+        """
+        Stops accepting rows, flushes what is buffered (bounded by timeout_s) and stops the flush tasks.
+        Batches still being written at the deadline return to the buffer, which is then spilled to disk.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._drain(), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pending and self._spill_rows(list(self._pending)):
+            logger.warning(f"Check result writer: {len(self._pending)} rows spilled to disk at shutdown.")
+            self._pending.clear()
+        elif self._pending:
+            logger.error(f"Check result writer: {len(self._pending)} rows not flushed before shutdown deadline.")
+        if self.runs is not None:
+            try:
+                await self.runs.flush(self.db, self.pool_name)
+            except Exception as e:
+                logger.error(f"Check result writer: runs not written at shutdown: {e}")
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+    async def _drain(self):
+        flush_tasks = [task for task in self._tasks if task.get_name() != RUNS_TASK_NAME]
+        while True:
+            while self._pending:
+                if not await self.flush_once():
+                    await asyncio.sleep(0.5)
+            # Let the flush tasks finish the batches they are writing; they exit once the buffer is empty
+            await asyncio.gather(*flush_tasks, return_exceptions=True)
+            if not self._pending:  # A batch they could not write came back
+                return
+
+    async def _flush_loop(self):
+        # Exits on its own once stopping: on 3.11 wait_for() can swallow a cancel racing stop()'s wakeup
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._has_work():
+                if not await self.flush_once():
+                    await asyncio.sleep(self.flush_interval_s)  # Database trouble: back off, rows stay buffered
+                    break
+                if not self._pending and self.spill is not None and not self.spill.empty:
+                    continue  # Replaying the spill log: keep going while the database accepts writes
+                if len(self._pending) < self.batch_size and not self._stopping:
+                    break  # Partial batch: wait for the next tick
+
+    async def _runs_loop(self):
+        while True:
+            await asyncio.sleep(self.runs.flush_s)
+            try:
+                await self.runs.flush(self.db, self.pool_name)
+            except Exception as e:
+                self.stats.last_error = repr(e)
+                logger.error(f"Check result writer: writing check runs failed: {e}")
+
+    async def flush_once(self) -> bool:
+        """
+        Writes up to one batch from memory, or else the next spilled batch. Rows a transient error left
+        unwritten go to the spill log (or back to the front of the buffer without one); a failed replay
+        is retried. Rows refused for good are set aside either way. Cancelled mid-write (shutdown), the
+        batch goes back to the front of the buffer; rows already written may then be written twice.
+        """
+        if not self._pending:
+            return await self._replay_once()
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        rejected: List[Tuple[CheckRow, Exception]] = []
+        try:
+            unwritten = await self._write(batch, rejected)
+        except asyncio.CancelledError:
+            refused = {id(row) for row, _ in rejected}
+            self._pending.extendleft(reversed([row for row in batch if id(row) not in refused]))
+            self._set_aside(rejected)
+            raise
+        self._set_aside(rejected)
+        if unwritten:
+            if not self._spill_rows(unwritten):
+                self._pending.extendleft(reversed(unwritten))
+            return False
+        return True
+
+    async def _replay_once(self) -> bool:
+        if self.spill is None or self.spill.empty:
+            return True
+        async with self._replay_lock:  # Spilled batches are written one at a time, in append order
+            record = self.spill.read_next()
+            if record is None:
+                return True
+            rows, position = record
+            rejected: List[Tuple[CheckRow, Exception]] = []
+            if await self._write(rows, rejected):
+                return False  # Retried from the same record; rows already written may be written twice
+            self._set_aside(rejected)
+            self.spill.commit(position)
+            self.stats.replayed_rows += len(rows) - len(rejected)
+            return True
+
+    async def _write(self, batch: List[CheckRow], rejected: List[Tuple[CheckRow, Exception]]) -> List[CheckRow]:
+        """
+        COPYs `batch`. On a permanent error the batch is split in halves and each is retried, down to
+        single rows, which are added to `rejected`. Returns the rows a transient error left unwritten.
+        """
+        try:
+            await self._copy(batch)
+        except PERMANENT_COPY_ERRORS as e:
+            if len(batch) == 1:
+                rejected.append((batch[0], e))
+                return []
+            middle = len(batch) // 2
+            unwritten = await self._write(batch[:middle], rejected)
+            if unwritten:
+                return unwritten + batch[middle:]
+            return await self._write(batch[middle:], rejected)
+        except Exception as e:
+            self.stats.failed_flushes += 1
+            self.stats.last_error = repr(e)
+            logger.error(f"Check result writer: COPY of {len(batch)} rows failed: {e}")
+            return batch
+        return []
+
+    def _set_aside(self, rejected: List[Tuple[CheckRow, Exception]]):
+        """Quarantines rows the database refused for good in the spill log (dropped without one), counted in `dead_rows`."""
+        if not rejected:
+            return
+        rows = [row for row, _ in rejected]
+        self.stats.dead_rows += len(rows)
+        self.stats.last_error = repr(rejected[0][1])
+        outcome = "dropped"
+        if self.spill is not None:
+            try:
+                self.spill.quarantine(rows)
+                outcome = "quarantined"
+            except OSError as e:
+                logger.error(f"Check result writer: cannot quarantine {len(rows)} rows: {e}")
+        logger.error(f"Check result writer: {len(rows)} row(s) refused by the database and {outcome} "
+                     f"(first error: {rejected[0][1]!r}).")
+
+    async def _copy(self, batch: List[CheckRow]):
+        started = time.perf_counter()
+        pool = await self.db.get_pool(self.pool_name)
+        async with pool.acquire(timeout=COPY_TIMEOUT_S) as conn:
+            await conn.copy_records_to_table("check_results", records=batch, columns=CHECK_RESULT_COLUMNS,
+                                             timeout=COPY_TIMEOUT_S)
+        self.stats.flushes += 1
+        self.stats.written_rows += len(batch)
+        self.stats.last_flush_duration_s = time.perf_counter() - started
+
+    def metrics(self) -> dict:
+        spill = None
+        if self.spill is not None:
+            spill = {"directory": self.spill.directory, "unread_bytes": self.spill.unread_bytes,
+                     "total_bytes": self.spill.total_bytes, "quarantine_bytes": self.spill.quarantine_bytes,
+                     "max_bytes": self.spill.max_bytes, "quarantine_max_bytes": self.spill.quarantine_max_bytes}
+        runs = self.runs.metrics() if self.runs is not None else None
+        return {"pending": len(self._pending), "max_pending": self.max_pending, "spill": spill, "runs": runs,
+                **asdict(self.stats)}
+
+
+# Global writer instance (started and flushed by config.lifespan)
+check_writer = CheckResultWriter(
+    database,
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_interval_s=settings.INGEST_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.INGEST_MAX_PENDING_ROWS,
+    concurrency=settings.INGEST_WRITER_CONCURRENCY,
+    spill_dir=settings.SPILL_DIR or None,
+    spill_segment_bytes=settings.SPILL_SEGMENT_BYTES,
+    spill_max_bytes=settings.SPILL_MAX_BYTES,
+    spill_quarantine_max_bytes=settings.SPILL_QUARANTINE_MAX_BYTES,
+    spill_fsync=settings.SPILL_FSYNC,
+    runs=RunLengthEncoder(
+        tolerance_ms=settings.INGEST_RUN_TOLERANCE_MS,
+        tolerance_ratio=settings.INGEST_RUN_TOLERANCE_RATIO,
+        flush_s=settings.INGEST_RUN_FLUSH_SECONDS,
+    ) if settings.INGEST_CHANGE_ONLY else None,
+)
@@ -0,0 +1,291 @@
+# backend/apps/telegraf_mgmt/ingest.py
+import asyncio
+import math
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import AsyncContextManager, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+import orjson
+from asyncpg import Connection
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from apps.monitoring.checks import HTTP_ERROR_STATUS
+from apps.monitoring.tenants import TenantQuotas
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Only this measurement maps onto check_results; anything else in a batch is ignored
+HTTP_RESPONSE_MEASUREMENT = "http_response"
+# Ranges of the check_results columns (SMALLINT status_code, INTEGER content_length, REAL response_time_ms)
+SMALLINT_MAX = 2 ** 15 - 1
+INTEGER_MAX = 2 ** 31 - 1
+REAL_MAX = 3.4e38
+
+
+class IngestError(ValueError):
+    """Malformed or oversized ingestion payload (reported to the client as 400/413)."""
+    pass
+
+
+class PayloadTooLarge(IngestError):
+    pass
+
+
+# --- Incremental body decoding ---
+
+async def iter_lines(chunks: AsyncIterator[bytes], gzipped: bool, max_bytes: int) -> AsyncIterator[bytes]:
+    """
+    Yields complete lines from a (possibly gzip-encoded) chunked body as the chunks arrive,
+    without buffering the whole body. `max_bytes` caps the decompressed size (guards against gzip bombs).
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    remainder = b""
+    total = 0
+    async for chunk in chunks:
+        if decompressor is not None:
+            try:
+                chunk = decompressor.decompress(chunk, max_bytes - total + 1)
+            except zlib.error as e:
+                raise IngestError(f"Invalid gzip body: {e}")
+            if decompressor.unconsumed_tail:
+                raise PayloadTooLarge(f"Decompressed body exceeds {max_bytes} bytes")
+        total += len(chunk)
+        if total > max_bytes:
+            raise PayloadTooLarge(f"Body exceeds {max_bytes} bytes")
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line
+    if decompressor is not None and not decompressor.eof and total:
+        raise IngestError("Truncated gzip body")
+    if remainder:
+        yield remainder
+
+
+# --- Influx line protocol ---
+
+def _split_unescaped(text: str, separator: str, max_splits: int = -1, respect_quotes: bool = False) -> List[str]:
+    """Splits on `separator` ignoring backslash-escaped characters (and, optionally, double-quoted strings)."""
+    if "\\" not in text and not (respect_quotes and '"' in text):
+        return text.split(separator, max_splits)  # Fast path: nothing escaped or quoted
+    parts, current, escaped, quoted = [], [], False, False
+    for char in text:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == "\\":
+            current.append(char)
+            escaped = True
+        elif respect_quotes and char == '"':
+            current.append(char)
+            quoted = not quoted
+        elif char == separator and not quoted and max_splits != 0:
+            parts.append("".join(current))
+            current = []
+            max_splits -= 1
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    out, escaped = [], False
+    for char in value:
+        if escaped:
+            out.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def _field_value(raw: str):
+    if raw.startswith('"') and raw.endswith('"') and len(raw) >= 2:
+        return raw[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    if raw[-1:] in ("i", "u"):
+        return int(raw[:-1])
+    if raw in ("t", "T", "true", "True", "TRUE"):
+        return True
+    if raw in ("f", "F", "false", "False", "FALSE"):
+        return False
+    return float(raw)
+
+
+def parse_line_protocol(line: str) -> Optional[Tuple[str, Dict[str, str], Dict[str, object], Optional[int]]]:
+    """
+    Parses one line of Influx line protocol into (measurement, tags, fields, timestamp_ns).
+    Returns None for blank lines and comments; raises IngestError for malformed lines.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    sections = _split_unescaped(line, " ", respect_quotes=True)
+    sections = [section for section in sections if section]
+    if len(sections) not in (2, 3):
+        raise IngestError(f"Malformed line: {line[:200]}")
+    key = _split_unescaped(sections[0], ",")
+    measurement = _unescape(key[0])
+    tags = {}
+    for pair in key[1:]:
+        name, _, value = pair.partition("=")
+        tags[_unescape(name)] = _unescape(value)
+    fields = {}
+    try:
+        for pair in _split_unescaped(sections[1], ",", respect_quotes=True):
+            name, _, value = pair.partition("=")
+            fields[_unescape(name)] = _field_value(value)
+        timestamp_ns = int(sections[2]) if len(sections) == 3 else None
+    except ValueError:
+        raise IngestError(f"Malformed field or timestamp: {line[:200]}")
+    return measurement, tags, fields, timestamp_ns
+
+
+# --- Telegraf JSON (NDJSON, one metric per line or {"metrics": [...]} per line) ---
+
+def _json_timestamp_ns(value) -> Optional[int]:
+    """Telegraf's json serializer writes `timestamp` in json_timestamp_units (s by default); infer the unit."""
+    if value is None:
+        return None
+    value = float(value)
+    if value > 1e17:
+        return int(value)             # ns
+    if value > 1e14:
+        return int(value * 1e3)       # us
+    if value > 1e11:
+        return int(value * 1e6)       # ms
+    return int(value * 1e9)           # s
+
+
+def parse_json_line(line: bytes) -> Iterator[Tuple[str, Dict[str, str], Dict[str, object], Optional[int]]]:
+    line = line.strip()
+    if not line:
+        return
+    try:
+        document = orjson.loads(line)
+    except orjson.JSONDecodeError as e:
+        raise IngestError(f"Invalid JSON line: {e}")
+    metrics = document.get("metrics", [document]) if isinstance(document, dict) else document
+    for metric in metrics:
+        if not isinstance(metric, dict):
+            raise IngestError("JSON metric must be an object")
+        yield (metric.get("name", ""), metric.get("tags") or {}, metric.get("fields") or {},
+               _json_timestamp_ns(metric.get("timestamp")))
+
+
+# --- Mapping to check_results rows ---
+
+class KnownUrls:
+    """
+    URL -> ids map of monitored_urls within their owner's URL quota (the same URLs the probe engine
+    checks), plus each URL's owner; refreshed at most every `ttl_s` seconds per worker. URLs are
+    unique per owner, so several tenants may monitor the same URL under different ids.
+
+    A fresh map is served without touching the database: `connect` (a zero-argument callable returning
+    an async context manager that yields a connection) is only entered to refresh a stale one, by one
+    request at a time while the others keep serving the current map. If the refresh fails (database
+    down), the last map keeps being served and the refresh is retried after `retry_s`.
+    """
+
+    def __init__(self, connect: Callable[[], AsyncContextManager[Connection]], ttl_s: float = 30.0,
+                 retry_s: float = 5.0):
+        self.connect = connect
+        self.ttl_s = ttl_s
+        self.retry_s = retry_s
+        self._ids: Dict[str, List[int]] = {}
+        self._owners: Dict[int, Optional[UUID]] = {}
+        self._loaded_at: Optional[float] = None
+        self._refresh_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> Dict[str, List[int]]:
+        """The current map. Raises only when none could be loaded yet."""
+        if time.monotonic() < self._refresh_at or (self._lock.locked() and self._loaded_at is not None):
+            return self._ids
+        async with self._lock:
+            if time.monotonic() < self._refresh_at:
+                return self._ids  # Refreshed by the request holding the lock
+            try:
+                async with self.connect() as conn:
+                    await self._load(conn)
+            except Exception as e:
+                if self._loaded_at is None:
+                    raise
+                self._refresh_at = time.monotonic() + self.retry_s
+                logger.warning(f"Ingest: refreshing monitored URLs failed ({e!r}); serving the map from "
+                               f"{time.monotonic() - self._loaded_at:.0f}s ago.")
+        return self._ids
+
+    async def _load(self, conn: Connection):
+        rows = await conn.fetch("SELECT id, url, owner_id FROM monitored_urls WHERE enabled")
+        quotas = await TenantQuotas.load(conn)
+        allowed = quotas.allowed_urls((row["id"], row["owner_id"]) for row in rows)
+        ids = defaultdict(list)
+        for row in rows:
+            if row["id"] in allowed:
+                ids[row["url"]].append(row["id"])
+        self._ids = dict(ids)
+        self._owners = {row["id"]: row["owner_id"] for row in rows}
+        self._loaded_at = time.monotonic()
+        self._refresh_at = self._loaded_at + self.ttl_s
+
+    def owner(self, url_id: int) -> Optional[UUID]:
+        return self._owners.get(url_id)
+
+
+def _number(value) -> Optional[float]:
+    """A numeric field as a finite float (None when absent). Raises ValueError/TypeError for anything else."""
+    if value is None:
+        return None
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"Non-finite value {value!r}")
+    return number
+
+
+def to_check_rows(metric, url_ids: Dict[str, List[int]], received_ns: int) -> List[tuple]:
+    """
+    Maps a Telegraf `http_response` metric to check_results rows (see writer.CHECK_RESULT_COLUMNS), one
+    per monitored URL with that address (each tenant monitoring it gets the result). Returns no rows
+    for other measurements, for URLs that are not monitored and for malformed metrics (non-numeric or
+    non-finite fields, an impossible timestamp). Values outside the column ranges are nulled out
+    (status code, response time) or capped (content length), so they never reach COPY. A `success`
+    with a 4xx/5xx status is stored as `http_error`, as the probe engine reports it.
+    """
+    measurement, tags, fields, timestamp_ns = metric
+    if measurement != HTTP_RESPONSE_MEASUREMENT:
+        return []
+    ids = url_ids.get(tags.get("server", ""))
+    if not ids:
+        return []
+    try:
+        status_code = _number(fields.get("http_response_code", tags.get("status_code")))
+        response_time = _number(fields.get("response_time"))
+        content_length = _number(fields.get("content_length"))
+        checked_at = datetime.fromtimestamp((timestamp_ns or received_ns) / 1e9, tz=timezone.utc)
+    except (ValueError, TypeError, OverflowError, OSError):
+        return []
+    response_time_ms = response_time * 1000 if response_time is not None else None
+    status_code = int(status_code) if status_code is not None and 0 <= status_code <= SMALLINT_MAX else None
+    result = str(tags.get("result") or fields.get("result_type") or "unknown")[:32]
+    if result == "success" and status_code is not None and status_code >= HTTP_ERROR_STATUS:
+        result = "http_error"  # Telegraf reports success for any response; the probe engine does not
+    values = (
+        status_code,
+        response_time_ms if response_time_ms is not None and 0 <= response_time_ms <= REAL_MAX else None,
+        min(int(content_length), INTEGER_MAX) if content_length is not None and content_length >= 0 else None,
+        result,
+        None,
+        None,
+        None,
+    )
+    return [(checked_at, url_id, *values) for url_id in ids]
@@ -0,0 +1,106 @@
+# backend/apps/telegraf_mgmt/routes.py
+import hmac
+import time
+from collections import Counter
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.settings import settings
+from utils.db_utils import acquire_connection
+from apps.monitoring.writer import check_writer
+from apps.monitoring.tenants import usage_counters
+from apps.telegraf_mgmt.ingest import (
+    IngestError, PayloadTooLarge, KnownUrls, iter_lines, parse_line_protocol, parse_json_line, to_check_rows
+)
+
+# No prefix here: config.routes mounts this router under /telegraf
+router = APIRouter(tags=["Telegraf"])
+
+# Initialize logger
+logger = get_logger(__name__)
+
+known_urls = KnownUrls(lambda: acquire_connection("ingest"), ttl_s=settings.INGEST_URL_CACHE_SECONDS)
+
+
+def verify_ingest_token(authorization: Annotated[Optional[str], Header()] = None):
+    """
+    Dependency: agents authenticate with a static bearer token from INGEST_API_TOKENS
+    (Telegraf: `headers = {"Authorization" = "Bearer <token>"}`) instead of database credentials.
+    """
+    tokens = [token.strip() for token in settings.INGEST_API_TOKENS.split(",") if token.strip()]
+    scheme, _, presented = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not any(hmac.compare_digest(presented.encode(), token.encode()) for token in tokens):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid ingest token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def _too_many_requests() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Ingestion buffer full, retry later",
+        headers={"Retry-After": str(check_writer.retry_after_s())},
+    )
+
+
+@router.post("/write", dependencies=[Depends(verify_ingest_token)])
+async def ingest_metrics(request: Request):
+    """
+    Ingests a batch from Telegraf's `outputs.http`: Influx line protocol (`data_format = "influx"`)
+    or NDJSON (`data_format = "json"`, selected by a JSON Content-Type), optionally gzip-encoded.
+    `http_response` metrics for monitored URLs are queued for the batched COPY writer; metrics for
+    unknown URLs and other measurements are counted and skipped. Responds 429 + Retry-After when the
+    writer's buffer is full, before reading the body, so the agent keeps the batch and retries.
+    """
+    if not check_writer.has_capacity():
+        raise _too_many_requests()
+
+    content_type = request.headers.get("content-type", "")
+    is_json = "json" in content_type
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    received_ns = time.time_ns()
+
+    try:
+        url_ids = await known_urls.get()
+    except Exception as e:  # No URL map loaded yet and the database is unreachable
+        logger.error(f"Ingest: cannot load monitored URLs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Monitored URLs unavailable, retry later",
+            headers={"Retry-After": str(int(known_urls.retry_s))},
+        )
+
+    rows, skipped = [], 0
+    try:
+        async for line in iter_lines(request.stream(), gzipped, settings.INGEST_MAX_BODY_BYTES):
+            if is_json:
+                metrics = parse_json_line(line)
+            else:
+                metric = parse_line_protocol(line.decode("utf-8", errors="replace"))
+                metrics = (metric,) if metric is not None else ()
+            for metric in metrics:
+                metric_rows = to_check_rows(metric, url_ids, received_ns)
+                if metric_rows:
+                    rows.extend(metric_rows)
+                else:
+                    skipped += 1
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except IngestError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if rows and not check_writer.offer(rows):
+        raise _too_many_requests()
+    per_tenant = Counter()
+    for url_id, count in Counter(row[1] for row in rows).items():
+        per_tenant[known_urls.owner(url_id)] += count
+    for tenant, count in per_tenant.items():
+        usage_counters.add_ingested(tenant, count)
+    if skipped:
+        logger.debug(f"Ingest: skipped {skipped} metric(s) (unknown URL or measurement, or malformed).")
+    return {"accepted": len(rows), "skipped": skipped}
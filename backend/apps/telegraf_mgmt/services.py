@@ -0,0 +1,47 @@
+# backend/apps/telegraf_mgmt/services.py
+import json
+from typing import Dict, Iterable, Optional
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+
+def _toml_str(value: str) -> str:
+    """Quotes a value as a TOML basic string (JSON escaping is a valid subset)."""
+    return json.dumps(value)
+
+
+def render_http_response_config(
+    urls: Iterable[str],
+    interval: str = "10s",
+    response_timeout: str = "5s",
+    follow_redirects: bool = True,
+    insecure_skip_verify: bool = False,
+    tags: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Renders an `[[inputs.http_response]]` section for the given URLs.
+    The output is meant to be dropped into Telegraf's config directory (`--config-directory`)
+    next to the static `telegraf.conf`.
+    """
+    url_list = list(urls)
+    lines = [
+        "[[inputs.http_response]]",
+        f"  interval = {_toml_str(interval)}",
+        "  urls = [",
+        *(f"    {_toml_str(url)}," for url in url_list),
+        "  ]",
+        f"  response_timeout = {_toml_str(response_timeout)}",
+        '  method = "GET"',
+        f"  follow_redirects = {str(follow_redirects).lower()}",
+    ]
+    if insecure_skip_verify:
+        lines.append("  insecure_skip_verify = true")
+    if tags:
+        lines.append("  [inputs.http_response.tags]")
+        lines.extend(f"    {key} = {_toml_str(value)}" for key, value in tags.items())
+    logger.debug(f"Rendered http_response config for {len(url_list)} URLs.")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,171 @@
+# backend/benchmarks/harness.py
+import asyncio
+import json
+import math
+import os
+import platform
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Metrics compared against a baseline and the direction that counts as a regression
+REGRESSION_METRICS = {
+    "p50_ms": "higher",
+    "p95_ms": "higher",
+    "p99_ms": "higher",
+    "rps": "lower",
+}
+
+
+@dataclass
+class ScenarioResult:
+    """Latency/throughput summary for one benchmark scenario."""
+    name: str
+    requests: int
+    errors: int
+    duration_s: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    extra: Dict[str, float] = field(default_factory=dict)  # Scenario-specific metrics (e.g. checks/s, scheduler lag)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(name: str, latencies_s: List[float], errors: int, duration_s: float) -> ScenarioResult:
+    """Builds a ScenarioResult from raw per-request latencies (seconds)."""
+    values = sorted(latency * 1000.0 for latency in latencies_s)
+    count = len(values)
+    return ScenarioResult(
+        name=name,
+        requests=count,
+        errors=errors,
+        duration_s=round(duration_s, 3),
+        rps=round(count / duration_s, 2) if duration_s > 0 else 0.0,
+        mean_ms=round(sum(values) / count, 3) if count else 0.0,
+        p50_ms=round(percentile(values, 50), 3),
+        p95_ms=round(percentile(values, 95), 3),
+        p99_ms=round(percentile(values, 99), 3),
+        max_ms=round(values[-1], 3) if values else 0.0,
+    )
+
+
+async def run_load(
+    name: str,
+    request_fn: Callable[[], Awaitable[bool]],
+    concurrency: int,
+    duration_s: float,
+    warmup_s: float = 0.0,
+) -> ScenarioResult:
+    """
+    Drives `request_fn` from `concurrency` closed-loop workers for `duration_s` seconds.
+    `request_fn` returns True on success; failures and exceptions are counted as errors
+    and excluded from the latency distribution. Requests during `warmup_s` are not recorded.
+    """
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    record_from = started + warmup_s
+    deadline = record_from + duration_s
+
+    async def worker():
+        nonlocal errors
+        while True:
+            t0 = time.perf_counter()
+            if t0 >= deadline:
+                return
+            try:
+                ok = await request_fn()
+            except Exception:
+                ok = False
+            t1 = time.perf_counter()
+            if t0 < record_from:
+                continue
+            if ok:
+                latencies.append(t1 - t0)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    measured = max(time.perf_counter() - record_from, 1e-9)
+    return summarize(name, latencies, errors, measured)
+
+
+def environment_info(concurrency: int, duration_s: float) -> Dict[str, object]:
+    """Describes the machine/run parameters so baselines are only compared like-for-like."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "concurrency": concurrency,
+        "duration_s": duration_s,
+    }
+
+
+def save_baseline(path: str, results: List[ScenarioResult], environment: Dict[str, object]):
+    """Writes results as a JSON baseline file."""
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment,
+        "scenarios": {result.name: asdict(result) for result in results},
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Optional[Dict[str, dict]]:
+    """Returns the per-scenario baseline metrics, or None if the file does not exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get("scenarios", {})
+
+
+def find_regressions(results: List[ScenarioResult], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    Compares results against a baseline. A metric regresses when it is worse than the
+    baseline by more than `threshold` (a fraction, e.g. 0.15 = 15%).
+    Scenarios missing from the baseline are skipped.
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        current = asdict(result)
+        for metric, worse in REGRESSION_METRICS.items():
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (worse == "higher" and change > threshold) or (worse == "lower" and -change > threshold):
+                regressions.append(
+                    f"{result.name}.{metric}: {old} -> {new} ({change:+.1%}, threshold {threshold:.0%})"
+                )
+    return regressions
+
+
+def format_table(results: List[ScenarioResult]) -> str:
+    """Human-readable summary table."""
+    header = f"{'scenario':<24}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<24}{r.requests:>10}{r.errors:>8}{r.rps:>10.1f}{r.p50_ms:>10.2f}{r.p95_ms:>10.2f}{r.p99_ms:>10.2f}"
+        )
+        for key, value in r.extra.items():
+            lines.append(f"  {key}: {value}")
+    return "\n".join(lines)
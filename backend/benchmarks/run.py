@@ -0,0 +1,159 @@
+# backend/benchmarks/run.py
+import argparse
+import asyncio
+import sys
+
+import aiohttp
+import asyncpg
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import setup_logging, get_logger
+from config.database import DB_CONFIG
+from apps.auth.security import hash_password
+from benchmarks.harness import (
+    run_load, environment_info, save_baseline, load_baseline, find_regressions, format_table
+)
+from benchmarks.scenarios import SCENARIOS, DEFAULT_FARM_URL, BenchContext, login
+
+# Initialize logger
+logger = get_logger(__name__)
+
+DEFAULT_SCENARIOS = "auth_login,auth_refresh,auth_users_me"
+AUTHENTICATED_PREFIXES = ("auth_", "monitoring_")  # Scenarios that need the benchmark user's tokens
+
+
+async def seed_bench_user(email: str, password: str, role: str = "Viewer"):
+    """Creates (or resets the password of) the benchmark user directly in the database."""
+    conn = await asyncpg.connect(**DB_CONFIG)
+    try:
+        role_row = await conn.fetchrow("SELECT id FROM roles WHERE name = $1", role)
+        if not role_row:
+            raise ValueError(f"Role '{role}' not found. Ensure migrations are applied.")
+        await conn.execute(
+            """
+            INSERT INTO users (username, email, password, role_id, is_verified)
+            VALUES ($1, $2, $3, $4, TRUE)
+            ON CONFLICT (email) DO UPDATE SET password = EXCLUDED.password, role_id = EXCLUDED.role_id
+            """,
+            "bench", email, hash_password(password), role_row["id"]
+        )
+        logger.info(f"Benchmark user {email} ready (role {role}).")
+    finally:
+        await conn.close()
+
+
+async def seed_ingest_urls(count: int, farm_url: str):
+    """Adds unowned monitored URLs for the first `count` farm targets (the servers ingest_write reports on)."""
+    urls = [f"{farm_url.rstrip('/')}/t/{i}" for i in range(count)]
+    conn = await asyncpg.connect(**DB_CONFIG)
+    try:
+        # Unowned URLs: not limited by tenant quotas, and (owner_id, url) uniqueness does not cover NULL owners
+        await conn.execute(
+            """
+            INSERT INTO monitored_urls (url)
+            SELECT u FROM unnest($1::TEXT[]) AS u
+            WHERE NOT EXISTS (SELECT 1 FROM monitored_urls m WHERE m.url = u AND m.owner_id IS NULL)
+            """,
+            urls
+        )
+        logger.info(f"{count} monitored URL(s) under {farm_url} ready for ingest_write.")
+    finally:
+        await conn.close()
+
+
+async def run_benchmarks(args) -> int:
+    """Runs the selected scenarios, prints a summary and compares/saves baselines. Returns the exit code."""
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        logger.error(f"Unknown scenarios: {', '.join(unknown)}. Available: {', '.join(sorted(SCENARIOS))}")
+        return 2
+
+    options = dict(option.split("=", 1) for option in args.option)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    timeout = aiohttp.ClientTimeout(total=args.request_timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        ctx = BenchContext(
+            session=session, base_url=args.base_url.rstrip("/"),
+            email=args.email, password=args.password, options=options,
+        )
+        if any(name.startswith(AUTHENTICATED_PREFIXES) for name in names) and await login(ctx) is None:
+            logger.error(f"Benchmark login failed for {args.email}. Run the 'seed' command first.")
+            return 2
+
+        results = []
+        for name in names:
+            request_fn = await SCENARIOS[name](ctx)
+            logger.info(f"Running scenario {name} (concurrency={args.concurrency}, duration={args.duration}s)...")
+            result = await run_load(name, request_fn, args.concurrency, args.duration, args.warmup)
+            report = getattr(request_fn, "report", None)  # Optional scenario-specific metrics
+            if report is not None:
+                result.extra.update(await report())
+            close = getattr(request_fn, "close", None)  # Optional teardown (in-process servers, sessions)
+            if close is not None:
+                await close()
+            results.append(result)
+
+    print(format_table(results))
+
+    exit_code = 0
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        if baseline is None:
+            logger.info(f"No baseline at {args.baseline}; nothing to compare against.")
+        else:
+            regressions = find_regressions(results, baseline, args.max_regression)
+            for regression in regressions:
+                logger.error(f"Regression: {regression}")
+            if regressions:
+                exit_code = 1
+            else:
+                logger.info("No regressions beyond threshold.")
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, environment_info(args.concurrency, args.duration))
+        logger.info(f"Baseline written to {args.save_baseline}")
+    return exit_code
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the URL Monitoring backend.")
+    subparsers = parser.add_subparsers(dest="command", help="Available commands", required=True)
+
+    # Seed Sub-parser
+    parser_seed = subparsers.add_parser("seed", help="Create the benchmark user in the database.")
+    parser_seed.add_argument("--email", default="bench@example.com")
+    parser_seed.add_argument("--password", default="bench-password")
+    parser_seed.add_argument("--ingest-urls", type=int, default=0,
+                             help="Also add this many monitored URLs for the ingest_write scenario")
+    parser_seed.add_argument("--farm-url", default=DEFAULT_FARM_URL, help="Base URL of those monitored URLs")
+
+    # Run Sub-parser
+    parser_run = subparsers.add_parser("run", help="Run benchmark scenarios against a running server.")
+    parser_run.add_argument("--base-url", default="http://localhost:8000")
+    parser_run.add_argument("--email", default="bench@example.com")
+    parser_run.add_argument("--password", default="bench-password")
+    parser_run.add_argument("--scenarios", default=DEFAULT_SCENARIOS,
+                            help=f"Comma-separated scenario names (available: {', '.join(sorted(SCENARIOS))})")
+    parser_run.add_argument("--concurrency", type=int, default=32)
+    parser_run.add_argument("--duration", type=float, default=20.0, help="Measured seconds per scenario")
+    parser_run.add_argument("--warmup", type=float, default=3.0, help="Unrecorded seconds before measuring")
+    parser_run.add_argument("--request-timeout", type=float, default=30.0)
+    parser_run.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser_run.add_argument("--save-baseline", help="Write results to this baseline JSON")
+    parser_run.add_argument("--max-regression", type=float, default=0.15,
+                            help="Allowed relative slowdown before failing (0.15 = 15%%)")
+    parser_run.add_argument("--option", action="append", default=[],
+                            help="Scenario option as key=value (repeatable)")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        await seed_bench_user(args.email, args.password)
+        if args.ingest_urls:
+            await seed_ingest_urls(args.ingest_urls, args.farm_url)
+        return 0
+    return await run_benchmarks(args)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,206 @@
+# backend/benchmarks/scenarios.py
+import itertools
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+import aiohttp
+
+# Import necessary functions and schemas from our modules
+from config.settings import settings
+from benchmarks.target_farm import FarmEngine, TargetFarm, load_profiles
+
+# The auth router declares prefix="/auth" and config.routes mounts it under "/auth" again
+AUTH_PREFIX = "/auth/auth"
+# Where `run.py seed --ingest-urls` points the monitored URLs that ingest_write reports on (target farm URLs)
+DEFAULT_FARM_URL = "http://127.0.0.1:8900"
+
+
+@dataclass
+class BenchContext:
+    """Shared state handed to every scenario factory."""
+    session: aiohttp.ClientSession
+    base_url: str
+    email: str
+    password: str
+    tokens: Dict[str, str] = field(default_factory=dict)  # Filled by login() before scenarios run
+    options: Dict[str, str] = field(default_factory=dict)  # Free-form --option key=value pairs
+
+
+# Scenario factories: receive the context, return a zero-arg coroutine function performing one operation.
+# The function may carry a `report` coroutine (extra metrics) and a `close` coroutine (teardown).
+ScenarioFactory = Callable[[BenchContext], Awaitable[Callable[[], Awaitable[bool]]]]
+SCENARIOS: Dict[str, ScenarioFactory] = {}
+
+
+def scenario(name: str):
+    """Registers a scenario factory under `name`."""
+    def decorator(factory: ScenarioFactory) -> ScenarioFactory:
+        SCENARIOS[name] = factory
+        return factory
+    return decorator
+
+
+async def login(ctx: BenchContext) -> Optional[Dict[str, str]]:
+    """Logs in once with the benchmark credentials and stores the issued tokens on the context."""
+    async with ctx.session.post(
+        f"{ctx.base_url}{AUTH_PREFIX}/login",
+        data={"username": ctx.email, "password": ctx.password},
+    ) as resp:
+        if resp.status != 200:
+            return None
+        ctx.tokens = await resp.json()
+        return ctx.tokens
+
+
+@scenario("auth_login")
+async def auth_login(ctx: BenchContext):
+    """Form login: one DB user lookup + one bcrypt verify per request."""
+    url = f"{ctx.base_url}{AUTH_PREFIX}/login"
+    form = {"username": ctx.email, "password": ctx.password}
+
+    async def request() -> bool:
+        async with ctx.session.post(url, data=form) as resp:
+            await resp.read()
+            return resp.status == 200
+    return request
+
+
+@scenario("auth_refresh")
+async def auth_refresh(ctx: BenchContext):
+    """Refresh: token decode + blacklist lookup + user lookup per request."""
+    url = f"{ctx.base_url}{AUTH_PREFIX}/refresh"
+    body = {"refresh_token": ctx.tokens["refresh_token"]}
+
+    async def request() -> bool:
+        async with ctx.session.post(url, json=body) as resp:
+            await resp.read()
+            return resp.status == 200
+    return request
+
+
+@scenario("auth_users_me")
+async def auth_users_me(ctx: BenchContext):
+    """Authenticated read: bearer token decode + user lookup per request."""
+    url = f"{ctx.base_url}{AUTH_PREFIX}/users/me"
+    headers = {"Authorization": f"Bearer {ctx.tokens['access_token']}"}
+
+    async def request() -> bool:
+        async with ctx.session.get(url, headers=headers) as resp:
+            await resp.read()
+            return resp.status == 200
+    return request
+
+
+@scenario("health")
+async def health(ctx: BenchContext):
+    """Unauthenticated no-op endpoint: measures framework/server overhead only."""
+    url = f"{ctx.base_url}/health"
+
+    async def request() -> bool:
+        async with ctx.session.get(url) as resp:
+            await resp.read()
+            return resp.status == 200
+    return request
+
+
+@scenario("monitoring_status")
+async def monitoring_status(ctx: BenchContext):
+    """Status board: one LATERAL query per request + orjson + compression (--option encoding=br|gzip|identity)."""
+    url = f"{ctx.base_url}/monitoring/status"
+    headers = {
+        "Authorization": f"Bearer {ctx.tokens['access_token']}",
+        "Accept-Encoding": ctx.options.get("encoding", "br, gzip"),
+    }
+    wire_bytes = []
+
+    async def request() -> bool:
+        async with ctx.session.get(url, headers=headers, auto_decompress=False) as resp:
+            wire_bytes.append(len(await resp.read()))
+            return resp.status == 200
+
+    async def report():
+        return {"avg_wire_bytes": sum(wire_bytes) / len(wire_bytes) if wire_bytes else 0}
+    request.report = report
+    return request
+
+
+@scenario("ingest_write")
+async def ingest_write(ctx: BenchContext):
+    """
+    Telegraf ingestion: one line-protocol batch per request (parse, URL lookup, COPY writer hand-off).
+    --option batch=500 lines per request, --option urls=1000 distinct servers (seeded with
+    `run.py seed --ingest-urls`), --option farm_url=..., --option ingest_token=... (default: the first
+    INGEST_API_TOKENS entry of this environment).
+    """
+    url = f"{ctx.base_url}/telegraf/write"
+    token = ctx.options.get("ingest_token") or settings.INGEST_API_TOKENS.split(",")[0].strip()
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "text/plain; charset=utf-8"}
+    batch, urls = int(ctx.options.get("batch", 500)), int(ctx.options.get("urls", 1000))
+    farm_url = ctx.options.get("farm_url", DEFAULT_FARM_URL).rstrip("/")
+    # No timestamps: the server stamps the batch on receipt, so the same body can be sent every time
+    body = "".join(
+        f"http_response,method=GET,result=success,server={farm_url}/t/{i % urls},status_code=200 "
+        f"content_length=512i,http_response_code=200i,response_time=0.0{i % 90 + 10},result_code=0i\n"
+        for i in range(batch)
+    ).encode()
+    accepted, skipped = [], []
+
+    async def request() -> bool:
+        async with ctx.session.post(url, data=body, headers=headers) as resp:
+            if resp.status != 200:
+                await resp.read()
+                return False
+            counts = await resp.json()
+            accepted.append(counts["accepted"])
+            skipped.append(counts["skipped"])
+            return True
+
+    async def report():
+        return {
+            "avg_accepted_rows": sum(accepted) / len(accepted) if accepted else 0,
+            "avg_skipped_metrics": sum(skipped) / len(skipped) if skipped else 0,
+        }
+    request.report = report
+    return request
+
+
+@scenario("probe_engine")
+async def probe_engine(ctx: BenchContext):
+    """
+    Probe engine HTTP checks against the mock target farm: one ProbeEngine.check() per request through the
+    engine's shared session. Starts a farm in this process unless --option farm_url=... names a running one;
+    --option targets=1000, --option profile=ok (a farm profile, or "mix" for the seeded default mix),
+    --option probe_concurrency=200 (connection limit), --option timeout=10.
+    """
+    targets = int(ctx.options.get("targets", 1000))
+    profile = ctx.options.get("profile", "ok")
+    farm = TargetFarm(targets, load_profiles(ctx.options.get("profiles")))
+    farm_url = ctx.options.get("farm_url")
+    if farm_url is None:
+        await farm.start("127.0.0.1", 0)
+        farm_url = f"http://127.0.0.1:{farm.servers[0].sockets[0].getsockname()[1]}"
+    if profile == "mix":
+        urls = farm.target_urls(farm_url)
+    else:
+        urls = [f"{farm_url.rstrip('/')}/p/{profile}/{i}" for i in range(targets)]
+    engine = FarmEngine(urls, interval_s=60.0, concurrency=int(ctx.options.get("probe_concurrency", 200)),
+                        timeout_s=float(ctx.options.get("timeout", 10)))
+    await engine.open()
+    engine.targets = await engine.load_targets()
+    next_target = itertools.cycle(list(engine.targets.values())).__next__
+    results: Dict[str, int] = {}
+
+    async def request() -> bool:
+        row = await engine.check(next_target())
+        results[row[5]] = results.get(row[5], 0) + 1
+        return row[5] == "success"
+
+    async def report():
+        return {f"result_{result}": count for result, count in results.items()}
+
+    async def close():
+        await engine.stop(drain_s=0)
+        await farm.close()
+    request.report = report
+    request.close = close
+    return request
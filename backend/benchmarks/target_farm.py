@@ -0,0 +1,446 @@
+# backend/benchmarks/target_farm.py
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import ssl
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import setup_logging, get_logger
+from apps.telegraf_mgmt.services import render_http_response_config
+from apps.monitoring.engine import ProbeEngine, ProbeTarget
+from apps.monitoring.tenants import UsageCounters
+from benchmarks.harness import summarize, save_baseline, environment_info, format_table
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Virtual host suffix: "t42.farm.test" addresses target 42 (map *.farm.test to 127.0.0.1 to use it)
+HOST_SUFFIX = ".farm.test"
+CHUNK_SIZE = 16 * 1024
+
+
+@dataclass
+class Profile:
+    """Behaviour of a class of mock targets."""
+    weight: float = 1.0            # Share of targets assigned this profile
+    latency_ms: float = 20.0       # Time to first byte
+    jitter_ms: float = 0.0         # Uniform +/- jitter added to latency
+    error_rate: float = 0.0        # Fraction of requests answered with error_status
+    error_status: int = 503
+    redirects: int = 0             # Length of the 302 chain before the final response
+    body_bytes: int = 512
+    chunk_delay_ms: float = 0.0    # > 0: chunked body, sleeping between CHUNK_SIZE chunks
+
+
+DEFAULT_PROFILES: Dict[str, Profile] = {
+    "ok": Profile(weight=0.85, latency_ms=20, jitter_ms=10),
+    "slow": Profile(weight=0.05, latency_ms=800, jitter_ms=400),
+    "flaky": Profile(weight=0.05, latency_ms=50, jitter_ms=20, error_rate=0.2),
+    "redirect": Profile(weight=0.03, latency_ms=10, redirects=2),
+    "slow_body": Profile(weight=0.02, latency_ms=30, body_bytes=256 * 1024, chunk_delay_ms=50),
+}
+
+
+def load_profiles(path: Optional[str]) -> Dict[str, Profile]:
+    """Loads profiles from a JSON object of {name: {field: value}}; defaults when no path is given."""
+    if not path:
+        return dict(DEFAULT_PROFILES)
+    with open(path) as f:
+        return {name: Profile(**fields) for name, fields in json.load(f).items()}
+
+
+def _self_signed_context(hostname: str = "farm.test") -> ssl.SSLContext:
+    """Builds a server SSL context with a throwaway self-signed certificate for *.farm.test."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, hostname)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName(hostname), x509.DNSName(f"*.{hostname}"), x509.DNSName("localhost"),
+        ]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        cert_path, key_path = os.path.join(tmp, "cert.pem"), os.path.join(tmp, "key.pem")
+        with open(cert_path, "wb") as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        with open(key_path, "wb") as f:
+            f.write(key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+            ))
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+class TargetFarm:
+    """
+    Asyncio HTTP/1.1 server exposing `targets` virtual targets with deterministic behaviour.
+
+    Targets are addressed by path (`/t/<id>`) or by Host header (`t<id>.farm.test`);
+    `/p/<profile>/<id>` forces a profile. Each target's profile and every per-request
+    random decision (jitter, errors) derive from `seed`, so runs are repeatable.
+    The farm also measures what probes it: checks per second and, given the expected
+    probe interval, scheduler lag (actual minus expected time between two hits on a target).
+    """
+
+    def __init__(self, targets: int, profiles: Dict[str, Profile], seed: int = 1,
+                 expected_interval_s: Optional[float] = None):
+        self.targets = targets
+        self.profiles = profiles
+        self.seed = seed
+        self.expected_interval_s = expected_interval_s
+        self._profile_names = list(profiles)
+        weights = [profiles[name].weight for name in self._profile_names]
+        total = sum(weights)
+        self._cumulative = []
+        running = 0.0
+        for weight in weights:
+            running += weight / total
+            self._cumulative.append(running)
+        self.servers: List[asyncio.AbstractServer] = []
+        self._writers = set()
+        self.reset_stats()
+
+    # --- Target addressing ---
+
+    def profile_for(self, target_id: int) -> str:
+        """Stable profile assignment for a target id."""
+        point = random.Random(self.seed * 1_000_003 + target_id).random()
+        for name, bound in zip(self._profile_names, self._cumulative):
+            if point <= bound:
+                return name
+        return self._profile_names[-1]
+
+    def target_urls(self, base_url: str, use_hosts: bool = False) -> List[str]:
+        """URLs of all targets, e.g. to load into a prober or a Telegraf config."""
+        if use_hosts:
+            scheme, _, rest = base_url.partition("://")
+            port = rest.rsplit(":", 1)[1] if ":" in rest else ""
+            return [f"{scheme}://t{i}{HOST_SUFFIX}{':' + port if port else ''}/" for i in range(self.targets)]
+        return [f"{base_url.rstrip('/')}/t/{i}" for i in range(self.targets)]
+
+    # --- Stats ---
+
+    def reset_stats(self):
+        self.started = time.monotonic()
+        self.hits = 0
+        self.status_counts: Dict[int, int] = {}
+        self._last_hit: Dict[int, float] = {}
+        self._hit_counts: Dict[int, int] = {}
+        self.lags_s: List[float] = []
+
+    def _record_hit(self, target_id: int, status: int):
+        now = time.monotonic()
+        self.hits += 1
+        self._hit_counts[target_id] = self._hit_counts.get(target_id, 0) + 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        previous = self._last_hit.get(target_id)
+        self._last_hit[target_id] = now
+        if previous is not None and self.expected_interval_s:
+            self.lags_s.append(max(0.0, now - previous - self.expected_interval_s))
+
+    def stats(self) -> Dict[str, object]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        lag = summarize("scheduler_lag", self.lags_s, 0, elapsed)
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "hits": self.hits,
+            "checks_per_s": round(self.hits / elapsed, 2),
+            "targets_hit": len(self._last_hit),
+            "status_counts": self.status_counts,
+            "lag_p50_ms": lag.p50_ms,
+            "lag_p95_ms": lag.p95_ms,
+            "lag_p99_ms": lag.p99_ms,
+            "lag_max_ms": lag.max_ms,
+        }
+
+    # --- Server ---
+
+    async def start(self, host: str, port: int, tls_port: Optional[int] = None):
+        self.servers.append(await asyncio.start_server(self._handle, host, port, backlog=4096))
+        if tls_port:
+            self.servers.append(await asyncio.start_server(
+                self._handle, host, tls_port, ssl=_self_signed_context(), backlog=4096
+            ))
+
+    async def close(self):
+        for server in self.servers:
+            server.close()
+        for writer in list(self._writers):  # Idle keep-alive connections would otherwise block wait_closed()
+            writer.close()
+        for server in self.servers:
+            await server.wait_closed()
+        self.servers.clear()
+
+    def _resolve(self, path: str, host: str) -> Tuple[Optional[int], Optional[str], int]:
+        """Returns (target_id, forced_profile, remaining_redirects) for a request."""
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        forced, redirects_left = None, -1
+        try:
+            if len(parts) >= 2 and parts[0] == "t":
+                target_id = int(parts[1])
+                rest = parts[2:]
+            elif len(parts) >= 3 and parts[0] == "p":
+                forced, target_id = parts[1], int(parts[2])
+                rest = parts[3:]
+            elif host.split(":", 1)[0].endswith(HOST_SUFFIX):
+                target_id = int(host.split(".", 1)[0].lstrip("t"))
+                rest = parts
+            else:
+                return None, None, -1
+            if len(rest) >= 2 and rest[0] == "r":
+                redirects_left = int(rest[1])
+        except ValueError:
+            return None, None, -1
+        if target_id < 0 or target_id >= self.targets or (forced and forced not in self.profiles):
+            return None, None, -1
+        return target_id, forced, redirects_left
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, version = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                if length:
+                    await reader.readexactly(length)
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                await self._respond(writer, method, path, headers.get("host", ""), keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, method: str, path: str, host: str, keep_alive: bool):
+        if path.startswith("/_farm/"):
+            if path.startswith("/_farm/reset"):
+                self.reset_stats()
+            await self._write(writer, 200, json.dumps(self.stats()).encode(), keep_alive, "application/json")
+            return
+
+        target_id, forced, redirects_left = self._resolve(path, host)
+        if target_id is None:
+            await self._write(writer, 404, b"unknown target", keep_alive)
+            return
+        profile_name = forced or self.profile_for(target_id)
+        profile = self.profiles[profile_name]
+        # Per-request decisions are seeded by (seed, target, hit number on that target): identical runs, identical answers
+        rng = random.Random((self.seed * 1_000_003 + target_id) * 1_000_003 + self._hit_counts.get(target_id, 0))
+
+        delay_ms = profile.latency_ms + (rng.uniform(-profile.jitter_ms, profile.jitter_ms) if profile.jitter_ms else 0)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+        if profile.redirects and redirects_left != 0:
+            remaining = profile.redirects if redirects_left < 0 else redirects_left
+            base = f"/p/{forced}/{target_id}" if forced else f"/t/{target_id}"
+            if redirects_left < 0:  # First hop of a chain is what the prober scheduled
+                self._record_hit(target_id, 302)
+            await self._write(writer, 302, b"", keep_alive, extra_headers={"Location": f"{base}/r/{remaining - 1}"})
+            return
+
+        if redirects_left < 0:
+            status = profile.error_status if rng.random() < profile.error_rate else 200
+            self._record_hit(target_id, status)
+        else:
+            status = 200
+        if status != 200:
+            await self._write(writer, status, b"error", keep_alive)
+        elif profile.chunk_delay_ms > 0:
+            await self._write_chunked(writer, profile, target_id, keep_alive)
+        else:
+            await self._write(writer, 200, _body(target_id, profile.body_bytes), keep_alive)
+
+    async def _write(self, writer, status: int, body: bytes, keep_alive: bool,
+                     content_type: str = "text/plain", extra_headers: Optional[Dict[str, str]] = None):
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **(extra_headers or {}),
+        }
+        writer.write(_head(status, headers) + body)
+        await writer.drain()
+
+    async def _write_chunked(self, writer, profile: Profile, target_id: int, keep_alive: bool):
+        headers = {
+            "Content-Type": "text/plain",
+            "Transfer-Encoding": "chunked",
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        writer.write(_head(200, headers))
+        body = _body(target_id, profile.body_bytes)
+        for offset in range(0, len(body), CHUNK_SIZE):
+            chunk = body[offset:offset + CHUNK_SIZE]
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            await writer.drain()
+            await asyncio.sleep(profile.chunk_delay_ms / 1000.0)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+class ResultCounter:
+    """Stands in for the CheckResultWriter: counts check results by outcome, never refuses them."""
+
+    def __init__(self):
+        self.results: Dict[str, int] = {}
+
+    def offer(self, rows) -> bool:
+        for row in rows:
+            self.results[row[5]] = self.results.get(row[5], 0) + 1
+        return True
+
+
+class _UncountedUsage(UsageCounters):
+    """Farm checks are not tenant usage: nothing is counted, so flush() never needs the database."""
+
+    def add_check(self, tenant, duration_ms: float):
+        pass
+
+
+class FarmEngine(ProbeEngine):
+    """
+    The real ProbeEngine (scheduler, fair queue, concurrency slots, shared session, HTTP check) with its
+    targets loaded from farm URLs instead of monitored_urls. Results are counted instead of written and
+    nothing touches the database: the schedule is not saved, addresses and certificates stay in memory.
+    """
+
+    def __init__(self, urls: List[str], interval_s: float, **kwargs):
+        super().__init__(None, ResultCounter(), usage=_UncountedUsage(), **kwargs)
+        self.urls = urls
+        self.interval_s = interval_s
+
+    async def load_targets(self) -> Dict[int, ProbeTarget]:
+        return {url_id: ProbeTarget(url_id, url, self.interval_s) for url_id, url in enumerate(self.urls)}
+
+    async def save_schedule(self, overdue=()):
+        pass
+
+    async def _store_resolved_ip(self, target: ProbeTarget, ip: str):
+        target.resolved_ip = ip
+
+    async def _store_certificate(self, target: ProbeTarget, info, tls_version, cipher):
+        target.tls_fingerprint = info.fingerprint
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    reason = {200: "OK", 302: "Found", 404: "Not Found"}.get(status, "Error")
+    lines = [f"HTTP/1.1 {status} {reason}", *(f"{k}: {v}" for k, v in headers.items()), "", ""]
+    return "\r\n".join(lines).encode("latin-1")
+
+
+def _body(target_id: int, size: int) -> bytes:
+    """Deterministic body of `size` bytes for a target."""
+    line = f"target {target_id} ".encode()
+    return (line * (size // len(line) + 1))[:size]
+
+
+async def serve(args):
+    farm = TargetFarm(args.targets, load_profiles(args.profiles), seed=args.seed,
+                      expected_interval_s=args.interval or None)
+    await farm.start(args.host, args.port, args.tls_port)
+    base_url = f"http://{args.host}:{args.port}"
+    logger.info(f"Target farm serving {args.targets} targets on {base_url}"
+                + (f" and https://{args.host}:{args.tls_port}" if args.tls_port else ""))
+
+    if args.write_telegraf:
+        urls = farm.target_urls(base_url)
+        if args.tls_port:
+            urls += farm.target_urls(f"https://{args.host}:{args.tls_port}")[:args.tls_targets]
+        with open(args.write_telegraf, "w") as f:
+            f.write(render_http_response_config(
+                urls, interval=f"{args.interval or 10:g}s", insecure_skip_verify=bool(args.tls_port),
+                tags={"source": "target_farm"},
+            ))
+        logger.info(f"Telegraf http_response config for {len(urls)} URLs written to {args.write_telegraf}")
+
+    engine = None
+    if args.engine:
+        engine = FarmEngine(farm.target_urls(base_url), args.interval, concurrency=args.engine_concurrency,
+                            timeout_s=args.engine_timeout)
+        await engine.start()
+        logger.info(f"Probe engine checking {args.targets} targets every {args.interval:g}s "
+                    f"(concurrency {args.engine_concurrency}).")
+
+    try:
+        deadline = time.monotonic() + args.duration if args.duration else None
+        while deadline is None or time.monotonic() < deadline:
+            await asyncio.sleep(args.report_every if deadline is None
+                                else max(0.0, min(args.report_every, deadline - time.monotonic())))
+            logger.info("Target farm stats", **farm.stats())
+            if engine is not None:
+                logger.info("Probe engine stats", results=engine.writer.results, **engine.metrics())
+    finally:
+        stats = farm.stats()
+        if engine is not None:
+            await engine.stop()
+        await farm.close()
+
+    if args.save_baseline:
+        errors = sum(count for status, count in stats["status_counts"].items() if status >= 400)
+        result = summarize("probe_scheduler_lag", farm.lags_s, errors, stats["elapsed_s"])
+        result.extra.update({"checks_per_s": stats["checks_per_s"], "targets_hit": stats["targets_hit"]})
+        if engine is not None:
+            result.extra.update({"engine_dispatch_lag_max_ms": engine.metrics()["dispatch_lag_max_ms"],
+                                 "engine_dropped_results": engine.dropped_results})
+        print(format_table([result]))
+        save_baseline(args.save_baseline, [result], environment_info(0, stats["elapsed_s"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock HTTP target farm for probe benchmarking.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--tls-port", type=int, default=None, help="Also serve the targets over TLS")
+    parser.add_argument("--tls-targets", type=int, default=100, help="How many TLS URLs to add to the Telegraf config")
+    parser.add_argument("--targets", type=int, default=5000)
+    parser.add_argument("--profiles", help="JSON file of {name: Profile fields}; built-in mix when omitted")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--interval", type=float, default=10.0,
+                        help="Expected probe interval per target in seconds (for lag); 0 disables lag tracking")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after N seconds (0 = run until interrupted)")
+    parser.add_argument("--report-every", type=float, default=10.0)
+    parser.add_argument("--write-telegraf", help="Write an inputs.http_response config for all targets to this path")
+    parser.add_argument("--save-baseline", help="On exit, write checks/s and lag percentiles as a JSON baseline")
+    parser.add_argument("--engine", action="store_true",
+                        help="Probe all targets every --interval seconds with an in-process ProbeEngine (no database)")
+    parser.add_argument("--engine-concurrency", type=int, default=200)
+    parser.add_argument("--engine-timeout", type=float, default=10.0, help="Probe engine check timeout in seconds")
+    args = parser.parse_args()
+    if args.engine and not args.interval:
+        parser.error("--engine needs a probe --interval")
+    setup_logging()
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
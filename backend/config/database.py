@@ -1,7 +1,11 @@
 # backend\config\database.py
 import asyncio
+import os
+import time
 import asyncpg
-from typing import Dict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
 
 # Import necessary functions and schemas from our modules
 from config.logging_util import get_logger
@@ -19,45 +23,191 @@ DB_CONFIG = {
     "port": settings.DB_PORT
 }
 
+DEFAULT_POOL = "default"
+# Name of the replica pool in Database.pools (sized like the "analytics" pool)
+REPLICA_POOL = "replica"
+
+
+@dataclass(frozen=True)
+class PoolSpec:
+    """Size and timeouts of one named pool."""
+    min_size: int = 1
+    max_size: int = 10
+    acquire_timeout_s: Optional[float] = None    # Waiting for a free connection; None waits forever
+    statement_timeout_ms: Optional[int] = None   # Server-side limit per statement; None keeps the server default
+
+
+# Workloads with isolated capacity: a burst of chart queries can exhaust "analytics" but never
+# the connections that logins ("auth") or the COPY writer ("ingest") depend on.
+POOL_SPECS = {
+    DEFAULT_POOL: PoolSpec(1, settings.DB_POOL_SIZE),
+    "auth": PoolSpec(1, settings.DB_AUTH_POOL_SIZE, settings.DB_AUTH_ACQUIRE_TIMEOUT_SECONDS,
+                     settings.DB_AUTH_STATEMENT_TIMEOUT_MS),
+    "ingest": PoolSpec(1, settings.DB_INGEST_POOL_SIZE, None, settings.DB_INGEST_STATEMENT_TIMEOUT_MS),
+    "analytics": PoolSpec(1, settings.DB_ANALYTICS_POOL_SIZE, settings.DB_ANALYTICS_ACQUIRE_TIMEOUT_SECONDS,
+                          settings.DB_ANALYTICS_STATEMENT_TIMEOUT_MS),
+}
+
+REPLICA_CONFIG = {**DB_CONFIG, "host": settings.DB_REPLICA_HOST, "port": settings.DB_REPLICA_PORT or settings.DB_PORT} \
+    if settings.DB_REPLICA_HOST else None
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received
+# (pg_last_xact_replay_timestamp alone grows while the primary is idle)
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
 
 class Database:
     """
-    Manages the asyncpg database connection pool.
+    Manages the asyncpg database connection pools.
+
+    `pool` is the default pool, created by initialize(). Named pools (POOL_SPECS) are created on
+    first use in each process, so a process only opens connections for the workloads it serves.
+    With a replica configured, read-only work can run on it through `acquire(..., readonly=True)`
+    while its replication lag stays below `max_replica_lag_s`; otherwise it falls back to the primary.
     """
 
-    def __init__(self, db_config: Dict[str, str]):
+    def __init__(self, db_config: Dict[str, str], pool_specs: Optional[Dict[str, PoolSpec]] = None,
+                 replica_config: Optional[Dict[str, str]] = None, max_replica_lag_s: float = 5.0,
+                 replica_check_interval_s: float = 5.0):
         """
         Initializes the Database object with the given configuration.
         Args:
             db_config (Dict[str, str]): Database configuration parameters.
+            pool_specs (Dict[str, PoolSpec]): Named pools; `default` is always present.
+            replica_config (Dict[str, str]): Connection parameters of a read replica, if any.
+            max_replica_lag_s (float): Reads go to the primary while the replica lags more than this.
+            replica_check_interval_s (float): How long a replica lag measurement is reused.
         """
         if not all(key in db_config for key in ['host', 'database', 'user', 'password']):
             raise ValueError("Missing required database configuration parameters")
         self.db_config = db_config
+        self.pool_specs = {DEFAULT_POOL: PoolSpec(1, 20), **(pool_specs or {})}
+        self.replica_config = replica_config
+        self.max_replica_lag_s = max_replica_lag_s
+        self.replica_check_interval_s = replica_check_interval_s
         self.pool = None
+        self.pools: Dict[str, asyncpg.Pool] = {}
+        self._pool_pid = None  # PID of the process that created the pools
+        self._pool_lock = asyncio.Lock()
+        self.replica_lag_s: Optional[float] = None
+        self._replica_checked_at: Optional[float] = None
+        self._replica_healthy = False
+
+    def reset_after_fork(self):
+        """
+        Drops pools inherited from a parent process (e.g. Gunicorn master with preload_app).
+        Their sockets and event loop belong to the parent, so they are discarded without closing;
+        the next initialize() creates fresh pools in this process.
+        """
+        if self.pools and self._pool_pid != os.getpid():
+            logger.warning("Discarding database pools inherited across fork.")
+            self.pool = None
+            self.pools = {}
+            self._pool_pid = None
+            self._pool_lock = asyncio.Lock()
+            self._replica_checked_at = None
+
+    async def _create_pool(self, name: str) -> asyncpg.Pool:
+        spec = self.pool_specs.get("analytics" if name == REPLICA_POOL else name) or self.pool_specs[DEFAULT_POOL]
+        config = self.replica_config if name == REPLICA_POOL else self.db_config
+        server_settings = {"application_name": f"{settings.app_name}:{name}"[:63]}
+        if spec.statement_timeout_ms:
+            server_settings["statement_timeout"] = str(spec.statement_timeout_ms)
+        pool = await asyncpg.create_pool(**config, min_size=spec.min_size, max_size=spec.max_size,
+                                         server_settings=server_settings)
+        logger.info(f"Database connection pool '{name}' initialized (max {spec.max_size} connections)")
+        return pool
 
     async def initialize(self):
         """
-        Initializes the database connection pool.
+        Initializes the default database connection pool.
         """
+        self.reset_after_fork()
         if self.pool is None:
             try:
-                self.pool = await asyncpg.create_pool(**self.db_config, min_size=1, max_size=20)
-                logger.info("Database connection pool initialized")
+                self.pool = await self.get_pool(DEFAULT_POOL)
             except Exception as e:
                 logger.error(f"Error initializing database connection pool: {e}")
                 raise
 
         return self
 
+    async def get_pool(self, name: str = DEFAULT_POOL) -> asyncpg.Pool:
+        """Returns the named pool of this process, creating it on first use."""
+        self.reset_after_fork()
+        pool = self.pools.get(name)
+        if pool is None:
+            if name not in self.pool_specs and name != REPLICA_POOL:
+                raise ValueError(f"Unknown database pool: {name}")
+            async with self._pool_lock:
+                pool = self.pools.get(name)
+                if pool is None:
+                    pool = self.pools[name] = await self._create_pool(name)
+                    self._pool_pid = os.getpid()
+                    if name == DEFAULT_POOL:
+                        self.pool = pool
+        return pool
+
+    async def replica_usable(self) -> bool:
+        """
+        Whether reads may go to the replica: it is configured, reachable and at most `max_replica_lag_s`
+        behind. The measurement is reused for `replica_check_interval_s`; failures count as unusable.
+        """
+        if self.replica_config is None:
+            return False
+        now = time.monotonic()
+        if self._replica_checked_at is not None and now - self._replica_checked_at < self.replica_check_interval_s:
+            return self._replica_healthy
+        self._replica_checked_at = now  # Concurrent callers reuse the previous verdict meanwhile
+        try:
+            pool = await asyncio.wait_for(self.get_pool(REPLICA_POOL), timeout=5.0)
+            async with pool.acquire(timeout=1.0) as conn:
+                self.replica_lag_s = float(await conn.fetchval(REPLICA_LAG_QUERY, timeout=1.0))
+            healthy = self.replica_lag_s <= self.max_replica_lag_s
+            if not healthy and self._replica_healthy:
+                logger.warning(f"Read replica lags {self.replica_lag_s:.1f}s; reading from the primary.")
+        except Exception as e:
+            if self._replica_healthy:
+                logger.warning(f"Read replica unavailable, reading from the primary: {e}")
+            self.replica_lag_s, healthy = None, False
+        self._replica_healthy = healthy
+        return healthy
+
+    @asynccontextmanager
+    async def acquire(self, pool: str = DEFAULT_POOL, readonly: bool = False):
+        """
+        Acquires a connection from the named pool, within the pool's acquire timeout.
+        `readonly=True` uses the replica instead when replica_usable(); callers must then not write.
+        """
+        name = REPLICA_POOL if readonly and await self.replica_usable() else pool
+        spec = self.pool_specs.get(pool) or self.pool_specs[DEFAULT_POOL]
+        target = await self.get_pool(name)
+        async with target.acquire(timeout=spec.acquire_timeout_s) as connection:
+            yield connection
+
     async def close(self):
         """
-        Closes the database connection pool.
+        Closes the database connection pools.
         """
-        if self.pool:
-            await self.pool.close()
-            logger.info("Database connection pool closed")
+        for pool in list(self.pools.values()):
+            await pool.close()
+        if self.pools:
+            logger.info("Database connection pools closed")
+        self.pools = {}
+        self.pool = None
 
 
 # Global database instance
-database = Database(DB_CONFIG)
+database = Database(
+    DB_CONFIG,
+    pool_specs=POOL_SPECS,
+    replica_config=REPLICA_CONFIG,
+    max_replica_lag_s=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    replica_check_interval_s=settings.DB_REPLICA_CHECK_INTERVAL_SECONDS,
+)
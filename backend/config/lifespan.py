@@ -1,11 +1,17 @@
 # backend/config/lifespan.py
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 # Import necessary functions and schemas from our modules
 from config.logging_util import get_logger
 from config.database import database
+from config.tasks import scheduler
+from apps.monitoring.writer import check_writer
+from apps.monitoring.tenants import usage_counters
 from config.settings import settings
+from config.startup import mark, startup_report
+from apps.auth.security import is_asymmetric_algorithm, get_signing_key, get_verification_key, get_key_id
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -15,31 +21,46 @@ async def lifespan(app: FastAPI):
     # --- Startup Phase ---
     logger.info("Application startup sequence initiated...")
 
-    # JWT Secret Check
-    if settings.environment != "development" and settings.JWT_SECRET_KEY == "default_super_secret_key_change_me":
+    # JWT Secret / Key Check
+    if is_asymmetric_algorithm():
+        # Load the key pair now so a missing or malformed key fails startup instead of the first login
+        get_signing_key()
+        get_verification_key()
+        logger.info(f"JWT key pair loaded for {settings.JWT_ALGORITHM}.", kid=get_key_id())
+    elif settings.environment != "development" and settings.JWT_SECRET_KEY == "default_super_secret_key_change_me":
         logger.error("FATAL: JWT_SECRET_KEY is not set to a secure value. Update the .env file.")
         # Raising an error here will prevent FastAPI from starting up if the key is insecure in non-dev environments.
         raise RuntimeError("JWT_SECRET_KEY must be set to a secure value in production.")
     else:
         logger.info("JWT_SECRET_KEY check passed.")
 
-    # Initialize Database Pool (explicitly, if desired)
-    # The current database.py initializes pool on Database object creation or first use.
-    # Explicitly calling an initialize method here can make startup sequence clearer.
-    # For now, we assume database.pool is available when needed.
-    # If database.initialize() exists and is idempotent, it could be called here.
-    # Example: await database.initialize() # if you add such a method to your Database class
-    logger.info("Database pool should be available (managed by config.database).")
+    # Initialize Database Pool in this process. Lifespan runs inside each worker, so under
+    # Gunicorn with preload_app the pool is always created after the fork, never shared.
+    # If the database is not reachable yet, the pool is created lazily on first use instead.
+    try:
+        await database.initialize()
+    except Exception:
+        logger.warning("Database pool not initialized at startup; will retry on first use.", exc_info=True)
 
+    # Start periodic jobs registered on config.tasks.scheduler (one loop per job per worker;
+    # singleton jobs still run on only one worker cluster-wide via Postgres advisory locks)
+    await scheduler.start()
+
+    # Batched COPY writer for check results (fed by the ingestion endpoint)
+    await check_writer.start()
 
     # Note: Database migrations are now handled by Alembic CLI, so no migration call here.
-    # Note: The @repeat_every task for cleanup_expired_tokens in main.py will
-    #       start automatically when the asyncio loop is running (after this startup phase).
 
-    logger.info("Application startup complete. Ready to serve requests.")
+    mark("lifespan_startup")
+    logger.info("Application startup complete. Ready to serve requests.", **startup_report())
     yield
     # --- Shutdown Phase ---
     logger.info("Application shutdown sequence initiated...")
+    deadline = time.monotonic() + settings.SHUTDOWN_DRAIN_SECONDS
+    await scheduler.stop()
+    # Flush buffered check results while the pool is still open, within the drain deadline
+    await check_writer.stop(timeout_s=max(deadline - time.monotonic(), 1.0))
+    await usage_counters.flush(database)  # Last usage counters of this worker
     if database.pool:  # Check if pool was initialized
         try:
             await database.close()
@@ -1,6 +1,13 @@
 # backend/config/logging.py
+import atexit
+import json
 import logging
+import os
+import queue
+import random
 import sys
+from logging.handlers import QueueHandler, QueueListener
+import orjson
 import structlog
 
 # Import processor formatter for stdlib compatibility
@@ -9,15 +16,111 @@ from structlog.stdlib import ProcessorFormatter
 # Import project settings
 from config.settings import settings
 
+# Background writer for the "fast" profile (None when logging synchronously)
+_queue_listener = None
+# Set once setup_logging() has run; entry points call it explicitly (not on import)
+_configured = False
+
+
+def _orjson_dumps(obj, default=None, **kwargs):
+    """JSONRenderer serializer backed by orjson (returns str, as the stdlib formatter expects)."""
+    return orjson.dumps(obj, default=default).decode()
+
+
+class SampledProcessor:
+    """
+    Runs the wrapped processor on a random fraction of log events only.
+    Used to keep expensive processors (e.g. callsite frame inspection) cheap under load.
+    """
+
+    def __init__(self, processor, rate: float):
+        self.processor = processor
+        self.rate = rate
+
+    def __call__(self, logger, method_name, event_dict):
+        if self.rate >= 1.0 or (self.rate > 0.0 and random.random() < self.rate):
+            return self.processor(logger, method_name, event_dict)
+        return event_dict
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands log records to the background listener thread without formatting them.
+    Rendering (ProcessorFormatter) and the stdout write both happen in the listener thread,
+    so the event loop only pays for a queue put. Records are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Same-process queue: no pickling, so keep msg (the structlog event dict) and exc_info intact
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _stop_queue_listener():
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()  # Flushes remaining records before returning
+        _queue_listener = None
+
+
+def _reinit_after_fork():
+    """
+    Forked children (e.g. Gunicorn workers with preload_app) do not inherit the listener thread,
+    so records would pile up unwritten. Start a fresh queue and listener in the child; the parent's
+    listener object is dropped without stop() since its thread and queue lock belong to the parent.
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener = None
+        setup_logging(force=True)
+
+
+def setup_logging(force: bool = False):
+    """
+    Configures structlog and the stdlib root logger. Idempotent: later calls are no-ops
+    unless `force` is set, so every entry point can call it without paying twice.
+    """
+    global _queue_listener, _configured
+    if _configured and not force:
+        return
+    _configured = True
 
-def setup_logging():
     # Read log level from env
     log_level = settings.LOG_LEVEL.upper()
+    # "standard": full callsite/stack details, synchronous output (default)
+    # "fast": level filtering first, sampled callsite details, orjson, background writer thread
+    fast_profile = settings.LOG_PROFILE.lower() == "fast"
+
+    callsite_adder = structlog.processors.CallsiteParameterAdder(
+        parameters={
+                    # structlog.processors.CallsiteParameter.FILENAME,
+                    # structlog.processors.CallsiteParameter.FUNC_NAME,
+                    structlog.processors.CallsiteParameter.LINENO,
+                    structlog.processors.CallsiteParameter.MODULE,
+                    structlog.processors.CallsiteParameter.PATHNAME,
+                    # structlog.processors.CallsiteParameter.PROCESS,
+                    structlog.processors.CallsiteParameter.PROCESS_NAME,
+                    # structlog.processors.CallsiteParameter.THREAD,
+                    structlog.processors.CallsiteParameter.THREAD_NAME},
+        additional_ignores=[__name__] if fast_profile else None  # Skip SampledProcessor's own frame
+    )
+    if fast_profile:
+        # Frame inspection is only paid for on the sampled fraction (0 disables it entirely)
+        callsite_adder = SampledProcessor(callsite_adder, settings.LOG_CALLSITE_SAMPLE_RATE)
 
     # Processors shared between stdlib and structlog logs
     shared_processors = [
         structlog.contextvars.merge_contextvars,         # Merge context variables into the log
-        structlog.processors.StackInfoRenderer(),        # Render stack information
+        structlog.processors.StackInfoRenderer(),        # Render stack information (only when stack_info=True is passed)
         structlog.dev.set_exc_info,                      # Add exc_info to log records if present
         structlog.stdlib.add_log_level,                  # Add log level to event dict
         structlog.stdlib.add_logger_name,                # Add logger name to event dict
@@ -27,26 +130,14 @@ def setup_logging():
         ),
         structlog.processors.UnicodeDecoder(),           # Decode bytes to unicode
         structlog.processors.ExceptionPrettyPrinter() if settings.environment == "development" else structlog.processors.format_exc_info,   # Pretty print exceptions
-        structlog.processors.CallsiteParameterAdder(
-            parameters={
-                        # structlog.processors.CallsiteParameter.FILENAME, 
-                        # structlog.processors.CallsiteParameter.FUNC_NAME, 
-                        structlog.processors.CallsiteParameter.LINENO, 
-                        structlog.processors.CallsiteParameter.MODULE, 
-                        structlog.processors.CallsiteParameter.PATHNAME, 
-                        # structlog.processors.CallsiteParameter.PROCESS, 
-                        structlog.processors.CallsiteParameter.PROCESS_NAME, 
-                        # structlog.processors.CallsiteParameter.THREAD, 
-                        structlog.processors.CallsiteParameter.THREAD_NAME}, 
-            additional_ignores=None
-        ),                                                 # Add callsite parameters
+        callsite_adder,                                  # Add callsite parameters
     ]
 
     # Renderer: Console for development, JSON for production
     renderer = (
         structlog.dev.ConsoleRenderer()
         if settings.environment == "development"
-        else structlog.processors.JSONRenderer()
+        else structlog.processors.JSONRenderer(serializer=_orjson_dumps if fast_profile else json.dumps)
     )
 
     # Formatter for stdlib logs, uses the shared processors and the renderer
@@ -59,6 +150,14 @@ def setup_logging():
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(formatter)          # Apply the processor-based formatter
 
+    # Fast profile: the event loop only enqueues, a listener thread formats and writes
+    _stop_queue_listener()
+    if fast_profile:
+        log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_MAX_SIZE)
+        _queue_listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _queue_listener.start()
+        handler = NonBlockingQueueHandler(log_queue)
+
     # Root logger config (affects all standard loggers including FastAPI/Uvicorn)
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
@@ -68,6 +167,8 @@ def setup_logging():
     # Final structlog configuration
     structlog.configure(
         processors=[
+            # Fast profile: drop events below LOG_LEVEL before any other processor runs
+            *([structlog.stdlib.filter_by_level] if fast_profile else []),
             *shared_processors,                          # Apply same processors to structlog logs
             structlog.stdlib.ProcessorFormatter.wrap_for_formatter,  # Prepare for ProcessorFormatter rendering
         ],
@@ -77,6 +178,11 @@ def setup_logging():
         cache_logger_on_first_use=True                   # Cache logger instances
     )
 
+# Flush queued records on interpreter exit
+atexit.register(_stop_queue_listener)
+# Restart the background writer in forked children
+os.register_at_fork(after_in_child=_reinit_after_fork)
+
 # Utility to get a logger instance (named after caller module if not provided)
 def get_logger(name: str = None):
     if name is None:
@@ -86,6 +192,3 @@ def get_logger(name: str = None):
         except (ValueError, AttributeError, KeyError):
             name = "app"
     return structlog.get_logger(name)
-
-# Call setup_logging() when this module is imported
-setup_logging()
@@ -1,15 +1,44 @@
 # backend/config/routes.py
-from fastapi import APIRouter
+from typing import Annotated
+from fastapi import APIRouter, Depends
 
 # Import necessary functions and schemas from our modules
-from apps.auth.routes import router as auth_router
+from apps.auth.routes import router as auth_router, RoleChecker
+from apps.auth.schemas import TokenData
+from apps.dashboard.routes import router as dashboard_router
+from apps.monitoring.routes import router as monitoring_router
+from apps.monitoring.writer import check_writer
+from apps.telegraf_mgmt.routes import router as telegraf_router
+from config.tasks import scheduler
 
 api_router = APIRouter()
 
 # Include app-specific routers
 api_router.include_router(auth_router, prefix="/auth", tags=["Authentication"])
-# api_router.include_router(monitoring_router, prefix="/monitoring", tags=["Monitoring"]) # Example
+api_router.include_router(monitoring_router, prefix="/monitoring", tags=["Monitoring"])
+api_router.include_router(telegraf_router, prefix="/telegraf", tags=["Telegraf"])
+api_router.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"])
 
 @api_router.get("/health", tags=["System"])
 async def health_check():
     return {"status": "healthy", "message": "API is operational from config/routes.py"}
+
+
+@api_router.get("/system/jobs", tags=["System"])
+async def job_metrics(
+    admin_user_data: Annotated[TokenData, Depends(RoleChecker(["admin"]))]
+):
+    """
+    Periodic job metrics: this worker's in-process counters and the cluster-wide run history.
+    """
+    return {"worker": scheduler.runner_id, "local": scheduler.metrics(), "cluster": await scheduler.cluster_metrics()}
+
+
+@api_router.get("/system/ingest", tags=["System"])
+async def ingest_writer_metrics(
+    admin_user_data: Annotated[TokenData, Depends(RoleChecker(["admin"]))]
+):
+    """
+    Check result writer metrics for this worker (buffer depth, accepted/rejected/written rows, flushes).
+    """
+    return {"worker": scheduler.runner_id, "writer": check_writer.metrics()}
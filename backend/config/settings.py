@@ -15,15 +15,37 @@ class Settings(BaseSettings):
     DB_HOST: str
     DB_PORT: int
     DB_NAME: str
+    # Connection pools per workload (see config.database.POOL_SPECS); created on first use per process
+    DB_POOL_SIZE: int = 20 # Default pool (jobs, writes without a dedicated pool)
+    DB_AUTH_POOL_SIZE: int = 10 # Logins, token checks
+    DB_AUTH_ACQUIRE_TIMEOUT_SECONDS: float = 5.0 # Fail fast instead of queueing logins behind a stuck pool
+    DB_AUTH_STATEMENT_TIMEOUT_MS: int = 5000
+    DB_INGEST_POOL_SIZE: int = 4 # COPY writer flush tasks and ingestion lookups
+    DB_INGEST_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_ANALYTICS_POOL_SIZE: int = 5 # Dashboards, series, exports, reports
+    DB_ANALYTICS_ACQUIRE_TIMEOUT_SECONDS: float = 30.0
+    DB_ANALYTICS_STATEMENT_TIMEOUT_MS: int = 120000
+    # Optional read replica for analytics reads; empty host disables it
+    DB_REPLICA_HOST: str = ""
+    DB_REPLICA_PORT: Optional[int] = None # Defaults to DB_PORT
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0 # Reads fall back to the primary beyond this lag
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0 # How long a lag measurement is reused
 
     # Timezone configuration
     TZ: str
     # Logging Configuration
     LOG_LEVEL: str
+    LOG_PROFILE: str = "standard" # "standard" or "fast" (level filter first, sampled callsites, orjson, background writer)
+    LOG_CALLSITE_SAMPLE_RATE: float = 0.0 # Fraction of events that get callsite details in the "fast" profile
+    LOG_QUEUE_MAX_SIZE: int = 10000 # Max pending records in the "fast" profile; extra records are dropped
 
     # JWT Settings
     JWT_SECRET_KEY: str  # Load from JWT_SECRET_KEY env var - IMPORTANT: set in .env
-    JWT_ALGORITHM: str
+    JWT_ALGORITHM: str # HS256/384/512 (shared secret) or RS*/ES*/PS* (key pair, verifiable via /auth/auth/jwks.json)
+    JWT_PRIVATE_KEY: Optional[str] = None # PEM content or file path; required for RS*/ES*/PS* signing
+    JWT_PUBLIC_KEY: Optional[str] = None # PEM content or file path; derived from JWT_PRIVATE_KEY if unset
+    JWT_KEY_ID: Optional[str] = None # `kid` header/JWKS id; defaults to a digest of the public key
+    TOKEN_CACHE_SIZE: int = 10000 # Recently verified tokens kept per worker (0 disables the cache)
     ACCESS_TOKEN_EXPIRE_MINUTES: int # Default 15 minutes expiration
     REFRESH_TOKEN_EXPIRE_DAYS: int
     password_reset_token_expires_hours: int
@@ -33,6 +55,84 @@ class Settings(BaseSettings):
     admin_access_token_expires_minutes: int = 15 # Default for Admin
     viewer_access_token_expires_minutes: int = 120 # Default for Viewer (2 hours)
 
+    # Login/refresh rate limiting (apps/auth/rate_limit.py); a limit of 0 disables that limiter
+    AUTH_RATE_LIMIT_WINDOW_SECONDS: float = 300.0 # Sliding window length
+    AUTH_RATE_LIMIT_LOGIN_PER_IP: int = 30 # Login attempts per client IP per window
+    AUTH_RATE_LIMIT_LOGIN_PER_ACCOUNT: int = 10 # Login attempts per account (email) per window
+    AUTH_RATE_LIMIT_REFRESH_PER_IP: int = 120 # Token refreshes per client IP per window
+    AUTH_RATE_LIMIT_MAX_KEYS: int = 100000 # Tracked keys per limiter per worker
+    AUTH_RATE_LIMIT_TRUST_FORWARDED: bool = False # Key by the last X-Forwarded-For entry (only behind a reverse proxy)
+    AUTH_RATE_LIMIT_SYNC_SECONDS: float = 0.0 # Share counts between workers through Postgres this often; 0 keeps them per worker
+
+    # Expired token_blacklist cleanup (runs on one worker cluster-wide)
+    TOKEN_CLEANUP_INTERVAL_SECONDS: int = 3600
+    TOKEN_CLEANUP_BATCH_SIZE: int = 5000 # Rows deleted per short transaction
+
+    # Monitoring API responses (see utils/responses.py)
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024 # Smaller bodies are sent uncompressed
+    RESPONSE_GZIP_LEVEL: int = 5
+    RESPONSE_BROTLI_QUALITY: int = 4 # Used when the brotli package is installed and the client accepts br
+
+    # Dashboard batch endpoint (POST /dashboard/batch)
+    BATCH_MAX_QUERIES: int = 20 # Sub-queries per request
+    BATCH_CONCURRENCY: int = 4 # Sub-queries of one request running at once, each on its own pooled connection (keep below DB_ANALYTICS_POOL_SIZE)
+
+    # Metrics ingestion (POST /telegraf/write) and the batched check result writer
+    INGEST_API_TOKENS: str = "" # Comma-separated bearer tokens accepted from agents; empty disables ingestion
+    INGEST_MAX_BODY_BYTES: int = 33554432 # Max decompressed request body (32 MiB)
+    INGEST_URL_CACHE_SECONDS: float = 30.0 # How long a worker caches the monitored URL -> id map
+    INGEST_BATCH_SIZE: int = 5000 # Rows per COPY
+    INGEST_FLUSH_INTERVAL_SECONDS: float = 1.0 # Max time rows wait in the buffer
+    INGEST_MAX_PENDING_ROWS: int = 100000 # Buffer limit per worker; beyond it ingestion answers 429
+    INGEST_WRITER_CONCURRENCY: int = 2 # COPY flush tasks (pooled connections) per worker
+    SPILL_DIR: str = "data/spill" # On-disk spill log for check results the DB cannot take right now; empty disables
+    SPILL_SEGMENT_BYTES: int = 16777216 # Segment file size (16 MiB)
+    SPILL_MAX_BYTES: int = 1073741824 # Disk budget per worker (1 GiB); beyond it ingestion answers 429
+    SPILL_QUARANTINE_MAX_BYTES: int = 67108864 # Separate budget for rows the DB refused for good (64 MiB); oldest rotated out
+    SPILL_FSYNC: bool = False # fsync every spilled batch (survives power loss, not just process crashes)
+    INGEST_CHANGE_ONLY: bool = False # Store full rows only on status/latency changes; stable checks extend check_runs
+    INGEST_RUN_TOLERANCE_MS: float = 50.0 # Latency band around the last stored row within which checks are folded...
+    INGEST_RUN_TOLERANCE_RATIO: float = 0.25 # ...or this fraction of its latency, whichever is larger
+    INGEST_RUN_FLUSH_SECONDS: float = 30.0 # How often open runs are upserted into check_runs
+
+    # Probe engine (python -m apps.monitoring.engine)
+    PROBE_CONCURRENCY: int = 200 # Checks in flight at once
+    PROBE_TIMEOUT_SECONDS: float = 10.0 # Total time per check
+    PROBE_MAX_BODY_BYTES: int = 10485760 # Body bytes read for assertions/content hashing (10 MiB)
+    PROBE_TARGET_REFRESH_SECONDS: float = 60.0 # How often monitored_urls is reloaded
+    PROBE_CERT_CACHE_SIZE: int = 10000 # Parsed TLS certificates kept per probe process (by host + fingerprint)
+    PROBE_WORKERS: int = 0 # Processes of python -m apps.monitoring.runner; 0 = one per core (PROBE_CONCURRENCY applies per process)
+    PROBE_IPC_SOCKET: str = "" # Unix socket the runner's workers send results to; empty = a fresh temp path
+    SHUTDOWN_DRAIN_SECONDS: float = 20.0 # On SIGTERM: deadline for in-flight checks and buffered results (keep below GUNICORN_GRACEFUL_TIMEOUT / the stop grace period)
+
+    # Latency anomaly detection (apps/monitoring/anomalies.py, runs on one worker cluster-wide)
+    ANOMALY_INTERVAL_SECONDS: int = 900 # Each run (re)scores the last complete hour
+    ANOMALY_BASELINE_DAYS: int = 14 # History the baselines are computed from
+    ANOMALY_EWMA_ALPHA: float = 0.1 # Weight of the newest hour in the trend baseline
+    ANOMALY_MIN_SAMPLES: int = 24 # Hours with data a URL needs before it is scored
+    ANOMALY_MIN_SEASONAL_SAMPLES: int = 3 # Same-hour-of-day samples needed for the time-of-day baseline
+    ANOMALY_MIN_SCALE_MS: float = 5.0 # Floor of the MAD-based scale, so flat series are not flagged for jitter
+    ANOMALY_SCORE_THRESHOLD: float = 3.5 # Robust z-score from which an hour counts as anomalous
+    ANOMALY_RETENTION_DAYS: int = 30 # Scores kept in latency_anomalies
+
+    # SLA reports (apps/monitoring/sla.py)
+    SLA_MAX_GAP_INTERVALS: float = 3.0 # A check's state counts for at most this many check intervals; beyond: no data
+    SLA_FINALIZE_AFTER_HOURS: int = 24 # A month's reports are computed once and cached this long after it ended
+
+    # Outage correlation (apps/monitoring/incidents.py, runs in the probe engine / runner process)
+    INCIDENT_CORRELATION_ENABLED: bool = True # Group failures of URLs sharing a host, IP or network into incidents
+    INCIDENT_WINDOW_SECONDS: float = 60.0 # A failure joins an incident of a shared key that failed this recently
+    INCIDENT_RECOVERY_SECONDS: float = 120.0 # An incident resolves once all its URLs have passed checks this long
+    INCIDENT_FLUSH_SECONDS: float = 5.0 # How often changed incidents are written (one upsert per flush)
+    INCIDENT_IPV4_PREFIX: int = 24 # Network prefix length that groups IPv4 addresses
+    INCIDENT_IPV6_PREFIX: int = 48 # Network prefix length that groups IPv6 addresses
+
+    # Tenant quotas (per URL owner; overridden per user or role in tenant_quotas)
+    TENANT_DEFAULT_MAX_URLS: int = 1000 # Monitored URLs checked per tenant; URLs beyond it are skipped
+    TENANT_DEFAULT_MIN_INTERVAL_SECONDS: int = 30 # Shorter check intervals are raised to this
+    TENANT_DEFAULT_WEIGHT: float = 1.0 # Fair-share weight in the probe engine's queue
+    TENANT_USAGE_FLUSH_SECONDS: float = 60.0 # How often usage counters are written to tenant_usage
+
     # Default role
     default_role_id: str
 
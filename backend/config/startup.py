@@ -0,0 +1,23 @@
+# backend/config/startup.py
+import time
+from typing import Dict, List, Tuple
+
+# Reference point: the first import of this module (main.py imports it before anything else)
+_process_t0 = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+
+
+def mark(phase: str):
+    """Records that a startup phase finished (time measured since this module was imported)."""
+    _marks.append((phase, time.perf_counter()))
+
+
+def startup_report() -> Dict[str, float]:
+    """Milliseconds spent in each recorded phase, plus the total so far."""
+    report = {}
+    previous = _process_t0
+    for phase, t in _marks:
+        report[f"{phase}_ms"] = round((t - previous) * 1000, 1)
+        previous = t
+    report["total_ms"] = round((previous - _process_t0) * 1000, 1)
+    return report
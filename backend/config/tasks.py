@@ -0,0 +1,187 @@
+# backend/config/tasks.py
+import asyncio
+import hashlib
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import get_logger
+from config.database import database, Database
+
+# Initialize logger
+logger = get_logger(__name__)
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable signed 64-bit key for pg_try_advisory_lock derived from a job name."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+@dataclass
+class JobStats:
+    """In-process runtime metrics for one job (cluster-wide history lives in `scheduled_jobs`)."""
+    runs: int = 0
+    failures: int = 0
+    skipped_locked: int = 0       # Another worker held the job's advisory lock
+    skipped_not_due: int = 0      # Another worker already ran it this interval
+    skipped_overlap: int = 0      # Previous run in this process still in progress
+    skipped_no_db: int = 0
+    last_started_at: Optional[float] = None
+    last_duration_s: Optional[float] = None
+    total_duration_s: float = 0.0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Awaitable[None]]
+    interval_s: float
+    jitter_s: float = 0.0
+    singleton: bool = True        # Run on exactly one worker in the cluster per interval
+    wait_first: bool = True
+    lock_key: int = 0
+    running: bool = False
+    stats: JobStats = field(default_factory=JobStats)
+
+
+class JobScheduler:
+    """
+    Runs periodic jobs inside every worker process.
+
+    Singleton jobs use Postgres for leader election: on each tick a worker tries
+    `pg_try_advisory_lock(<job key>)` on a pooled connection. Only the lock holder proceeds;
+    it then checks the job's `scheduled_jobs` row and runs only if no other worker started it
+    within the last interval (minus jitter), so each job runs once per interval cluster-wide.
+    The lock is held for the whole run, so runs never overlap across workers either.
+    Ticks are spread with random jitter to avoid every worker hitting the database at once.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.runner_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def job(self, name: str, interval_s: float, jitter_s: float = 0.0, singleton: bool = True, wait_first: bool = True):
+        """Decorator registering a coroutine function as a periodic job."""
+        if jitter_s >= interval_s:
+            raise ValueError("jitter_s must be smaller than interval_s")
+
+        def decorator(func: Callable[[], Awaitable[None]]):
+            self.jobs[name] = Job(
+                name=name, func=func, interval_s=interval_s, jitter_s=jitter_s,
+                singleton=singleton, wait_first=wait_first, lock_key=advisory_lock_key(name),
+            )
+            return func
+        return decorator
+
+    async def start(self):
+        """Starts one loop per job in the current process (call after any fork, e.g. from the lifespan)."""
+        self.runner_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = [asyncio.create_task(self._loop(job), name=f"job:{job.name}") for job in self.jobs.values()]
+        logger.info(f"Job scheduler started with {len(self._tasks)} job(s).", runner=self.runner_id)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, job: Job):
+        if job.wait_first:
+            await asyncio.sleep(job.interval_s + random.uniform(0, job.jitter_s))
+        while True:
+            await self.run_once(job)
+            await asyncio.sleep(job.interval_s + random.uniform(0, job.jitter_s))
+
+    async def run_once(self, job: Job) -> bool:
+        """Runs the job now if this worker wins the lock and it is due. Returns True if it ran."""
+        if job.running:
+            job.stats.skipped_overlap += 1
+            return False
+        if not job.singleton:
+            return await self._execute(job)
+        if self.db.pool is None:
+            job.stats.skipped_no_db += 1
+            return False
+
+        try:
+            async with self.db.pool.acquire() as lock_conn:
+                if not await lock_conn.fetchval("SELECT pg_try_advisory_lock($1)", job.lock_key):
+                    job.stats.skipped_locked += 1
+                    return False
+                try:
+                    due = await lock_conn.fetchval(
+                        """
+                        INSERT INTO scheduled_jobs (name, last_started_at, last_runner)
+                        VALUES ($1, NOW(), $3)
+                        ON CONFLICT (name) DO UPDATE
+                            SET last_started_at = NOW(), last_runner = $3
+                            WHERE scheduled_jobs.last_started_at IS NULL
+                               OR scheduled_jobs.last_started_at <= NOW() - make_interval(secs => $2)
+                        RETURNING TRUE
+                        """,
+                        job.name, job.interval_s - job.jitter_s, self.runner_id
+                    )
+                    if not due:
+                        job.stats.skipped_not_due += 1
+                        return False
+                    ok = await self._execute(job)
+                    await lock_conn.execute(
+                        """
+                        UPDATE scheduled_jobs
+                        SET last_finished_at = NOW(), last_duration_ms = $2, last_status = $3, last_error = $4,
+                            run_count = run_count + 1, failure_count = failure_count + $5
+                        WHERE name = $1
+                        """,
+                        job.name, (job.stats.last_duration_s or 0) * 1000,
+                        "ok" if ok else "failed", None if ok else job.stats.last_error, 0 if ok else 1
+                    )
+                    return ok
+                finally:
+                    await lock_conn.execute("SELECT pg_advisory_unlock($1)", job.lock_key)
+        except Exception as e:
+            logger.error(f"Job {job.name}: scheduling error: {e}", exc_info=True)
+            return False
+
+    async def _execute(self, job: Job) -> bool:
+        job.running = True
+        started = time.perf_counter()
+        job.stats.last_started_at = time.time()
+        try:
+            await job.func()
+            job.stats.runs += 1
+            return True
+        except Exception as e:
+            job.stats.failures += 1
+            job.stats.last_error = repr(e)
+            logger.error(f"Job {job.name} failed: {e}", exc_info=True)
+            return False
+        finally:
+            job.stats.last_duration_s = time.perf_counter() - started
+            job.stats.total_duration_s += job.stats.last_duration_s
+            job.running = False
+
+    def metrics(self) -> Dict[str, dict]:
+        """In-process metrics for every registered job."""
+        return {
+            name: {"interval_s": job.interval_s, "singleton": job.singleton, "running": job.running, **asdict(job.stats)}
+            for name, job in self.jobs.items()
+        }
+
+    async def cluster_metrics(self) -> List[dict]:
+        """Cluster-wide last-run history from the `scheduled_jobs` table."""
+        if self.db.pool is None:
+            return []
+        async with self.db.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT * FROM scheduled_jobs ORDER BY name")
+        return [dict(row) for row in rows]
+
+
+# Global scheduler instance (jobs are registered in main.py, started by config.lifespan)
+scheduler = JobScheduler(database)
@@ -1,42 +1,66 @@
 # backend\main.py
+# Imported first so startup phases are timed from the very beginning
+from config.startup import mark, startup_report
+
 from fastapi import FastAPI
-from fastapi_utilities import repeat_every
+mark("import_fastapi")
 
 # Import necessary functions and schemas from our modules
 from config.logging_util import setup_logging, get_logger
+from config.settings import settings
+from config.tasks import scheduler
 from config.lifespan import lifespan
-from config.database import database # Keep for cleanup_expired_tokens
 from config.routes import api_router
+from apps.auth.services import delete_expired_tokens
+from config.database import database
+from apps.monitoring.tenants import usage_counters
+from apps.auth.rate_limit import rate_limit_sync
+mark("import_app_modules")
 
-# Call setup_logging() early, but ensure settings are loaded.
-# This should be called once per application lifecycle.
-# If config.logging_util.setup_logging() was already called, ensure this is idempotent or called only here.
-# For simplicity, assuming it's called here as the primary point if not already done in config.logging_util itself.
+# Configure logging exactly once per process (config.logging_util no longer does it on import)
 setup_logging()
 # Initialize logger
 logger = get_logger(__name__)
+mark("setup_logging")
 
 app = FastAPI(lifespan=lifespan)
 
-# This task will be managed by fastapi-utilities once the app is running
-@repeat_every(seconds=3600, logger=logger, wait_first=True)
+# Periodic jobs: started per worker by config.lifespan, singleton jobs run on one worker cluster-wide
+@scheduler.job("token_cleanup", interval_s=settings.TOKEN_CLEANUP_INTERVAL_SECONDS, jitter_s=60)
 async def cleanup_expired_tokens():
     """
     Periodically cleans up expired tokens from the token_blacklist table.
     """
     logger.info("Running expired token cleanup task...")
-    if database.pool: # Check if pool is initialized
-        try:
-            # asyncpg.pool.Pool.acquire is a context manager
-            async with database.pool.acquire() as conn:
-                await conn.execute("DELETE FROM token_blacklist WHERE expires_at < NOW();")
-                logger.info("Expired tokens cleaned up successfully.")
-        except Exception as e:
-            logger.error("Error during token cleanup.", exc_info=True) # Use exc_info for details
-    else:
-        logger.warning("Token cleanup skipped: Database pool not available.")
+    deleted = await delete_expired_tokens(batch_size=settings.TOKEN_CLEANUP_BATCH_SIZE)
+    logger.info(f"Expired tokens cleaned up successfully ({deleted} removed).")
+
+@scheduler.job("tenant_usage_flush", interval_s=settings.TENANT_USAGE_FLUSH_SECONDS, singleton=False)
+async def flush_tenant_usage():
+    """
+    Adds this worker's per-tenant ingestion counters to tenant_usage (every worker flushes its own).
+    """
+    await usage_counters.flush(database)
+
+@scheduler.job("latency_anomalies", interval_s=settings.ANOMALY_INTERVAL_SECONDS, jitter_s=30)
+async def score_latency_anomalies():
+    """
+    Scores the last complete hour of latency of every monitored URL against its baselines.
+    """
+    from apps.monitoring.anomalies import detect_anomalies  # NumPy is only imported by the worker running it
+    await detect_anomalies(database)
+
+if settings.AUTH_RATE_LIMIT_SYNC_SECONDS > 0:
+    @scheduler.job("auth_rate_limit_sync", interval_s=settings.AUTH_RATE_LIMIT_SYNC_SECONDS, singleton=False)
+    async def sync_auth_rate_limits():
+        """
+        Shares this worker's login/refresh attempt counts with the other workers through Postgres.
+        """
+        await rate_limit_sync.sync(database)
 
 # Include the main router from config/routes.py
 app.include_router(api_router)
+mark("create_app")
 
-logger.info("FastAPI application instance created. Routers included from config. Lifespan manager will handle startup/shutdown events.")
+logger.info("FastAPI application instance created. Routers included from config. Lifespan manager will handle startup/shutdown events.",
+            **startup_report())
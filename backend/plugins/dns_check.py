@@ -0,0 +1,164 @@
+# backend/plugins/dns_check.py
+import asyncio
+import ipaddress
+import random
+import struct
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Import necessary functions and schemas from our modules
+from apps.monitoring.checks import CheckOutcome, CheckType, option_type, register_check_type
+
+RECORD_TYPES = {"A": 1, "NS": 2, "CNAME": 5, "MX": 15, "TXT": 16, "AAAA": 28}
+RCODES = {1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+HEADER = struct.Struct(">HHHHHH")
+RESOLV_CONF = "/etc/resolv.conf"
+
+_system_nameserver: Optional[str] = None
+
+
+def system_nameserver() -> str:
+    """First `nameserver` of /etc/resolv.conf (read once per process)."""
+    global _system_nameserver
+    if _system_nameserver is None:
+        _system_nameserver = "127.0.0.1"
+        try:
+            with open(RESOLV_CONF) as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[0] == "nameserver":
+                        _system_nameserver = parts[1]
+                        break
+        except OSError:
+            pass
+    return _system_nameserver
+
+
+def build_query(query_id: int, name: str, record_type: int) -> bytes:
+    qname = b"".join(bytes([len(label)]) + label for label in name.rstrip(".").encode("idna").split(b".")) + b"\0"
+    return HEADER.pack(query_id, 0x0100, 1, 0, 0, 0) + qname + struct.pack(">HH", record_type, 1)  # RD, class IN
+
+
+def _read_name(message: bytes, offset: int) -> Tuple[str, int]:
+    """Decodes a (possibly compressed) domain name; returns it and the offset after it in the record."""
+    labels, end, jumps = [], None, 0
+    while True:
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            jumps += 1
+            if jumps > 32:
+                raise ValueError("DNS name compression loop")
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(message[offset:offset + length].decode("ascii", errors="replace"))
+        offset += length
+    return ".".join(labels), end if end is not None else offset
+
+
+def parse_response(message: bytes, record_type: int) -> Tuple[int, List[str]]:
+    """(rcode, answers of `record_type` as text). MX answers are the exchange host names."""
+    _, flags, qdcount, ancount, _, _ = HEADER.unpack_from(message)
+    offset = HEADER.size
+    for _ in range(qdcount):
+        _, offset = _read_name(message, offset)
+        offset += 4
+    answers = []
+    for _ in range(ancount):
+        _, offset = _read_name(message, offset)
+        rtype, _, _, rdlength = struct.unpack_from(">HHIH", message, offset)
+        offset += 10
+        rdata = message[offset:offset + rdlength]
+        if rtype == record_type:
+            if rtype == 1:
+                answers.append(str(ipaddress.IPv4Address(rdata)))
+            elif rtype == 28:
+                answers.append(str(ipaddress.IPv6Address(rdata)))
+            elif rtype in (2, 5):
+                answers.append(_read_name(message, offset)[0])
+            elif rtype == 15:
+                answers.append(_read_name(message, offset + 2)[0])
+            elif rtype == 16:
+                parts, i = [], 0
+                while i < len(rdata):
+                    parts.append(rdata[i + 1:i + 1 + rdata[i]].decode("utf-8", errors="replace"))
+                    i += 1 + rdata[i]
+                answers.append("".join(parts))
+        offset += rdlength
+    return flags & 0x000F, answers
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, query_id: int):
+        self.query_id = query_id
+        self.response = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data, addr):
+        if len(data) >= HEADER.size and struct.unpack_from(">H", data)[0] == self.query_id and not self.response.done():
+            self.response.set_result(data)
+
+    def error_received(self, exc):
+        if not self.response.done():
+            self.response.set_exception(exc)
+
+
+async def query(name: str, record_type: int, nameserver: str, port: int = 53) -> bytes:
+    """One UDP query; the caller's timeout bounds the wait."""
+    query_id = random.getrandbits(16)
+    transport, protocol = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: _QueryProtocol(query_id), remote_addr=(nameserver, port)
+    )
+    try:
+        transport.sendto(build_query(query_id, name, record_type))
+        return await protocol.response
+    finally:
+        transport.close()
+
+
+@register_check_type
+class DnsCheck(CheckType):
+    """
+    DNS query (`dns://example.com/MX`; the record type defaults to A) sent straight to a name server
+    over UDP, so it sees what the server answers now rather than a local cache.
+
+    Options: `nameserver` (default: the first one in /etc/resolv.conf) and `expect` (a value that
+    must be among the answers, e.g. an IP for A records or the exchange host for MX).
+    """
+
+    name = "dns"
+
+    @classmethod
+    def validate_options(cls, options):
+        option_type(options, "record_type", (str,), "a string")
+        option_type(options, "nameserver", (str,), "a string")
+        option_type(options, "port", (int,), "an integer")
+        option_type(options, "expect", (str,), "a string")
+        if options.get("record_type") and options["record_type"].upper() not in RECORD_TYPES:
+            raise ValueError(f"check_options.record_type must be one of {', '.join(RECORD_TYPES)}")
+        if options.get("port") is not None and not 0 < options["port"] < 65536:
+            raise ValueError("check_options.port must be between 1 and 65535")
+
+    async def check(self, target) -> CheckOutcome:
+        parts = urlsplit(target.url)
+        type_name = (target.options.get("record_type") or parts.path.strip("/") or "A").upper()
+        record_type = RECORD_TYPES.get(type_name)
+        if record_type is None or not parts.hostname:
+            raise ValueError(f"Unsupported DNS target {target.url!r}")
+        nameserver = target.options.get("nameserver") or system_nameserver()
+        message = await query(parts.hostname, record_type, nameserver, int(target.options.get("port", 53)))
+        rcode, answers = parse_response(message, record_type)
+        outcome = CheckOutcome()
+        if rcode:
+            outcome.result, outcome.error = "dns_error", f"{RCODES.get(rcode, rcode)} from {nameserver}"
+        elif not answers:
+            outcome.result, outcome.error = "dns_error", f"No {type_name} records for {parts.hostname}"
+        else:
+            expect = target.options.get("expect")
+            if expect is not None and str(expect).rstrip(".").lower() not in {a.rstrip(".").lower() for a in answers}:
+                outcome.result = "assertion_failed"
+                outcome.error = f"Expected {expect!r} in {type_name} answers {answers[:5]}"
+        return outcome
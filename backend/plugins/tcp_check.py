@@ -0,0 +1,58 @@
+# backend/plugins/tcp_check.py
+import asyncio
+import re
+import time
+
+# Import necessary functions and schemas from our modules
+from apps.monitoring.checks import CheckOutcome, CheckType, elapsed_ms, option_type, register_check_type, resolve
+
+
+@register_check_type
+class TcpCheck(CheckType):
+    """
+    TCP connect check (`tcp://db.internal:5432`), a ping that needs no ICMP privileges.
+
+    Options (`monitored_urls.check_options`): `send` (text written after connecting) and `expect`
+    (regex that the first `read_bytes`, default 1024, of the reply must match; e.g. `"^220 "` for SMTP).
+    `connect_ms` is the TCP connect alone; the check's duration includes the exchange.
+    """
+
+    name = "tcp"
+
+    @classmethod
+    def validate_options(cls, options):
+        option_type(options, "send", (str,), "a string")
+        option_type(options, "expect", (str,), "a string")
+        option_type(options, "read_bytes", (int,), "an integer")
+        if options.get("expect") is not None:
+            try:
+                re.compile(options["expect"].encode())
+            except re.error as e:
+                raise ValueError(f"check_options.expect is not a valid regex: {e}")
+        if options.get("read_bytes") is not None and options["read_bytes"] <= 0:
+            raise ValueError("check_options.read_bytes must be positive")
+
+    async def check(self, target) -> CheckOutcome:
+        host, port = self.host_port(target)
+        address = await resolve(host, port)
+        started = time.perf_counter()
+        reader, writer = await asyncio.open_connection(address[0], address[1])
+        outcome = CheckOutcome(connect_ms=elapsed_ms(started), peer_ip=address[0])
+        try:
+            send, expect = target.options.get("send"), target.options.get("expect")
+            if send:
+                writer.write(send.encode())
+                await writer.drain()
+            if expect is not None:
+                data = await reader.read(int(target.options.get("read_bytes", 1024)))
+                outcome.content_length = len(data)
+                if not re.search(expect.encode(), data):
+                    outcome.result = "assertion_failed"
+                    outcome.error = f"Expected {expect!r}, got {data[:100]!r}"
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+        return outcome
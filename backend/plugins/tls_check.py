@@ -0,0 +1,57 @@
+# backend/plugins/tls_check.py
+import asyncio
+import ssl
+import time
+from datetime import datetime, timedelta, timezone
+
+# Import necessary functions and schemas from our modules
+from apps.monitoring.checks import CheckOutcome, CheckType, elapsed_ms, option_type, register_check_type, resolve
+
+
+@register_check_type
+class TlsCheck(CheckType):
+    """
+    TLS handshake only (`tls://mail.example.com:465`), for TLS services that do not speak HTTP.
+
+    The certificate goes through the engine's certificate cache and `tls_certificates` like https
+    checks. Options: `server_name` (SNI and hostname to verify, default the target host), `verify`
+    (default true) and `min_days_remaining` (fail with `certificate_expiring` when the chain expires sooner).
+    `connect_ms` is TCP connect plus handshake, as for https checks.
+    """
+
+    name = "tls"
+    default_port = 443
+
+    @classmethod
+    def validate_options(cls, options):
+        option_type(options, "server_name", (str,), "a string")
+        option_type(options, "verify", (bool,), "true or false")
+        option_type(options, "min_days_remaining", (int, float), "a number")
+
+    async def check(self, target) -> CheckOutcome:
+        host, port = self.host_port(target)
+        server_name = target.options.get("server_name") or host
+        context = ssl.create_default_context()
+        if not target.options.get("verify", True):
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        address = await resolve(host, port)
+        started = time.perf_counter()
+        reader, writer = await asyncio.open_connection(address[0], address[1], ssl=context,
+                                                       server_hostname=server_name)
+        outcome = CheckOutcome(connect_ms=elapsed_ms(started), peer_ip=address[0])
+        try:
+            info = await self.engine.observe_certificate(target, server_name, writer.get_extra_info("ssl_object"))
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+        min_days = target.options.get("min_days_remaining")
+        if info is not None and min_days is not None:
+            remaining = info.chain_not_after - datetime.now(timezone.utc)
+            if remaining < timedelta(days=min_days):
+                outcome.result = "certificate_expiring"
+                outcome.error = f"Certificate chain expires {info.chain_not_after:%Y-%m-%d %H:%M}Z"
+        return outcome
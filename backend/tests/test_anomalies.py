@@ -0,0 +1,81 @@
+# backend/tests/test_anomalies.py
+import numpy as np
+
+from apps.monitoring.anomalies import score_hour
+
+HOURS = 24 * 7 + 1  # A week of history and the scored hour
+
+
+def daily_pattern(hours: int = HOURS, base: float = 100.0, peak: float = 300.0) -> np.ndarray:
+    """Latency that is `peak` from 09:00 to 17:00 every day and `base` otherwise (column 0 is midnight)."""
+    hour_of_day = np.arange(hours) % 24
+    return np.where((hour_of_day >= 9) & (hour_of_day < 17), peak, base).astype(float)
+
+
+def test_flat_series_is_not_anomalous():
+    matrix = np.full((1, HOURS), 100.0)
+    result = score_hour(matrix)
+    assert result["valid"][0]
+    assert result["score"][0] == 0.0
+    assert not result["is_anomaly"][0]
+
+
+def test_spike_is_anomalous():
+    matrix = np.full((1, HOURS), 100.0)
+    matrix[0, -1] = 400.0
+    result = score_hour(matrix)
+    assert result["is_anomaly"][0]
+    assert result["expected"][0] == 100.0
+
+
+def test_jitter_below_the_scale_floor_is_not_anomalous():
+    rng = np.random.default_rng(1)
+    matrix = 100.0 + rng.normal(0, 1, (1, HOURS))
+    matrix[0, -1] = 104.0  # Within the 5 ms / 5 % floor
+    assert not score_hour(matrix)["is_anomaly"][0]
+
+
+def test_daily_peak_is_expected():
+    # Scored hour is 10:00 on day 8: slow, but as slow as 10:00 on previous days
+    matrix = daily_pattern(24 * 7 + 11)[None, :]
+    result = score_hour(matrix)
+    assert result["seasonal"][0]
+    assert result["expected"][0] == 300.0
+    assert not result["is_anomaly"][0]
+
+
+def test_peak_latency_at_night_is_anomalous():
+    matrix = daily_pattern()[None, :]  # Scored hour is midnight
+    matrix[0, -1] = 300.0
+    result = score_hour(matrix)
+    assert result["seasonal"][0]
+    assert result["expected"][0] == 100.0
+    assert result["is_anomaly"][0]
+
+
+def test_recent_level_shift_is_not_anomalous_once_the_ewma_follows():
+    matrix = np.full((1, HOURS), 100.0)
+    matrix[0, -60:] = 250.0  # New steady level since 2.5 days (e.g. a slower backend after a deploy)
+    result = score_hour(matrix, min_seasonal_samples=10)
+    assert result["ewma"][0] > 240.0
+    assert not result["is_anomaly"][0]
+
+
+def test_short_history_and_missing_hour_are_not_scored():
+    matrix = np.full((3, HOURS), np.nan)
+    matrix[0, -10:] = 100.0               # 9 hours of history < min_samples
+    matrix[1, :-1] = 100.0                # No value in the scored hour
+    matrix[2, ::2] = 100.0                # Gaps are fine: 85 hours of history
+    matrix[2, -1] = 100.0
+    result = score_hour(matrix)
+    assert list(result["valid"]) == [False, False, True]
+    assert np.isnan(result["score"][:2]).all()
+    assert not result["is_anomaly"].any()
+
+
+def test_urls_are_scored_independently():
+    matrix = np.full((2, HOURS), 100.0)
+    matrix[1] *= 5
+    matrix[0, -1] = 500.0
+    result = score_hour(matrix)
+    assert list(result["is_anomaly"]) == [True, False]
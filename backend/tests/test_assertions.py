@@ -0,0 +1,88 @@
+# backend/tests/test_assertions.py
+import re
+
+import pytest
+
+from apps.monitoring.assertions import (
+    REGEX_OVERLAP_BYTES, BodyInspector, ContentHashAssertion, JsonPathAssertion, RegexAssertion,
+    build_assertions, validate_assertions
+)
+
+
+def run(assertions, *chunks) -> list:
+    inspector = BodyInspector(assertions)
+    for chunk in chunks:
+        if not inspector.feed(chunk):
+            break
+    return [(result.passed, result.message) for result in inspector.finish()]
+
+
+def test_regex_present_and_absent():
+    assert run([RegexAssertion("Welcome")], b"<h1>Welcome</h1>") == [(True, None)]
+    assert run([RegexAssertion("Welcome")], b"<h1>Hi</h1>") == [(False, "Pattern not found")]
+    assert run([RegexAssertion("error", expect="absent")], b"ok") == [(True, None)]
+    assert run([RegexAssertion("error", expect="absent")], b"an error") == [(False, "Pattern found")]
+
+
+def test_regex_matches_across_chunks():
+    assert run([RegexAssertion("Welcome")], b"x" * 10_000 + b"Wel", b"come") == [(True, None)]
+    assert REGEX_OVERLAP_BYTES >= len("Welcome")
+
+
+def test_inspector_stops_reading_once_decided():
+    inspector = BodyInspector([RegexAssertion("ok")])
+    assert not inspector.feed(b"ok")
+    assert inspector.bytes_read == 2
+
+
+def test_json_path_equals_and_exists():
+    body = b'{"status": "ok", "items": [{"id": 1}, {"id": 2}]}'
+    assert run([JsonPathAssertion("$.status", "ok")], body) == [(True, None)]
+    assert run([JsonPathAssertion("$.items[*].id", 2)], body[:30], body[30:]) == [(True, None)]
+    assert run([JsonPathAssertion("$.items[*].id")], body) == [(True, None)]
+    assert run([JsonPathAssertion("$.status", "down")], body) == [(False, "Expected 'down', got 'ok'")]
+    assert run([JsonPathAssertion("$.missing")], body) == [(False, "Path missing not found")]
+    [(passed, message)] = run([JsonPathAssertion("$.status", "ok")], b"<html>")
+    assert not passed and message.startswith("Invalid JSON")
+
+
+def test_content_hash_reports_changes():
+    first = ContentHashAssertion()
+    run([first], b"body")
+    assert first.changed is None
+    same, other = ContentHashAssertion(first.digest), ContentHashAssertion(first.digest)
+    run([same], b"bo", b"dy")
+    run([other], b"new body")
+    assert same.changed is False and other.changed is True
+
+
+@pytest.mark.parametrize("specs", [
+    [{"type": "regex", "pattern": "ok", "expect": "absent"}],
+    [{"type": "json_path", "path": "$.status", "equals": None}, {"type": "content_hash"}],
+    [],
+])
+def test_valid_specs(specs):
+    validate_assertions(specs)
+    assert len(build_assertions(specs)) == len(specs)
+
+
+@pytest.mark.parametrize("specs, message", [
+    ({"type": "regex"}, "must be a list"),
+    (["regex"], "must be an object"),
+    ([{"type": "jsonpath", "path": "$.a"}], "type must be one of"),
+    ([{"type": "regex"}], "pattern must be a non-empty string"),
+    ([{"type": "regex", "pattern": 5}], "pattern must be a non-empty string"),
+    ([{"type": "regex", "pattern": "("}], "not a valid regex"),
+    ([{"type": "regex", "pattern": "ok", "expect": "missing"}], "expect must be one of"),
+    ([{"type": "json_path", "path": "$.a", "equal": 1}], "unknown key(s) equal"),
+])
+def test_invalid_specs_are_rejected(specs, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        validate_assertions(specs)
+
+
+def test_invalid_stored_specs_are_skipped():
+    specs = [{"type": "regex", "pattern": 5}, {"type": "regex", "pattern": "("}, {"type": "json_path"},
+             {"type": "jsonpath"}, "regex", {"type": "regex", "pattern": "ok"}]
+    [assertion] = build_assertions(specs)
+    assert isinstance(assertion, RegexAssertion)
@@ -0,0 +1,97 @@
+# backend/tests/test_dashboard_batch.py
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from config.settings import settings
+from apps.auth.schemas import TokenData
+from apps.dashboard import services
+from apps.dashboard.schemas import BatchRequest
+from apps.dashboard.services import run_batch
+
+TOKEN = TokenData(sub="user@example.com", role="admin")
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.acquired = []
+
+    @asynccontextmanager
+    async def acquire(self, pool, readonly=False):
+        self.acquired.append((pool, readonly))
+        yield f"{pool} connection"
+
+
+@pytest.fixture
+def fake_resources(monkeypatch):
+    """Replaces the handlers with ones that record how they ran; returns the concurrency high-water mark."""
+    running = {"now": 0, "max": 0}
+
+    async def slow(conn, query, token_data):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return {"conn": conn, "user": token_data.sub}
+
+    async def missing(conn, query, token_data):
+        raise HTTPException(status_code=404, detail="Incident not found")
+
+    async def broken(conn, query, token_data):
+        raise RuntimeError("query failed")
+
+    db = FakeDatabase()
+    monkeypatch.setattr(services, "database", db)
+    monkeypatch.setattr(services, "RESOURCES", {
+        "me": (slow, None, False), "status": (slow, "analytics", True),
+        "incident": (missing, "analytics", True), "sla": (broken, "analytics", False),
+    })
+    return running, db
+
+
+def batch(queries: dict) -> dict:
+    return BatchRequest(queries=queries).queries
+
+
+def test_results_come_back_under_their_keys(fake_resources):
+    _, db = fake_resources
+    queries = batch({"b": {"resource": "status"}, "a": {"resource": "me"}})
+    results = asyncio.run(run_batch(queries, TOKEN))
+    assert list(results) == ["b", "a"]
+    assert results["b"] == {"status": 200, "body": {"conn": "analytics connection", "user": TOKEN.sub}}
+    assert results["a"] == {"status": 200, "body": {"conn": None, "user": TOKEN.sub}}
+    assert db.acquired == [("analytics", True)]  # "me" takes no connection from the batch
+
+
+def test_failing_sub_queries_only_fail_their_entry(fake_resources):
+    queries = batch({
+        "ok": {"resource": "status"},
+        "missing": {"resource": "incident", "incident_id": "00000000-0000-0000-0000-000000000001"},
+        "broken": {"resource": "sla"},
+    })
+    results = asyncio.run(run_batch(queries, TOKEN))
+    assert results["ok"]["status"] == 200
+    assert results["missing"] == {"status": 404, "detail": "Incident not found"}
+    assert results["broken"] == {"status": 500, "detail": "Internal server error"}
+
+
+def test_concurrency_is_bounded(fake_resources, monkeypatch):
+    running, _ = fake_resources
+    monkeypatch.setattr(settings, "BATCH_CONCURRENCY", 2)
+    queries = batch({f"q{n}": {"resource": "status"} for n in range(6)})
+    results = asyncio.run(run_batch(queries, TOKEN))
+    assert all(result["status"] == 200 for result in results.values())
+    assert running["max"] == 2
+
+
+def test_sub_queries_are_validated_per_resource():
+    with pytest.raises(ValidationError):
+        BatchRequest(queries={"x": {"resource": "unknown"}})
+    with pytest.raises(ValidationError):
+        BatchRequest(queries={"x": {"resource": "checks"}})  # url_id is required
+    with pytest.raises(ValidationError):
+        BatchRequest(queries={})
+    assert BatchRequest(queries={"x": {"resource": "checks", "url_id": 1}}).queries["x"].layout == "columnar"
@@ -0,0 +1,71 @@
+# backend/tests/test_dns_check.py
+import struct
+
+import pytest
+
+from plugins.dns_check import HEADER, RECORD_TYPES, build_query, parse_response
+
+QUESTION_OFFSET = HEADER.size  # Answers point back at the question name (compression pointer 0xC00C)
+NAME_POINTER = struct.pack(">H", 0xC000 | QUESTION_OFFSET)
+
+
+def answer(record_type: int, rdata: bytes) -> bytes:
+    return NAME_POINTER + struct.pack(">HHIH", record_type, 1, 300, len(rdata)) + rdata
+
+
+def labels(name: str) -> bytes:
+    return b"".join(bytes([len(label)]) + label.encode() for label in name.split(".")) + b"\0"
+
+
+def response(name: str, record_type: int, answers, rcode: int = 0) -> bytes:
+    query = build_query(0x1234, name, record_type)
+    _, _, qdcount, _, _, _ = HEADER.unpack_from(query)
+    return HEADER.pack(0x1234, 0x8180 | rcode, qdcount, len(answers), 0, 0) + query[HEADER.size:] + b"".join(answers)
+
+
+def test_build_query_encodes_the_question():
+    query = build_query(7, "example.com.", RECORD_TYPES["MX"])
+    assert HEADER.unpack_from(query) == (7, 0x0100, 1, 0, 0, 0)
+    assert query[HEADER.size:] == labels("example.com") + struct.pack(">HH", 15, 1)
+
+
+def test_a_and_aaaa_answers():
+    message = response("example.com", 1, [answer(1, bytes([93, 184, 216, 34])), answer(1, bytes([10, 0, 0, 1]))])
+    assert parse_response(message, 1) == (0, ["93.184.216.34", "10.0.0.1"])
+    message = response("example.com", 28, [answer(28, bytes(15) + b"\x01")])
+    assert parse_response(message, 28) == (0, ["::1"])
+
+
+def test_other_record_types_are_skipped():
+    cname = answer(5, labels("target.example.net"))
+    message = response("www.example.com", 1, [cname, answer(1, bytes([192, 0, 2, 1]))])
+    assert parse_response(message, 1) == (0, ["192.0.2.1"])
+    assert parse_response(message, 5) == (0, ["target.example.net"])
+
+
+def test_mx_answer_is_the_exchange_host():
+    mx = answer(15, struct.pack(">H", 10) + b"\x04mail" + NAME_POINTER)  # mail.<question name>
+    assert parse_response(response("example.com", 15, [mx]), 15) == (0, ["mail.example.com"])
+
+
+def test_txt_answer_joins_strings():
+    txt = answer(16, b"\x05v=spf" + b"\x05 -all")
+    assert parse_response(response("example.com", 16, [txt]), 16) == (0, ["v=spf -all"])
+
+
+def test_rcode_is_returned():
+    assert parse_response(response("missing.example.com", 1, [], rcode=3), 1) == (3, [])
+
+
+def test_compression_loop_is_rejected():
+    message = bytearray(response("example.com", 1, [answer(1, bytes(4))]))
+    message[QUESTION_OFFSET:QUESTION_OFFSET + 2] = NAME_POINTER  # Question name points at itself
+    with pytest.raises(ValueError):
+        parse_response(bytes(message), 1)
+
+
+def test_truncated_message_raises():
+    # CheckType.run() turns whatever parse_response raises on a malformed reply into a check_error result
+    message = response("example.com", 1, [answer(1, bytes(4))])
+    with pytest.raises((IndexError, struct.error)):
+        parse_response(message[:-12], 1)
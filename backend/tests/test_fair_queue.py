@@ -0,0 +1,69 @@
+# backend/tests/test_fair_queue.py
+import asyncio
+
+from apps.monitoring.tenants import FairQueue
+
+
+def drain(queue: FairQueue, count: int) -> list:
+    async def get_all():
+        return [await queue.get() for _ in range(count)]
+    return asyncio.run(get_all())
+
+
+def test_backlogged_tenant_does_not_delay_others():
+    queue = FairQueue()
+    for n in range(1000):
+        queue.put("bulk", ("bulk", n))
+    queue.put("small", ("small", 0))
+    served = drain(queue, 3)
+    assert ("small", 0) in served
+
+
+def test_tenants_alternate():
+    queue = FairQueue()
+    for n in range(3):
+        queue.put("a", ("a", n))
+    for n in range(3):
+        queue.put("b", ("b", n))
+    assert [tenant for tenant, _ in drain(queue, 6)] == ["a", "b", "a", "b", "a", "b"]
+
+
+def test_fifo_within_a_tenant():
+    queue = FairQueue()
+    for n in range(5):
+        queue.put("a", n)
+    assert drain(queue, 5) == [0, 1, 2, 3, 4]
+
+
+def test_weight_gives_a_proportional_share():
+    queue = FairQueue()
+    for n in range(30):
+        queue.put("heavy", "heavy", weight=2.0)
+        queue.put("light", "light", weight=1.0)
+    served = drain(queue, 30)
+    assert served.count("heavy") == 20
+    assert served.count("light") == 10
+
+
+def test_idle_tenant_gets_no_credit_for_the_past():
+    queue = FairQueue()
+    for n in range(10):
+        queue.put("a", "a")
+    drain(queue, 10)
+    for n in range(5):
+        queue.put("a", "a")
+        queue.put("b", "b")  # Idle until now: starts at the current virtual time, not before "a"
+    served = drain(queue, 4)
+    assert served.count("a") == 2 and served.count("b") == 2
+
+
+def test_get_waits_for_put():
+    async def scenario():
+        queue = FairQueue()
+        waiter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        queue.put("a", "item")
+        return await asyncio.wait_for(waiter, timeout=1)
+    assert asyncio.run(scenario()) == "item"
+    assert len(FairQueue()) == 0
@@ -0,0 +1,115 @@
+# backend/tests/test_http_check.py
+import asyncio
+import socket
+
+import aiohttp
+from aiohttp import web
+
+from apps.monitoring.engine import HttpCheck, ProbeEngine, ProbeTarget
+from apps.monitoring.tls import TLSAwareResponse, connect_timing_trace
+
+
+async def ok(request):
+    return web.json_response({"status": "ok"})
+
+
+async def down(request):
+    return web.Response(status=503, text="maintenance")
+
+
+def redirect(location: str):
+    async def handler(request):
+        raise web.HTTPFound(location)
+    return handler
+
+
+async def slow(request):
+    await asyncio.sleep(2)
+    return web.Response(text="late")
+
+
+async def endless(request):
+    response = web.StreamResponse()
+    await response.prepare(request)
+    await response.write(b'{"status": "ok", "padding": "')
+    while True:  # Only stops when the client drops the connection
+        await response.write(b"x" * 65536)
+        await asyncio.sleep(0)
+
+
+def app() -> web.Application:
+    application = web.Application()
+    application.router.add_get("/ok", ok)
+    application.router.add_get("/down", down)
+    application.router.add_get("/moved", redirect("/ok"))
+    application.router.add_get("/moved-down", redirect("/down"))
+    application.router.add_get("/slow", slow)
+    application.router.add_get("/endless", endless)
+    return application
+
+
+def unused_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def probe(path: str, assertions=None, timeout_s: float = 0.5, base=None, max_body_bytes: int = 1024 * 1024) -> tuple:
+    """Runs one HTTP check against the local test app; returns the check_results row."""
+    async def scenario():
+        runner = web.AppRunner(app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        engine = ProbeEngine(None, None, timeout_s=timeout_s, max_body_bytes=max_body_bytes)
+        engine.check_types = {"http": HttpCheck(engine)}
+        engine.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout_s),
+                                               trace_configs=[connect_timing_trace()], response_class=TLSAwareResponse)
+        target = ProbeTarget(1, (base or f"http://127.0.0.1:{port}") + path, 60.0, assertions=assertions or [],
+                             resolved_ip="127.0.0.1")  # Already known: nothing to store
+        try:
+            return await engine.check(target)
+        finally:
+            await engine.session.close()
+            await runner.cleanup()
+    return asyncio.run(scenario())
+
+
+def test_success():
+    row = probe("/ok")
+    assert (row[2], row[5], row[6]) == (200, "success", None)
+    assert row[3] > 0 and row[8] is not None  # Response and connect time
+
+
+def test_error_status_is_http_error():
+    row = probe("/down")
+    assert (row[2], row[5], row[6]) == (503, "http_error", "HTTP 503 Service Unavailable")
+
+
+def test_redirects_are_followed():
+    assert probe("/moved")[2:6:3] == (200, "success")
+    assert probe("/moved-down")[5] == "http_error"
+
+
+def test_timeout():
+    row = probe("/slow", timeout_s=0.2)
+    assert row[5] == "timeout" and row[2] is None
+
+
+def test_connection_refused():
+    row = probe("/", base=f"http://127.0.0.1:{unused_port()}")
+    assert row[5] == "connection_failed"
+
+
+def test_assertions():
+    row = probe("/ok", assertions=[{"type": "json_path", "path": "$.status", "equals": "ok"}])
+    assert row[5] == "success"
+    row = probe("/ok", assertions=[{"type": "regex", "pattern": "healthy"}])
+    assert (row[5], row[6]) == ("assertion_failed", "regex:healthy: Pattern not found")
+
+
+def test_reading_stops_once_assertions_are_decided():
+    # Without the early stop, the endless body would be read until the timeout
+    row = probe("/endless", assertions=[{"type": "regex", "pattern": "ok"}], timeout_s=2, max_body_bytes=2 ** 40)
+    assert row[5] == "success" and row[3] < 2000
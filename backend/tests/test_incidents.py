@@ -0,0 +1,138 @@
+# backend/tests/test_incidents.py
+from datetime import datetime, timedelta, timezone
+
+from apps.monitoring.incidents import OutageCorrelator, correlation_keys
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+URLS = {
+    1: ("https://a.example.com/", "203.0.113.10"),
+    2: ("https://b.example.com/", "203.0.113.10"),     # Same IP as 1
+    3: ("https://c.example.com/", "203.0.113.99"),     # Same /24 as 1 and 2
+    4: ("https://d.example.org/", "198.51.100.7"),     # Unrelated
+    5: ("https://a.example.com/health", None),         # Same host as 1, never connected
+    6: ("https://e.example.net/", "192.0.2.5"),        # Unrelated
+}
+
+
+def correlator(window_s: float = 60.0, recovery_s: float = 120.0) -> OutageCorrelator:
+    c = OutageCorrelator(None, window_s=window_s, recovery_s=recovery_s)
+    c.urls = {url_id: url for url_id, (url, _) in URLS.items()}
+    c.keys = {url_id: correlation_keys(url, ip) for url_id, (url, ip) in URLS.items()}
+    return c
+
+
+def check(seconds: float, url_id: int, result: str = "timeout", status_code=None) -> tuple:
+    return (T0 + timedelta(seconds=seconds), url_id, status_code, 10.0, None, result, None, None, None)
+
+
+def test_correlation_keys():
+    assert correlation_keys("https://a.example.com:8443/x", "203.0.113.10") == \
+        ("host:a.example.com", "ip:203.0.113.10", "network:203.0.113.0/24")
+    assert correlation_keys("https://a.example.com/", "2001:db8::1", ipv6_prefix=48) == \
+        ("host:a.example.com", "ip:2001:db8::1", "network:2001:db8::/48")
+    assert correlation_keys("https://a.example.com/", "not an ip") == ("host:a.example.com",)
+
+
+def test_failures_sharing_infrastructure_form_one_incident():
+    c = correlator()
+    c.observe([check(0, 1), check(5, 2), check(10, 3), check(15, 5)])
+    assert c.opened == 1 and c.correlated == 3
+    [incident] = c._open.values()
+    assert set(incident.members) == {1, 2, 3, 5}
+    assert incident.root(c.urls) == ("network", "203.0.113.0/24")  # Shared by 3 URLs; host and IP by 2
+
+
+def test_unrelated_failure_opens_its_own_incident():
+    c = correlator()
+    c.observe([check(0, 1), check(1, 4)])
+    assert c.opened == 2
+    assert {c._by_url[1].id, c._by_url[4].id} == set(c._open)
+    assert c._by_url[4].root(c.urls) == ("url", URLS[4][0])
+
+
+def test_failure_outside_the_window_opens_a_new_incident():
+    c = correlator(window_s=60)
+    c.observe([check(0, 1), check(61, 2)])
+    assert c.opened == 2
+
+
+def test_repeated_failures_of_a_member_do_not_extend_the_window():
+    c = correlator(window_s=60)
+    c.observe([check(minute * 60, 1) for minute in range(60)])  # URL 1 stays down for an hour
+    c.observe([check(3600, 2)])                                   # Same IP, an hour later
+    assert c.opened == 2
+    assert c._by_url[1] is not c._by_url[2]
+    assert c._by_url[1].last_failure_at == T0 + timedelta(minutes=59)
+
+
+def test_error_status_is_a_failure():
+    c = correlator()
+    c.observe([check(0, 1, result="success", status_code=503)])
+    assert c.failures == 1 and len(c._open) == 1
+    c.observe([check(0, 4, result="success", status_code=200)])
+    assert c.failures == 1
+
+
+def test_incident_resolves_after_all_members_recover():
+    c = correlator(recovery_s=120)
+    c.observe([check(0, 1), check(5, 2)])
+    [incident] = c._open.values()
+    c.observe([check(60, 1, result="success", status_code=200)])
+    assert incident.failing == {2} and incident.quiet_since is None
+    c.observe([check(65, 2, result="success", status_code=200)])
+    assert incident.quiet_since == T0 + timedelta(seconds=65)
+    c._resolve_quiet(T0 + timedelta(seconds=100))
+    assert incident.resolved_at is None
+    c._resolve_quiet(T0 + timedelta(seconds=200))
+    assert incident.resolved_at == T0 + timedelta(seconds=65)
+    assert not c._open and not c._by_url and not c._by_key
+
+
+def test_member_failing_again_reopens_its_failing_state():
+    c = correlator()
+    c.observe([check(0, 1), check(60, 1, result="success"), check(90, 1)])
+    [incident] = c._open.values()
+    assert incident.failing == {1} and incident.quiet_since is None
+    assert c.opened == 1
+
+
+def test_url_linking_two_incidents_merges_them():
+    c = correlator()
+    c.observe([check(0, 2), check(1, 5)])  # 2: ip/network of 1; 5: host of 1 -> two incidents
+    assert len(c._open) == 2
+    c.observe([check(2, 1)])                # 1 shares keys with both
+    assert c.merges == 1 and len(c._open) == 1
+    [incident] = c._open.values()
+    assert set(incident.members) == {1, 2, 5}
+    assert all(c._by_url[url_id] is incident for url_id in (1, 2, 5))
+    assert all(value is incident for value in c._by_key.values())
+    assert incident.started_at == T0
+
+
+def test_merge_keeps_the_larger_incident_and_combines_state():
+    c = correlator()
+    c.observe([check(0, 1), check(1, 2), check(2, 4)])
+    large, small = c._by_url[1], c._by_url[4]
+    large.persisted = small.persisted = True
+    small.members[4] = T0 - timedelta(seconds=30)
+    small.started_at = T0 - timedelta(seconds=30)
+    survivor = c._merge(small, large)
+    assert survivor is large
+    assert set(survivor.members) == {1, 2, 4} and survivor.failing == {1, 2, 4}
+    assert survivor.started_at == T0 - timedelta(seconds=30)
+    assert survivor.key_counts["host:d.example.org"] == 1
+    assert small.id not in c._open
+    assert c._merged == [(small.id, large.id)]
+
+
+def test_merge_chain_moves_rows_to_the_final_survivor():
+    c = correlator()
+    c.observe([check(0, 1), check(1, 4), check(2, 6)])
+    a, b, final = c._by_url[1], c._by_url[4], c._by_url[6]
+    for incident in (a, b, final):
+        incident.persisted = True
+    final.members.update({100: T0, 101: T0})  # Largest incident
+    assert c._merge(a, b) is a                 # Equal size: the first one survives
+    assert c._merge(a, final) is final
+    assert sorted(c._merged) == sorted([(b.id, final.id), (a.id, final.id)])
+    assert list(c._open) == [final.id]
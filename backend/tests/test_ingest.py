@@ -0,0 +1,150 @@
+# backend/tests/test_ingest.py
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from apps.telegraf_mgmt.ingest import IngestError, INTEGER_MAX, KnownUrls, parse_line_protocol, to_check_rows
+
+RECEIVED_NS = 1_700_000_000_000_000_000
+URL_IDS = {"https://example.com": [7]}
+
+
+def metric(fields, tags=None, timestamp_ns=None, measurement="http_response"):
+    return measurement, {"server": "https://example.com", **(tags or {})}, fields, timestamp_ns
+
+
+# --- parse_line_protocol ---
+
+def test_parses_tags_fields_and_timestamp():
+    line = 'http_response,server=https://example.com,result=success http_response_code=200i,response_time=0.25,' \
+           'ok=true,note="a b" 1700000000000000000'
+    measurement, tags, fields, timestamp_ns = parse_line_protocol(line)
+    assert measurement == "http_response"
+    assert tags == {"server": "https://example.com", "result": "success"}
+    assert fields == {"http_response_code": 200, "response_time": 0.25, "ok": True, "note": "a b"}
+    assert timestamp_ns == 1_700_000_000_000_000_000
+
+
+def test_unescapes_keys_and_tag_values():
+    measurement, tags, fields, timestamp_ns = parse_line_protocol(r"my\ metric,host=a\,b\ c value=1")
+    assert measurement == "my metric"
+    assert tags == {"host": "a,b c"}
+    assert fields == {"value": 1.0}
+    assert timestamp_ns is None
+
+
+def test_quoted_field_keeps_separators():
+    _, _, fields, _ = parse_line_protocol(r'm f="x, y=\"z\"",g=2u')
+    assert fields == {"f": 'x, y="z"', "g": 2}
+
+
+@pytest.mark.parametrize("line", ["", "   ", "# comment"])
+def test_blank_lines_and_comments_are_skipped(line):
+    assert parse_line_protocol(line) is None
+
+
+@pytest.mark.parametrize("line", ["just_a_measurement", "m a=1 2 3", "m a=notanumber", "m a=1 notatimestamp"])
+def test_malformed_lines_raise(line):
+    with pytest.raises(IngestError):
+        parse_line_protocol(line)
+
+
+# --- to_check_rows ---
+
+def test_maps_http_response_to_check_row():
+    rows = to_check_rows(metric({"http_response_code": 200, "response_time": 0.25, "content_length": 512},
+                                {"result": "success"}, timestamp_ns=RECEIVED_NS - 10**9), URL_IDS, RECEIVED_NS)
+    assert rows == [(datetime.fromtimestamp(1_699_999_999, tz=timezone.utc), 7, 200, 250.0, 512, "success",
+                     None, None, None)]
+
+
+def test_uses_receive_time_without_timestamp():
+    [row] = to_check_rows(metric({"http_response_code": 200}), URL_IDS, RECEIVED_NS)
+    assert row[0] == datetime.fromtimestamp(RECEIVED_NS / 1e9, tz=timezone.utc)
+    assert row[5] == "unknown"
+
+
+def test_one_row_per_owner_of_the_url():
+    rows = to_check_rows(metric({"http_response_code": 200}), {"https://example.com": [7, 9]}, RECEIVED_NS)
+    assert [row[1] for row in rows] == [7, 9]
+
+
+@pytest.mark.parametrize("m", [
+    metric({"http_response_code": 200}, measurement="cpu"),
+    ("http_response", {"server": "https://unknown.example.com"}, {"http_response_code": 200}, None),
+    metric({"http_response_code": "abc"}),
+    metric({"response_time": float("nan")}),
+    metric({"response_time": float("inf")}),
+    metric({"content_length": [1]}),
+    metric({"http_response_code": 200}, timestamp_ns=10**30),
+])
+def test_skips_other_unknown_and_malformed_metrics(m):
+    assert to_check_rows(m, URL_IDS, RECEIVED_NS) == []
+
+
+def test_out_of_range_values_never_reach_copy():
+    [row] = to_check_rows(metric({"http_response_code": 70000, "response_time": -1.0, "content_length": 2 ** 40}),
+                          URL_IDS, RECEIVED_NS)
+    assert row[2] is None
+    assert row[3] is None
+    assert row[4] == INTEGER_MAX
+
+
+def test_error_status_is_not_success():
+    [row] = to_check_rows(metric({"http_response_code": 503}, {"result": "success"}), URL_IDS, RECEIVED_NS)
+    assert row[5] == "http_error"
+    [row] = to_check_rows(metric({"http_response_code": 301}, {"result": "success"}), URL_IDS, RECEIVED_NS)
+    assert row[5] == "success"
+
+
+class FakeUrlDatabase:
+    """Answers the queries of KnownUrls._load: monitored URLs, no tenant quota overrides."""
+
+    def __init__(self):
+        self.connects = 0
+        self.down = False
+        self.urls = [{"id": 7, "url": "https://example.com", "owner_id": None}]
+
+    @asynccontextmanager
+    async def connect(self):
+        self.connects += 1
+        await asyncio.sleep(0.01)
+        if self.down:
+            raise ConnectionRefusedError("database down")
+        yield self
+
+    async def fetch(self, query):
+        return self.urls if "monitored_urls" in query else []
+
+
+def test_known_urls_only_connect_to_refresh():
+    async def scenario():
+        db = FakeUrlDatabase()
+        urls = KnownUrls(db.connect, ttl_s=60)
+        maps = await asyncio.gather(*(urls.get() for _ in range(10)))  # Concurrent first requests
+        assert db.connects == 1 and all(m == {"https://example.com": [7]} for m in maps)
+        await urls.get()
+        assert db.connects == 1  # Fresh: served from memory
+        urls._refresh_at = 0.0    # Stale
+        db.urls.append({"id": 8, "url": "https://example.org", "owner_id": None})
+        assert "https://example.org" in await urls.get() and db.connects == 2
+    asyncio.run(scenario())
+
+
+def test_known_urls_serve_the_last_map_while_the_database_is_down():
+    async def scenario():
+        db = FakeUrlDatabase()
+        urls = KnownUrls(db.connect, ttl_s=60, retry_s=60)
+        await urls.get()
+        db.down = True
+        urls._refresh_at = 0.0
+        assert await urls.get() == {"https://example.com": [7]}
+        assert await urls.get() == {"https://example.com": [7]}
+        assert db.connects == 2  # The failed refresh is not retried on every request
+
+        fresh = KnownUrls(db.connect)
+        with pytest.raises(ConnectionRefusedError):
+            await fresh.get()  # Nothing to fall back on
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+# backend/tests/test_rate_limit.py
+import pytest
+
+from apps.auth.rate_limit import SlidingWindowLimiter
+
+WINDOW_S = 60.0
+START = 600 * WINDOW_S  # Start of a window (windows are aligned to the epoch)
+
+
+def hits(limiter: SlidingWindowLimiter, count: int, now: float, key: str = "k"):
+    for _ in range(count):
+        limiter.hit(key, now)
+
+
+def test_allows_up_to_limit():
+    limiter = SlidingWindowLimiter("test", limit=3, window_s=WINDOW_S)
+    for _ in range(3):
+        assert limiter.retry_after("k", START + 1) == 0.0
+        limiter.hit("k", START + 1)
+    assert limiter.retry_after("k", START + 1) > 0
+
+
+def test_full_current_window_waits_for_next_window_and_slide():
+    limiter = SlidingWindowLimiter("test", limit=4, window_s=WINDOW_S)
+    hits(limiter, 4, START + 15)
+    # Rest of this window (45 s), then a quarter of the next one, until 3 of 4 hits have slid out
+    assert limiter.retry_after("k", START + 15) == pytest.approx(45.0 + 15.0)
+
+
+def test_previous_window_slides_out():
+    limiter = SlidingWindowLimiter("test", limit=4, window_s=WINDOW_S)
+    hits(limiter, 4, START + 30)
+    now = START + WINDOW_S + 10  # Estimate: 4 * 50/60 = 3.33 > 3 allowed
+    wait = limiter.retry_after("k", now)
+    assert wait == pytest.approx(WINDOW_S * (1 - 3 / 4) - 10)
+    assert limiter.retry_after("k", now + wait) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_is_consistent_with_the_estimate_after_waiting():
+    limiter = SlidingWindowLimiter("test", limit=10, window_s=WINDOW_S)
+    hits(limiter, 10, START + 5)
+    hits(limiter, 3, START + WINDOW_S + 5)
+    now = START + WINDOW_S + 20
+    wait = limiter.retry_after("k", now)
+    assert wait > 0
+    limiter.hit("k", now + wait)  # Allowed once the wait is over
+    assert limiter.retry_after("k", now + wait + 0.001) > 0
+
+
+def test_windows_two_back_do_not_count():
+    limiter = SlidingWindowLimiter("test", limit=2, window_s=WINDOW_S)
+    hits(limiter, 2, START)
+    assert limiter.retry_after("k", START + 2 * WINDOW_S) == 0.0
+
+
+def test_keys_are_independent():
+    limiter = SlidingWindowLimiter("test", limit=1, window_s=WINDOW_S)
+    limiter.hit("a", START)
+    assert limiter.retry_after("a", START) > 0
+    assert limiter.retry_after("b", START) == 0.0
+
+
+def test_disabled_limiter_never_waits():
+    limiter = SlidingWindowLimiter("test", limit=0, window_s=WINDOW_S)
+    hits(limiter, 100, START)
+    assert limiter.retry_after("k", START) == 0.0
+    assert limiter.pending == {}
@@ -0,0 +1,78 @@
+# backend/tests/test_responses.py
+import asyncio
+import decimal
+import gzip
+import uuid
+
+import brotli
+import orjson
+import pytest
+from fastapi import Request
+
+from config.settings import settings
+from utils import responses
+from utils.responses import accepted_encodings, choose_encoding, dumps, json_response, records_to_columns
+
+
+def request(accept_encoding=None) -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def respond(accept_encoding, content):
+    return asyncio.run(json_response(request(accept_encoding), content))
+
+
+LARGE = {"values": list(range(settings.RESPONSE_COMPRESSION_MIN_BYTES))}
+
+
+def test_accepted_encodings_parses_q_values():
+    assert accepted_encodings("gzip;q=0.5, BR, identity;q=x, ") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+    assert accepted_encodings(None) == {}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),            # Tie: br wins
+    ("gzip;q=1, br;q=0.5", "gzip"),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),                  # Explicit refusal overrides the wildcard
+    ("identity", None),
+    ("gzip;q=0, br;q=0", None),
+    (None, None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_gzip_only_without_brotli(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    assert choose_encoding("br, gzip;q=0.1") == "gzip"
+    assert choose_encoding("br") is None
+
+
+def test_large_bodies_are_compressed_as_negotiated():
+    response = respond("br", LARGE)
+    assert response.headers["content-encoding"] == "br" and response.headers["vary"] == "Accept-Encoding"
+    assert orjson.loads(brotli.decompress(response.body)) == LARGE
+    response = respond("gzip", LARGE)
+    assert orjson.loads(gzip.decompress(response.body)) == LARGE
+
+
+def test_small_or_unaccepted_bodies_are_sent_as_is():
+    for response in (respond("gzip, br", {"ok": True}), respond(None, LARGE)):
+        assert "content-encoding" not in response.headers
+        assert response.media_type == "application/json"
+    assert respond(None, LARGE).body == orjson.dumps(LARGE)
+
+
+def test_dumps_handles_decimal_uuid_and_int_keys():
+    value = uuid.UUID(int=1)
+    assert orjson.loads(dumps({1: decimal.Decimal("1.5"), "id": value})) == {"1": 1.5, "id": str(value)}
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
+
+
+def test_records_to_columns():
+    assert records_to_columns([(1, "a"), (2, "b")], ["id", "name"]) == \
+        {"columns": ["id", "name"], "length": 2, "data": {"id": (1, 2), "name": ("a", "b")}}
+    assert records_to_columns([], ["id"]) == {"columns": ["id"], "length": 0, "data": {"id": []}}
@@ -0,0 +1,116 @@
+# backend/tests/test_runs.py
+from datetime import datetime, timedelta, timezone
+
+from apps.monitoring.runs import MAX_RUN_SECONDS, RUN_COLUMNS, RunLengthEncoder, check_samples_sql
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def check(minute: float, url_id: int = 1, response_time_ms: float = 100.0, status_code: int = 200,
+          result: str = "success", content_changed=None) -> tuple:
+    return (T0 + timedelta(minutes=minute), url_id, status_code, response_time_ms, 512, result, None,
+            content_changed, 10.0)
+
+
+# --- RunLengthEncoder.encode ---
+
+def test_stable_checks_are_folded_into_a_run():
+    encoder = RunLengthEncoder(tolerance_ms=50.0)
+    rows = [check(m, response_time_ms=100.0 + m) for m in range(5)]
+    assert encoder.encode(rows) == rows[:1]
+    assert encoder.folded_rows == 4
+    [run] = encoder._runs.values()
+    assert (run.count, run.min_ms, run.max_ms, run.sum_ms) == (4, 101.0, 104.0, 410.0)
+    assert (run.start_time, run.end_time) == (rows[1][0], rows[4][0])
+
+
+def test_changes_are_stored_in_full():
+    encoder = RunLengthEncoder(tolerance_ms=50.0, tolerance_ratio=0.0)
+    rows = [
+        check(0),
+        check(1, response_time_ms=300.0),          # Outside the latency band
+        check(2, response_time_ms=300.0, status_code=503, result="http_error"),
+        check(3, response_time_ms=300.0, status_code=503, result="http_error", content_changed=True),
+        check(4, response_time_ms=None),            # No latency (e.g. a timeout)
+    ]
+    assert encoder.encode(rows) == rows
+    assert encoder.folded_rows == 0
+
+
+def test_tolerance_ratio_widens_the_band_for_slow_urls():
+    encoder = RunLengthEncoder(tolerance_ms=50.0, tolerance_ratio=0.25)
+    assert encoder.encode([check(0, response_time_ms=1000.0), check(1, response_time_ms=1200.0)]) == \
+        [check(0, response_time_ms=1000.0)]
+
+
+def test_gap_in_monitoring_ends_the_run():
+    encoder = RunLengthEncoder()
+    rows = [check(0), check(1), check(2), check(10)]  # Step of 1 minute, then 8 minutes without a check
+    assert encoder.encode(rows) == [rows[0], rows[3]]
+    assert len(encoder._closed) == 1
+
+
+def test_runs_end_after_max_run_seconds():
+    encoder = RunLengthEncoder()
+    minutes = range(0, MAX_RUN_SECONDS // 60 + 2)
+    stored = encoder.encode([check(m) for m in minutes])
+    assert [row[0] for row in stored] == [T0, T0 + timedelta(seconds=MAX_RUN_SECONDS + 60)]
+
+
+def test_out_of_order_checks_are_stored():
+    encoder = RunLengthEncoder()
+    assert encoder.encode([check(5), check(4)]) == [check(5), check(4)]
+
+
+def test_urls_have_separate_runs():
+    encoder = RunLengthEncoder()
+    rows = [check(m, url_id=url_id) for m in range(3) for url_id in (1, 2)]
+    assert encoder.encode(rows) == [check(0, url_id=1), check(0, url_id=2)]
+    assert sorted(run.count for run in encoder._runs.values()) == [2, 2]
+
+
+# --- check_samples_sql (database) ---
+
+async def _samples(conn, url_id: int, start: datetime, end: datetime) -> list:
+    return await conn.fetch(
+        f"SELECT * FROM ({check_samples_sql('url_id = $1', '$2', '$3')}) s ORDER BY time", url_id, start, end
+    )
+
+
+def test_samples_expand_runs_evenly(in_transaction):
+    async def body(conn):
+        url_id = await conn.fetchval("INSERT INTO monitored_urls (url) VALUES ('https://runs.test/') RETURNING id")
+        await conn.execute(
+            "INSERT INTO check_results (time, url_id, status_code, response_time_ms, content_length, result) "
+            "VALUES ($1, $2, 200, 90, 512, 'success')", T0, url_id)
+        await conn.execute(
+            f"INSERT INTO check_runs ({', '.join(RUN_COLUMNS)}) VALUES ($1, $2, $3, 5, 200, 'success', NULL, 512, 80, 120, 500)",
+            url_id, T0 + timedelta(minutes=1), T0 + timedelta(minutes=5))
+        return await _samples(conn, url_id, T0, T0 + timedelta(hours=1))
+
+    samples = in_transaction(body)
+    assert [s["time"] for s in samples] == [T0 + timedelta(minutes=m) for m in range(6)]
+    assert [s["response_time_ms"] for s in samples] == [90.0] + [100.0] * 5
+    assert {(s["status_code"], s["result"], s["content_length"]) for s in samples} == {(200, "success", 512)}
+
+
+def test_samples_are_clipped_to_the_period(in_transaction):
+    async def body(conn):
+        url_id = await conn.fetchval("INSERT INTO monitored_urls (url) VALUES ('https://runs.test/') RETURNING id")
+        await conn.execute(
+            f"INSERT INTO check_runs ({', '.join(RUN_COLUMNS)}) VALUES ($1, $2, $3, 5, 200, 'success', NULL, 512, 80, 120, 500)",
+            url_id, T0, T0 + timedelta(minutes=4))
+        return await _samples(conn, url_id, T0 + timedelta(minutes=1), T0 + timedelta(minutes=3))
+
+    assert [s["time"] for s in in_transaction(body)] == [T0 + timedelta(minutes=1), T0 + timedelta(minutes=2)]
+
+
+def test_single_check_run(in_transaction):
+    async def body(conn):
+        url_id = await conn.fetchval("INSERT INTO monitored_urls (url) VALUES ('https://runs.test/') RETURNING id")
+        await conn.execute(
+            f"INSERT INTO check_runs ({', '.join(RUN_COLUMNS)}) VALUES ($1, $2, $2, 1, 200, 'success', NULL, 512, 80, 80, 80)",
+            url_id, T0)
+        return await _samples(conn, url_id, T0, T0 + timedelta(hours=1))
+
+    assert [(s["time"], s["response_time_ms"]) for s in in_transaction(body)] == [(T0, 80.0)]
@@ -0,0 +1,113 @@
+# backend/tests/test_sla.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from apps.monitoring.runs import RUN_COLUMNS
+from apps.monitoring.sla import SLA_COMPUTE_SQL, parse_month
+
+# Far from real data, so maintenance windows for all URLs in the database do not overlap
+T0 = datetime(2001, 1, 1, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+GAP_S = 180.0  # Three missed checks at one check a minute
+
+
+async def add_url(conn) -> int:
+    return await conn.fetchval("INSERT INTO monitored_urls (url) VALUES ('https://sla.test/') RETURNING id")
+
+
+async def add_checks(conn, url_id: int, minutes, status_code=200, result="success"):
+    await conn.copy_records_to_table(
+        "check_results", columns=["time", "url_id", "status_code", "response_time_ms", "result"],
+        records=[(T0 + timedelta(minutes=m), url_id, status_code, 50.0, result) for m in minutes],
+    )
+
+
+async def sla(conn, url_id: int, start=T0, end=T0 + 2 * HOUR) -> dict:
+    [row] = await conn.fetch(SLA_COMPUTE_SQL, start, end, [url_id], [GAP_S])
+    return dict(row)
+
+
+def test_all_up(in_transaction):
+    async def body(conn):
+        url_id = await add_url(conn)
+        await add_checks(conn, url_id, range(120))
+        return await sla(conn, url_id)
+
+    report = in_transaction(body)
+    assert report["up_seconds"] == 7200 and report["down_seconds"] == 0
+    assert report["uptime_pct"] == 100 and report["incidents"] == 0 and report["mttr_seconds"] is None
+
+
+def test_failures_and_error_statuses_are_down(in_transaction):
+    async def body(conn):
+        url_id = await add_url(conn)
+        await add_checks(conn, url_id, range(0, 30))
+        await add_checks(conn, url_id, range(30, 45), result="timeout", status_code=None)
+        await add_checks(conn, url_id, range(45, 60), status_code=503)  # Stored as success by older writers
+        await add_checks(conn, url_id, range(60, 90), status_code=503, result="http_error")
+        await add_checks(conn, url_id, range(90, 120))
+        return await sla(conn, url_id)
+
+    report = in_transaction(body)
+    assert report["down_seconds"] == 3600 and report["up_seconds"] == 3600
+    assert report["uptime_pct"] == 50
+    assert report["incidents"] == 1 and report["mttr_seconds"] == 3600
+    [downtime] = report["downtime"]
+    assert (downtime.lower, downtime.upper) == (T0 + timedelta(minutes=30), T0 + timedelta(minutes=90))
+
+
+def test_gap_in_monitoring_is_no_data(in_transaction):
+    async def body(conn):
+        url_id = await add_url(conn)
+        await add_checks(conn, url_id, list(range(0, 60)) + list(range(90, 120)))
+        return await sla(conn, url_id)
+
+    report = in_transaction(body)
+    # The last check before the gap holds for GAP_S, the rest of the 30 minutes is no data
+    assert report["up_seconds"] == 7200 - 1800 + GAP_S - 60
+    assert report["no_data_seconds"] == 1800 - GAP_S + 60
+    assert report["uptime_pct"] == 100
+
+
+def test_check_runs_count_like_checks(in_transaction):
+    async def body(conn):
+        url_id = await add_url(conn)
+        await add_checks(conn, url_id, [0])
+        await conn.execute(
+            f"INSERT INTO check_runs ({', '.join(RUN_COLUMNS)}) VALUES ($1, $2, $3, 59, 200, 'success', NULL, NULL, 40, 60, 2950)",
+            url_id, T0 + timedelta(minutes=1), T0 + timedelta(minutes=59))
+        await add_checks(conn, url_id, range(60, 120), result="timeout", status_code=None)
+        return await sla(conn, url_id)
+
+    report = in_transaction(body)
+    assert report["up_seconds"] == 3600 and report["down_seconds"] == 3600
+
+
+def test_maintenance_is_excluded(in_transaction):
+    async def body(conn):
+        url_id = await add_url(conn)
+        await add_checks(conn, url_id, range(0, 60))
+        await add_checks(conn, url_id, range(60, 120), result="timeout", status_code=None)
+        await conn.execute("INSERT INTO maintenance_windows (url_id, starts_at, ends_at) VALUES ($1, $2, $3)",
+                           url_id, T0 + timedelta(minutes=60), T0 + timedelta(minutes=100))
+        return await sla(conn, url_id)
+
+    report = in_transaction(body)
+    assert report["maintenance_seconds"] == 2400
+    assert report["down_seconds"] == 1200 and report["up_seconds"] == 3600
+    assert report["uptime_pct"] == pytest.approx(75.0)
+
+
+def test_url_without_checks_is_all_no_data(in_transaction):
+    async def body(conn):
+        return await sla(conn, await add_url(conn))
+
+    report = in_transaction(body)
+    assert report["no_data_seconds"] == 7200 and report["uptime_pct"] is None
+
+
+def test_parse_month():
+    assert parse_month("2026-09").isoformat() == "2026-09-01"
+    with pytest.raises(ValueError):
+        parse_month("2026-13")
@@ -0,0 +1,161 @@
+# backend/tests/test_spill.py
+import os
+import zlib
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from apps.monitoring.spill import (
+    EPOCH, FRAME_HEADER, ONE_MICROSECOND, QUARANTINE_FILE, SpillLog, SpillLogFull, decode_rows, encode_rows
+)
+from apps.monitoring.writer import CHECK_RESULT_COLUMNS
+
+NOW = datetime(2026, 10, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def row(url_id: int, result: str = "success") -> tuple:
+    return (NOW, url_id, 200, 12.5, 1024, result, None, None, 3.25)
+
+
+def open_log(directory, **kwargs) -> SpillLog:
+    log = SpillLog(str(directory), CHECK_RESULT_COLUMNS, **kwargs)
+    assert log.try_open()
+    return log
+
+
+def drain(log: SpillLog) -> list:
+    batches = []
+    while (record := log.read_next()) is not None:
+        rows, position = record
+        batches.append(rows)
+        log.commit(position)
+    return batches
+
+
+def segments(directory) -> list:
+    return sorted(name for name in os.listdir(directory) if name.startswith("segment-"))
+
+
+def test_rows_round_trip():
+    rows = [row(1), row(2, "timeout")]
+    assert decode_rows(encode_rows(rows, CHECK_RESULT_COLUMNS), CHECK_RESULT_COLUMNS) == rows
+
+
+def test_reads_batches_in_append_order(tmp_path):
+    log = open_log(tmp_path)
+    log.append([row(1), row(2)])
+    log.append([row(3)])
+    assert not log.empty
+    assert drain(log) == [[row(1), row(2)], [row(3)]]
+    assert log.empty
+    log.close()
+
+
+def test_uncommitted_batches_are_replayed_after_restart(tmp_path):
+    log = open_log(tmp_path)
+    log.append([row(1)])
+    log.append([row(2)])
+    rows, position = log.read_next()
+    log.commit(position)
+    log.read_next()  # Read but never committed
+    log.close()
+
+    log = open_log(tmp_path)
+    assert drain(log) == [[row(2)]]
+    log.close()
+
+
+def test_fully_replayed_segments_are_deleted(tmp_path):
+    log = open_log(tmp_path, segment_bytes=1)  # Every record starts a new segment
+    for url_id in range(4):
+        log.append([row(url_id)])
+    assert len(segments(tmp_path)) == 4
+    drain(log)
+    assert len(segments(tmp_path)) == 1  # Only the active segment is kept
+    log.close()
+
+
+def test_append_beyond_budget_raises(tmp_path):
+    log = open_log(tmp_path, max_bytes=300)
+    log.append([row(1)])
+    with pytest.raises(SpillLogFull):
+        log.append([row(n) for n in range(10)])
+    log.close()
+
+
+def test_directory_is_locked_by_one_log(tmp_path):
+    log = open_log(tmp_path)
+    assert not SpillLog(str(tmp_path), CHECK_RESULT_COLUMNS).try_open()
+    log.close()
+    assert SpillLog(str(tmp_path), CHECK_RESULT_COLUMNS).try_open()
+
+
+def test_torn_record_at_segment_end_is_skipped(tmp_path):
+    log = open_log(tmp_path)
+    log.append([row(1)])
+    log.close()
+    [segment] = segments(tmp_path)
+    with open(tmp_path / segment, "ab") as f:
+        f.write(FRAME_HEADER.pack(1000, 0) + b"partial")  # Crash mid-write
+
+    log = open_log(tmp_path)
+    log.append([row(2)])
+    assert drain(log) == [[row(1)], [row(2)]]
+    log.close()
+
+
+def test_undecodable_record_is_quarantined(tmp_path):
+    log = open_log(tmp_path)
+    log.append([row(1)])
+    payload = b"not json"
+    log._active.write(FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+    log._sizes[log._segments[-1]] += FRAME_HEADER.size + len(payload)
+    log.append([row(2)])
+    assert drain(log) == [[row(1)], [row(2)]]
+    assert log.quarantine_bytes == FRAME_HEADER.size + len(payload)
+    log.close()
+
+
+def test_quarantined_rows_are_not_replayed_nor_counted_against_the_replay_budget(tmp_path):
+    log = open_log(tmp_path, max_bytes=300)
+    for url_id in range(10):
+        log.quarantine([row(url_id)])
+    assert os.path.getsize(tmp_path / QUARANTINE_FILE) == log.quarantine_bytes
+    assert log.empty and log.total_bytes == 0
+    log.append([row(1)])  # Still room for spilled rows
+    log.close()
+
+
+def test_quarantine_is_rotated_within_its_budget(tmp_path):
+    record_bytes = len(FRAME_HEADER.pack(0, 0) + encode_rows([row(1)], CHECK_RESULT_COLUMNS))
+    log = open_log(tmp_path, quarantine_max_bytes=10 * record_bytes)  # Rotated every 5 records
+    for _ in range(23):
+        log.quarantine([row(1)])
+    assert log.quarantine_bytes == 8 * record_bytes  # 3 in the active file, 5 in the rotated one
+    assert os.path.getsize(tmp_path / (QUARANTINE_FILE + ".1")) == 5 * record_bytes
+    log.close()
+    assert open_log(tmp_path).quarantine_bytes == 8 * record_bytes
+
+
+def test_version_1_records_are_padded_to_current_columns(tmp_path):
+    legacy = [(NOW - EPOCH) // ONE_MICROSECOND, 1, 200, 12.5, 1024, "success", None]  # Before content_changed
+    payload = orjson.dumps([legacy])
+    with open(tmp_path / "segment-000000000001.log", "wb") as f:
+        f.write(FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+
+    log = open_log(tmp_path)
+    assert drain(log) == [[(NOW, 1, 200, 12.5, 1024, "success", None, None, None)]]
+    log.close()
+
+
+def test_records_with_other_columns_are_mapped_by_name():
+    stored = ("time", "url_id", "result", "removed")
+    payload = encode_rows([(NOW, 1, "timeout", "x")], stored)
+    assert decode_rows(payload, CHECK_RESULT_COLUMNS) == [(NOW, 1, None, None, None, "timeout", None, None, None)]
+
+
+def test_empty_segments_do_not_accumulate_across_restarts(tmp_path):
+    for _ in range(5):
+        open_log(tmp_path).close()
+    assert len(segments(tmp_path)) == 1
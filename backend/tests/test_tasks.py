@@ -0,0 +1,101 @@
+# backend/tests/test_tasks.py
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from config.tasks import JobScheduler, advisory_lock_key
+
+
+def scheduler(pool=None) -> JobScheduler:
+    return JobScheduler(SimpleNamespace(pool=pool))
+
+
+def counting_job(sched: JobScheduler, name: str, singleton: bool = True, interval_s: float = 60.0):
+    calls = []
+
+    @sched.job(name, interval_s=interval_s, singleton=singleton)
+    async def job():
+        calls.append(name)
+        await asyncio.sleep(0.05)
+
+    return sched.jobs[name], calls
+
+
+def test_lock_keys_are_stable_signed_64_bit():
+    assert advisory_lock_key("cleanup") == advisory_lock_key("cleanup") != advisory_lock_key("other")
+    assert -2 ** 63 <= advisory_lock_key("cleanup") < 2 ** 63
+
+
+def test_jitter_must_be_below_interval():
+    with pytest.raises(ValueError):
+        scheduler().job("x", interval_s=10, jitter_s=10)
+
+
+def test_local_job_runs_without_database_and_never_overlaps():
+    async def scenario():
+        sched = scheduler()
+        job, calls = counting_job(sched, "local", singleton=False)
+        first, second = await asyncio.gather(sched.run_once(job), sched.run_once(job))
+        return job, calls, first, second
+    job, calls, first, second = asyncio.run(scenario())
+    assert (first, second) == (True, False) and len(calls) == 1
+    assert job.stats.skipped_overlap == 1
+
+
+def test_singleton_job_is_skipped_without_database():
+    job, calls = counting_job(sched := scheduler(), "singleton")
+    assert asyncio.run(sched.run_once(job)) is False
+    assert job.stats.skipped_no_db == 1 and not calls
+
+
+def test_failures_are_recorded():
+    sched = scheduler()
+
+    @sched.job("broken", interval_s=60, singleton=False)
+    async def broken():
+        raise RuntimeError("boom")
+
+    job = sched.jobs["broken"]
+    assert asyncio.run(sched.run_once(job)) is False
+    assert job.stats.failures == 1 and "boom" in job.stats.last_error
+
+
+def test_singleton_job_runs_once_per_interval_cluster_wide(with_pool):
+    name = f"test-{uuid.uuid4().hex}"
+
+    async def body(pool):
+        workers = [scheduler(pool) for _ in range(3)]  # Three worker processes
+        jobs = [counting_job(worker, name)[0] for worker in workers]
+        try:
+            ran = await asyncio.gather(*(worker.run_once(job) for worker, job in zip(workers, jobs)))
+            ran_again = await workers[0].run_once(jobs[0])
+            row = await pool.fetchrow("SELECT run_count, last_status FROM scheduled_jobs WHERE name = $1", name)
+            return ran, ran_again, jobs, row
+        finally:
+            await pool.execute("DELETE FROM scheduled_jobs WHERE name = $1", name)
+
+    ran, ran_again, jobs, row = with_pool(body)
+    assert sum(ran) == 1 and not ran_again
+    skipped = sum(job.stats.skipped_locked + job.stats.skipped_not_due for job in jobs)
+    assert skipped == 3  # The two losers, then the early second tick
+    assert (row["run_count"], row["last_status"]) == (1, "ok")
+
+
+def test_singleton_job_is_skipped_while_another_worker_holds_the_lock(with_pool):
+    name = f"test-{uuid.uuid4().hex}"
+
+    async def body(pool):
+        sched = scheduler(pool)
+        job, calls = counting_job(sched, name)
+        async with pool.acquire() as other_worker:
+            await other_worker.execute("SELECT pg_advisory_lock($1)", job.lock_key)
+            try:
+                ran = await sched.run_once(job)
+            finally:
+                await other_worker.execute("SELECT pg_advisory_unlock($1)", job.lock_key)
+        return ran, job, calls
+
+    ran, job, calls = with_pool(body)
+    assert not ran and not calls and job.stats.skipped_locked == 1
@@ -0,0 +1,36 @@
+# backend/tests/test_tenant_quotas.py
+from uuid import UUID
+
+from apps.monitoring.tenants import UNLIMITED, TenantQuota, TenantQuotas
+
+ALICE, BOB, CAROL = UUID(int=1), UUID(int=2), UUID(int=3)
+
+
+def quotas(default_max_urls=None) -> TenantQuotas:
+    q = TenantQuotas({ALICE: TenantQuota(max_urls=2, min_interval_s=30, weight=1.0),
+                      BOB: TenantQuota(max_urls=0, min_interval_s=60, weight=1.0)})
+    q.default = TenantQuota(max_urls=default_max_urls, min_interval_s=60, weight=1.0)
+    return q
+
+
+def test_oldest_urls_within_the_quota_are_kept():
+    urls = [(9, ALICE), (3, ALICE), (5, ALICE), (7, ALICE)]
+    assert quotas().allowed_urls(urls) == {3, 5}  # Adding URLs never disables older ones
+
+
+def test_quotas_apply_per_tenant():
+    urls = [(1, ALICE), (2, BOB), (3, ALICE), (4, CAROL), (5, ALICE), (6, CAROL)]
+    assert quotas().allowed_urls(urls) == {1, 3, 4, 6}               # CAROL: unlimited default
+    assert quotas(default_max_urls=1).allowed_urls(urls) == {1, 3, 4}
+
+
+def test_unowned_urls_are_unlimited():
+    q = quotas(default_max_urls=0)
+    assert q.get(None) is UNLIMITED
+    assert q.allowed_urls([(n, None) for n in range(5)]) == set(range(5))
+
+
+def test_overrides_and_default():
+    q = quotas(default_max_urls=10)
+    assert q.get(ALICE).min_interval_s == 30
+    assert q.get(CAROL) == q.default
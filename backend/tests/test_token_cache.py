@@ -0,0 +1,66 @@
+# backend/tests/test_token_cache.py
+import time
+from datetime import timedelta
+
+import pytest
+
+from apps.auth import security
+from apps.auth.security import VerifiedTokenCache, create_access_token, decode_token, decode_token_data, forget_token
+
+
+@pytest.fixture
+def cache(monkeypatch) -> VerifiedTokenCache:
+    cache = VerifiedTokenCache(max_size=2)
+    monkeypatch.setattr(security, "token_cache", cache)
+    return cache
+
+
+def test_entries_are_served_until_the_token_expires(monkeypatch):
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("a", {"exp": time.time() + 60, "sub": "a"})
+    assert cache.get("a")[1]["sub"] == "a"
+    monkeypatch.setattr(time, "time", lambda: 2 ** 40)
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerifiedTokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.put("a", {"exp": exp})
+    cache.put("b", {"exp": exp})
+    cache.get("a")
+    cache.put("c", {"exp": exp})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_tokens_without_exp_or_a_disabled_cache_are_not_kept():
+    assert VerifiedTokenCache(max_size=10).put("a", {"sub": "a"}) is None
+    assert VerifiedTokenCache(max_size=0).put("a", {"exp": time.time() + 60}) is None
+
+
+def test_keys_are_digests_not_tokens():
+    cache = VerifiedTokenCache(max_size=10)
+    cache.put("secret-token", {"exp": time.time() + 60})
+    assert all(isinstance(key, bytes) and len(key) == 32 for key in cache._entries)
+
+
+def test_repeat_token_skips_verification(cache):
+    token = create_access_token({"sub": "user@example.com", "role": "admin"}, timedelta(minutes=5))
+    first = decode_token_data(token)
+    assert first.sub == "user@example.com" and cache.misses == 1
+    assert decode_token_data(token) is first and cache.hits == 1  # Same validated TokenData
+    claims = decode_token(token)
+    claims["role"] = "changed"
+    assert decode_token(token)["role"] == "admin"  # Callers get a copy
+
+
+def test_invalid_and_forgotten_tokens(cache):
+    token = create_access_token({"sub": "user@example.com", "role": "admin"}, timedelta(minutes=5))
+    assert decode_token(token[:-2] + ("A" if token[-2] != "A" else "B") + token[-1]) is None
+    assert decode_token(token) is not None
+    forget_token(token)
+    assert not cache._entries
+    expired = create_access_token({"sub": "user@example.com", "role": "admin"}, timedelta(minutes=-5))
+    assert decode_token(expired) is None and not cache._entries
@@ -0,0 +1,156 @@
+# backend/tests/test_writer.py
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import asyncpg
+
+from apps.monitoring.spill import SpillLog
+from apps.monitoring.writer import CHECK_RESULT_COLUMNS, CheckResultWriter
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def row(url_id: int) -> tuple:
+    return (NOW, url_id, 200, 10.0, 512, "success", None, None, 2.0)
+
+
+class FakeDatabase:
+    """Stands in for config.database: COPY appends to `written`, fails with `error` or blocks until `release` is set."""
+
+    def __init__(self):
+        self.written = []
+        self.error = None
+        self.blocked = asyncio.Event()
+        self.release = None
+
+    async def get_pool(self, name):
+        return self
+
+    @asynccontextmanager
+    async def acquire(self, timeout=None):
+        yield self
+
+    async def copy_records_to_table(self, table, records, columns, timeout=None):
+        if self.release is not None:
+            self.blocked.set()
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        self.written.extend(records)
+
+
+def spilled_rows(directory) -> list:
+    log = SpillLog(str(directory / "slot-0"), CHECK_RESULT_COLUMNS)
+    assert log.try_open()
+    rows = []
+    while (record := log.read_next()) is not None:
+        rows.extend(record[0])
+        log.commit(record[1])
+    log.close()
+    return rows
+
+
+def test_stop_flushes_buffered_rows():
+    async def scenario():
+        db = FakeDatabase()
+        writer = CheckResultWriter(db, batch_size=10, flush_interval_s=0.05)
+        await writer.start()
+        assert writer.offer([row(n) for n in range(25)])
+        await writer.stop(timeout_s=5)
+        return db
+    assert sorted(r[1] for r in asyncio.run(scenario()).written) == list(range(25))
+
+
+def test_stop_during_a_blocked_copy_spills_every_row(tmp_path):
+    async def scenario():
+        db = FakeDatabase()
+        db.release = asyncio.Event()  # Every COPY hangs, as on a stuck database
+        writer = CheckResultWriter(db, batch_size=10, flush_interval_s=0.05, concurrency=2, spill_dir=str(tmp_path))
+        await writer.start()
+        assert writer.offer([row(n) for n in range(25)])
+        await asyncio.wait_for(db.blocked.wait(), timeout=5)  # A flush task is mid-COPY
+        await writer.stop(timeout_s=0.2)
+        return db, writer
+    db, writer = asyncio.run(scenario())
+    assert db.written == [] and writer.pending == 0
+    assert sorted(r[1] for r in spilled_rows(tmp_path)) == list(range(25))
+
+
+def test_rows_spilled_after_a_failed_copy_are_kept_at_stop(tmp_path):
+    async def scenario():
+        db = FakeDatabase()
+        db.error = ConnectionResetError("connection lost")
+        writer = CheckResultWriter(db, batch_size=10, flush_interval_s=0.05, spill_dir=str(tmp_path))
+        await writer.start()
+        assert writer.offer([row(n) for n in range(25)])
+        await writer.stop(timeout_s=5)
+        return writer
+    writer = asyncio.run(scenario())
+    assert writer.stats.failed_flushes >= 1
+    assert sorted(r[1] for r in spilled_rows(tmp_path)) == list(range(25))
+
+
+class RefusingDatabase(FakeDatabase):
+    """COPY fails for good (like a deleted URL's foreign key) whenever a batch holds a negative url_id."""
+
+    def __init__(self):
+        super().__init__()
+        self.copies = 0
+
+    async def copy_records_to_table(self, table, records, columns, timeout=None):
+        self.copies += 1
+        if any(r[1] < 0 for r in records):
+            raise asyncpg.ForeignKeyViolationError("url_id is not present in monitored_urls")
+        await super().copy_records_to_table(table, records, columns, timeout)
+
+
+def test_refused_rows_are_bisected_out_and_dropped_without_spill_log():
+    async def scenario():
+        db = RefusingDatabase()
+        writer = CheckResultWriter(db, batch_size=64)
+        writer._pending.extend([row(-n if n in (5, 40) else n) for n in range(64)])
+        assert await writer.flush_once()
+        return db, writer
+    db, writer = asyncio.run(scenario())
+    assert sorted(r[1] for r in db.written) == [n for n in range(64) if n not in (5, 40)]
+    assert writer.stats.dead_rows == 2 and writer.pending == 0
+    assert db.copies < 64  # Halves that COPY cleanly are not split further
+
+
+def test_refused_rows_are_quarantined_with_a_spill_log(tmp_path):
+    async def scenario():
+        db = RefusingDatabase()
+        writer = CheckResultWriter(db, batch_size=10, spill_dir=str(tmp_path))
+        await writer.start()
+        writer.offer([row(1), row(-2), row(3)])
+        await writer.stop(timeout_s=5)
+        return db, writer
+    db, writer = asyncio.run(scenario())
+    assert sorted(r[1] for r in db.written) == [1, 3]
+    assert writer.stats.dead_rows == 1
+    log = SpillLog(str(tmp_path / "slot-0"), CHECK_RESULT_COLUMNS)
+    assert log.try_open()
+    assert log.quarantine_bytes > 0 and log.empty
+    log.close()
+
+
+def test_transient_errors_are_retried_not_quarantined(tmp_path):
+    async def scenario():
+        db = FakeDatabase()
+        db.error = asyncpg.TooManyConnectionsError("too many clients")
+        writer = CheckResultWriter(db, batch_size=10, flush_interval_s=0.05, spill_dir=str(tmp_path))
+        await writer.start()
+        writer.offer([row(n) for n in range(10)])
+        await asyncio.sleep(0.2)
+        assert writer.stats.dead_rows == 0 and writer.stats.failed_flushes >= 1 and not writer.spill.empty
+        db.error = None  # Database is back: the spill log is replayed
+        for _ in range(50):
+            if writer.spill.empty:
+                break
+            await asyncio.sleep(0.05)
+        await writer.stop(timeout_s=5)
+        return db, writer
+    db, writer = asyncio.run(scenario())
+    assert sorted(r[1] for r in db.written) == list(range(10))
+    assert writer.stats.replayed_rows == 10
@@ -7,7 +7,7 @@ from dotenv import load_dotenv
 import argparse # Added argparse
 
 # Import necessary functions and schemas from our modules
-from config.logging_util import get_logger
+from config.logging_util import setup_logging, get_logger
 from utils.db_utils import fetch_one
 
 # Initialize logger
@@ -233,4 +233,5 @@ async def main():
         parser.print_help()
 
 if __name__ == "__main__":
+    setup_logging()
     asyncio.run(main())
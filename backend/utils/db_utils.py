@@ -1,18 +1,41 @@
+from contextlib import asynccontextmanager
 from asyncpg import Connection
 
 # Import necessary functions and schemas from our modules
 from config.logging_util import get_logger
-from config.database import database
+from config.database import database, DEFAULT_POOL
 
 # Initialize logger
 logger = get_logger(__name__)
 
 async def get_db_connection():
     """
-    Asynchronous dependency that yields a database connection from the pool.
+    Asynchronous dependency that yields a database connection from the default pool.
     """
     await database.initialize()
-    async with database.pool.acquire() as connection:
+    async with database.acquire() as connection:
+        yield connection
+
+def db_connection(pool: str = DEFAULT_POOL, readonly: bool = False):
+    """
+    Dependency factory: yields a connection from the named pool (see config.database.POOL_SPECS).
+    With readonly=True the connection may come from the read replica, so the endpoint must not write.
+    """
+    async def dependency():
+        async with database.acquire(pool, readonly=readonly) as connection:
+            yield connection
+    return dependency
+
+# Dashboards and other read-only analytics: isolated pool, read replica when it is fresh enough
+get_read_connection = db_connection("analytics", readonly=True)
+
+@asynccontextmanager
+async def acquire_connection(pool: str = DEFAULT_POOL, readonly: bool = False):
+    """
+    Async context manager that acquires a pooled connection outside of FastAPI dependency injection.
+    The connection is released back to the pool on exit.
+    """
+    async with database.acquire(pool, readonly=readonly) as connection:
         yield connection
 
 async def execute_query(conn: Connection, query: str, *args):
@@ -43,4 +66,18 @@ async def fetch_all(conn: Connection, query: str, *args):
         return await conn.fetch(query, *args)
     except Exception as e:
         logger.error(f"Error fetching rows: {query} with args: {args}. Error: {e}")
-        raise
\ No newline at end of file
+        raise
+
+async def fetch_one_readonly(query: str, *args, pool: str = "analytics"):
+    """
+    Fetches a single row on its own read connection (read replica when usable, else the primary).
+    """
+    async with acquire_connection(pool, readonly=True) as conn:
+        return await fetch_one(conn, query, *args)
+
+async def fetch_all_readonly(query: str, *args, pool: str = "analytics"):
+    """
+    Fetches multiple rows on their own read connection (read replica when usable, else the primary).
+    """
+    async with acquire_connection(pool, readonly=True) as conn:
+        return await fetch_all(conn, query, *args)
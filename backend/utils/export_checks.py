@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+import asyncpg
+
+# Import necessary functions and schemas from our modules
+from config.logging_util import setup_logging, get_logger
+from config.database import DB_CONFIG
+from apps.monitoring.export import DEFAULT_CHUNK_ROWS, EXPORT_FORMATS, resolve_urls, stream_export
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Command-line export of check results to an Arrow IPC stream or Parquet file, using the same
+# chunked server-side-cursor writer as GET /monitoring/export (constant memory for any range).
+# Usage (from backend/):
+#   python -m utils.export_checks --start 2026-09-01 --end 2026-10-01 --url-id 1 --url-id 2 --output sept.parquet
+
+
+def parse_timestamp(value: str) -> datetime:
+    """ISO-8601 date or datetime; naive values are taken as UTC."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def export_checks(args) -> int:
+    conn = await asyncpg.connect(**DB_CONFIG)
+    try:
+        url_map = await resolve_urls(conn, args.url_id or None)
+        if not url_map:
+            logger.error("No matching URLs to export.")
+            return 1
+        fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "arrow")
+        written = 0
+        with open(args.output, "wb") as f:
+            async for chunk in stream_export(conn, url_map, args.start, args.end, fmt, args.chunk_rows):
+                f.write(chunk)
+                written += len(chunk)
+        logger.info(f"Wrote {written / 1024 / 1024:.1f} MiB to {os.path.abspath(args.output)}")
+        return 0
+    finally:
+        await conn.close()
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Export check results as Arrow IPC or Parquet.")
+    parser.add_argument("--start", type=parse_timestamp, required=True, help="Inclusive start (ISO-8601, UTC if naive)")
+    parser.add_argument("--end", type=parse_timestamp, default=datetime.now(timezone.utc),
+                        help="Exclusive end (ISO-8601, default: now)")
+    parser.add_argument("--url-id", type=int, action="append", default=[], help="URL ID to export (repeatable; default: all)")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), help="Default: from the output file extension")
+    parser.add_argument("--output", required=True, help="Output file (.arrow or .parquet)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per cursor fetch / batch")
+    args = parser.parse_args()
+    return await export_checks(args)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,57 @@
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# Command-line import-time report: runs `python -X importtime -c "import <module>"` in a fresh
+# interpreter (same environment, backend/ as working directory) and summarizes where boot time goes.
+# Usage (from backend/): python utils/import_report.py [--module main] [--top 25]
+
+
+def collect_import_times(module: str):
+    """Returns [(module_name, self_us, cumulative_us)] parsed from -X importtime output."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"Importing '{module}' failed (exit code {proc.returncode}).")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report where module import (cold start) time is spent.")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to list")
+    args = parser.parse_args()
+
+    entries = collect_import_times(args.module)
+    total_us = sum(self_us for _, self_us, _ in entries)
+
+    # Self time grouped by top-level package: which dependency costs what
+    by_package = defaultdict(int)
+    for name, self_us, _ in entries:
+        by_package[name.split(".", 1)[0]] += self_us
+
+    print(f"Total import time for '{args.module}': {total_us / 1000:.1f} ms ({len(entries)} modules)\n")
+    print(f"{'package':<32}{'self ms':>10}{'share':>8}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<32}{self_us / 1000:>10.1f}{self_us / total_us:>8.1%}")
+
+    print(f"\n{'module (cumulative)':<48}{'cumulative ms':>14}")
+    for name, _, cumulative_us in sorted(entries, key=lambda e: -e[2])[:args.top]:
+        print(f"{name:<48}{cumulative_us / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
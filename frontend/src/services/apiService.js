@@ -74,6 +74,12 @@ apiClient.interceptors.response.use(
 
 export default apiClient;
 
+// Several dashboard reads in one request: queries is { key: { resource, ...params } }, e.g.
+// { me: { resource: 'me' }, board: { resource: 'status' }, s1: { resource: 'checks', url_id: 1 } }.
+// Resolves to { key: { status, body | detail } } (each query succeeds or fails on its own).
+export const fetchDashboardBatch = (queries) =>
+  apiClient.post('/dashboard/batch', { queries }).then((response) => response.data.results);
+
 // You can also export specific API functions if needed
 // export const fetchSomeData = () => apiClient.get('/some-data');
 // export const loginUser = (email, password) => axios.post('/auth/login', { email, password });